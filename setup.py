@@ -54,7 +54,6 @@ setup(
         "paramiko==2.6.0",
         "scp==0.13.2",
         "prompt_toolkit==3.0.6",
-        "influxdb==5.3.0",
         "aiohttp==3.6.2",
     ],
     python_requires=">=3.8",
@@ -1,13 +1,17 @@
+import time
 import logging
 import aiohttp
 import asyncio
 import copy
 
-from google.protobuf import json_format
-from influxdb import InfluxDBClient
-
-from umbra.common.protobuf.umbra_pb2 import Status
+from umbra.common.protobuf.umbra_pb2 import Status, Stats
 from umbra.broker.visualization import dashboard_template, panels_template
+from umbra.broker.writer import Writer
+from umbra.broker.spill import Spill
+from umbra.broker.influx import InfluxClient, StatsEncoder
+from umbra.broker.rollup import Rollup, samples
+from umbra.broker.recent import Recent
+from umbra.broker.export import Exporter
 
 
 logger = logging.getLogger(__name__)
@@ -205,14 +209,31 @@ class GraphanaInterface:
 
 
 class Collector:
+    SPILL_FOLDER = "/tmp/umbra/spill/broker"
+    # Resolutions (s) of the rollup tiers, and if raw points are written
+    ROLLUPS = [10, 60, 600]
+    RAW = True
+    # Samples kept in memory per series for Recent queries
+    RECENT = 600
+
     def __init__(self, info):
         self.info = info
         self.address = None
         self.influx_client = None
         self.databases = {}
+        self._created = set()
+        self._datasources = set()
         self._is_connected = False
         self._gi = GraphanaInterface()
         self._lock = asyncio.Lock()
+        self.writer = Writer(self.write_batch, spill=Spill(self.SPILL_FOLDER))
+        self.encoder = StatsEncoder()
+        self.raw = info.get("raw", self.RAW)
+        rollups = info.get("rollups", self.ROLLUPS)
+        self.rollup = Rollup(rollups) if rollups else None
+        recent = info.get("recent", self.RECENT)
+        self.recent = Recent(recent) if recent else None
+        self._expire_at = 0
         self.set_address()
         self.connect()
 
@@ -229,7 +250,7 @@ class Collector:
         dbname = "umbra"
 
         try:
-            client = InfluxDBClient(host, port, user, password, dbname)
+            client = InfluxClient(host, port, user, password, dbname)
         except Exception as e:
             logger.debug(f"Could not connect to influx db - {repr(e)}")
             self._is_connected = False
@@ -238,26 +259,26 @@ class Collector:
             self.influx_client = client
             self._is_connected = True
 
-    def dbs(self):
-        dbs = self.influx_client.get_list_database()
+    async def dbs(self):
+        dbs = await self.influx_client.get_list_database()
         dbs = [db["name"] for db in dbs]
         logger.debug(f"Databases in influx {dbs}")
         return dbs
 
-    def init_db(self, dbname):
-        if dbname not in self.dbs():
-            self.influx_client.create_database(dbname)
+    async def init_db(self, dbname):
+        if dbname not in await self.dbs():
+            await self.influx_client.create_database(dbname)
 
-    def end_db(self, dbname):
-        if dbname in self.dbs():
-            self.influx_client.drop_database(dbname)
+    async def end_db(self, dbname):
+        if dbname in await self.dbs():
+            await self.influx_client.drop_database(dbname)
 
-    def write(self, info, database):
+    async def write(self, info, database):
         if not self._is_connected:
             self.connect()
 
         if self._is_connected:
-            self.influx_client.write_points(
+            await self.influx_client.write_points(
                 info, database=database, time_precision="ms"
             )
             err = ""
@@ -266,20 +287,73 @@ class Collector:
             err = "Could not write points do DB - not connected"
             return False, err
 
+    async def write_batch(self, points, database):
+        """Writes a batch of points, used by the writer, creating
+        the database (and its datasource) before its first write
+
+        Arguments:
+            points {list} -- Points (dicts with measurement, tags, fields)
+            database {string} -- Name of the database
+
+        Raises:
+            ConnectionError: If not connected to the database
+        """
+        if not self._is_connected:
+            self.connect()
+
+        if self._is_connected:
+            await self.prepare(database)
+
+        ack, err = await self.write(points, database)
+        if not ack:
+            raise ConnectionError(err)
+
+    async def prepare(self, database):
+        """Creates a database and its grafana datasource if not done yet.
+        Called from the writer task, so the database is created (and retried
+        while influx is down) without blocking the collected messages
+
+        Arguments:
+            database {string} -- Name of the database
+
+        Raises:
+            Exception: If the database could not be created (the writer
+            keeps the points to be retried)
+        """
+        if database not in self._created:
+            await self.init_db(database)
+            self._created.add(database)
+            logger.debug(f"New database: {database}")
+
+        if database not in self._datasources:
+            try:
+                await self.datasource(database)
+            except Exception as e:
+                logger.info(f"Could not add datasource {database} - {repr(e)}")
+            else:
+                self._datasources.add(database)
+                logger.debug(f"New datasource: {database}")
+
+    def register(self, environment, source):
+        """Registers the source of an environment, its database
+        is created by the writer before its first write (see prepare())
+
+        Arguments:
+            environment {string} -- Name of the environment (database)
+            source {string} -- Name of the source
+        """
+        if environment not in self.databases:
+            logger.debug(f"New environment: {environment}, {source}")
+
+        self.databases[environment] = source
+
     async def parse_message(self, message):
         data = []
 
         source = message["source"]
         environment = message["environment"]
 
-        if environment not in self.databases:
-            self.init_db(environment)
-            logger.debug(f"New database: {environment}, {source}")
-
-            await self.datasource(environment)
-            logger.debug(f"New datasource: {environment}")
-
-        self.databases[environment] = source
+        self.register(environment, source)
 
         measurements = message.get("measurements", [])
         for measurement in measurements:
@@ -291,7 +365,11 @@ class Collector:
                 vvalue = v.get("value")
                 vtype = v.get("type")
 
-                if vtype == "int":
+                if "double_value" in v:
+                    value = float(v.get("double_value"))
+                elif "int_value" in v:
+                    value = int(v.get("int_value"))
+                elif vtype == "int":
                     value = int(vvalue)
                 elif vtype == "float":
                     value = float(vvalue)
@@ -317,6 +395,109 @@ class Collector:
 
         return data, environment
 
+    def format_writer(self, stats):
+        fields = {
+            name: value for name, value in stats.items() if isinstance(value, int)
+        }
+
+        for name, value in stats.get("latency", {}).items():
+            if value is not None:
+                fields["latency_" + name] = float(value)
+
+        for name, value in stats.get("spill", {}).items():
+            fields["spill_" + name] = value
+
+        data = [{"measurement": "collector_writer", "tags": {}, "fields": fields}]
+        return data
+
+    def format_timings(self, timings):
+        data = []
+
+        for label, stats in timings.items():
+            for metric in ["lateness", "wait", "duration", "latency"]:
+                fields = {
+                    name: float(value)
+                    for name, value in stats.get(metric, {}).items()
+                    if value is not None
+                }
+
+                if fields:
+                    data.append(
+                        {
+                            "measurement": "scheduler",
+                            "tags": {"label": label, "metric": metric},
+                            "fields": fields,
+                        }
+                    )
+
+            outcomes = stats.get("outcomes", {})
+            if outcomes:
+                data.append(
+                    {
+                        "measurement": "scheduler_outcomes",
+                        "tags": {"label": label},
+                        "fields": {k: int(v) for k, v in outcomes.items()},
+                    }
+                )
+
+        return data
+
+    async def timings(self, timings):
+        """Writes the broker scheduler instrumentation (see Handler.timings())
+        into the databases of all the environments the collector knows,
+        so it is available next to the environments metrics
+
+        The collector writer stats (queue depth, flush latency)
+        are written together with the timings
+
+        Arguments:
+            timings {dict} -- Timing stats indexed by events label
+        """
+        self.expire_rollups()
+
+        data = self.format_timings(timings)
+        data.extend(self.format_writer(self.writer.stats()))
+        if self.rollup:
+            data.append(
+                {
+                    "measurement": "collector_rollup",
+                    "tags": {},
+                    "fields": self.rollup.stats(),
+                }
+            )
+        if self.recent:
+            data.append(
+                {
+                    "measurement": "collector_recent",
+                    "tags": {},
+                    "fields": self.recent.stats(),
+                }
+            )
+        databases = list(self.databases.keys()) or ["umbra"]
+
+        for database in databases:
+            logger.debug(f"Writing scheduler timings - database {database}")
+            self.writer.put(data, database)
+
+    def expire_rollups(self, now=None, flush=False):
+        """Writes the rollup windows over (e.g., of sources that
+        stopped sending measurements)
+
+        Keyword Arguments:
+            now {int} -- Current time (ms) (default: {None}, now)
+            flush {bool} -- Writes all the windows, over or not (default: {False})
+        """
+        if not self.rollup:
+            return
+
+        if now is None:
+            now = int(time.time() * 1000)
+
+        self._expire_at = now + self.rollup.resolutions[0] * 1000
+
+        for environment, points in self.rollup.expire(now, flush).items():
+            self.writer.put(points, environment)
+
     async def datasource(self, database):
         async with self._lock:
             info = {
@@ -328,13 +509,71 @@ class Collector:
             await self._gi.add_dashboard(info)
 
     async def collect(self, message):
-        msg = json_format.MessageToDict(message, preserving_proto_field_name=True)
-
         logger.debug(f"Collected message")
-        # logger.debug(f"{msg}")
 
-        data, database = await self.parse_message(msg)
-        ack, err = self.write(data, database)
+        # Line protocol is encoded straight from the Stats message,
+        # parse_message() is the equivalent (slower) dict-based path
+        environment = message.environment
+        self.register(environment, message.source)
+
+        timestamp = int(time.time() * 1000)
+
+        if self.raw:
+            lines = self.encoder.encode(message, environment, timestamp)
+            self.writer.put(lines, environment)
+
+        if self.rollup or self.recent:
+            stats_samples = samples(message, timestamp)
 
-        reply = Status(info=str(ack).encode("utf-8"), error=err)
+            if self.recent:
+                self.recent.add_samples(environment, stats_samples)
+
+            if self.rollup:
+                points = self.rollup.add_samples(environment, stats_samples)
+                self.writer.put(points, environment)
+
+                if timestamp >= self._expire_at:
+                    self.expire_rollups(timestamp)
+
+        reply = Status(info=str(True).encode("utf-8"), error="")
         return reply
+
+    def recent_query(self, query):
+        """Reads recent samples kept in memory (see Recent.query())
+
+        Arguments:
+            query {Query} -- The Query protobuf message
+
+        Returns:
+            Stats -- The Stats message with the matching series/measurements
+        """
+        if not self.recent:
+            return Stats(environment=query.environment, source="broker")
+
+        return self.recent.query(query)
+
+    async def export(self, folder, databases, results=None, name=""):
+        """Exports the measurements of databases (and events results)
+        into columnar files in folder (see Exporter.run())
+
+        Arguments:
+            folder {string} -- Path of the export folder
+            databases {list} -- Names of the databases (environments)
+
+        Keyword Arguments:
+            results {dict} -- Lists of events results indexed by event id (default: {None})
+            name {string} -- Name of the experiment (default: {""})
+
+        Returns:
+            dict -- The export manifest
+        """
+        if not self._is_connected:
+            self.connect()
+
+        # Points still buffered are written before being exported
+        self.expire_rollups(flush=True)
+        await self.writer.flush()
+
+        exporter = Exporter(self.influx_client, folder)
+        manifest = await exporter.run(databases, results=results, name=name)
+        return manifest
@@ -0,0 +1,365 @@
+import os
+import re
+import sys
+import json
+import struct
+import shutil
+import logging
+import zipfile
+import asyncio
+import tempfile
+from array import array
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+# Column kinds: (array typecode of values, NumPy dtype)
+KINDS = {
+    "time": ("q", "<i8"),
+    "integer": ("q", "<i8"),
+    "float": ("d", "<f8"),
+    "boolean": ("b", "|b1"),
+    "string": (None, "<U"),
+}
+
+NAN = float("nan")
+IO_SIZE = 2 ** 20
+
+
+def npy_header(descr, rows):
+    """Header of a NumPy .npy (format 1.0) 1-D array
+
+    Arguments:
+        descr {string} -- NumPy dtype descr (e.g., <f8, <U12)
+        rows {int} -- Length of the array
+
+    Returns:
+        bytes -- The header
+    """
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (
+        descr,
+        rows,
+    )
+    # Magic (6) + version (2) + length (2) + header + newline, aligned to 64
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (padding % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode()
+
+
+def filename(name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+class Column:
+    """Column of a table being exported, appended in chunks to a
+    temporary file (so memory stays bounded), and written as a .npy
+    member of the table .npz when finished. Nulls are NaN in a float
+    column, and empty strings in a string column; an integer or boolean
+    column with nulls is written as float (NaN for nulls).
+    """
+
+    def __init__(self, folder, name, kind):
+        self.name = name
+        self.kind = kind if kind in KINDS else "string"
+        self.rows = 0
+        self.nulls = 0
+        self.width = 1
+        self.path = os.path.join(folder, filename(name) + "-" + str(id(self)))
+        self.mask_path = self.path + ".mask"
+        self._file = open(self.path, "wb")
+        self._mask = open(self.mask_path, "wb")
+
+    def extend(self, values):
+        mask = array("b", [value is not None for value in values])
+        nulls = len(values) - sum(mask)
+        self.nulls += nulls
+        self.rows += len(values)
+        self._mask.write(mask.tobytes())
+
+        typecode = KINDS[self.kind][0]
+
+        if typecode is None:
+            for value in values:
+                data = ("" if value is None else str(value)).encode("utf-8")
+                self.width = max(self.width, len(data))
+                self._file.write(struct.pack("<I", len(data)) + data)
+        else:
+            default = NAN if typecode == "d" else 0
+            data = array(
+                typecode, [default if value is None else value for value in values]
+            )
+            if sys.byteorder == "big":
+                data.byteswap()
+            self._file.write(data.tobytes())
+
+    def pad(self, rows):
+        """Appends nulls up to rows (e.g., a column that showed up
+        in a later chunk, or missing in a chunk)
+        """
+        if rows > self.rows:
+            self.extend([None] * (rows - self.rows))
+
+    def dtype(self):
+        if self.kind == "string":
+            return "<U" + str(self.width)
+        if self.nulls and self.kind in ("integer", "boolean", "time"):
+            return "<f8"
+        return KINDS[self.kind][1]
+
+    def write(self, archive):
+        """Writes the column as <name>.npy into the archive
+
+        Arguments:
+            archive {zipfile.ZipFile} -- The .npz archive
+        """
+        self._file.close()
+        self._mask.close()
+        dtype = self.dtype()
+
+        with archive.open(self.name + ".npy", "w", force_zip64=True) as fp:
+            fp.write(npy_header(dtype, self.rows))
+
+            if self.kind == "string":
+                self._write_strings(fp)
+            elif dtype != KINDS[self.kind][1]:
+                self._write_floats(fp)
+            else:
+                with open(self.path, "rb") as source:
+                    shutil.copyfileobj(source, fp, IO_SIZE)
+
+        os.remove(self.path)
+        os.remove(self.mask_path)
+
+    def _write_strings(self, fp):
+        # Fixed width UTF-32 (little-endian) strings, as NumPy <U
+        width = self.width * 4
+        with open(self.path, "rb") as source:
+            while True:
+                size = source.read(4)
+                if not size:
+                    break
+                (length,) = struct.unpack("<I", size)
+                value = source.read(length).decode("utf-8").encode("utf-32-le")
+                fp.write(value.ljust(width, b"\x00"))
+
+    def _write_floats(self, fp):
+        typecode = KINDS[self.kind][0]
+        itemsize = array(typecode).itemsize
+        rows = IO_SIZE // 8
+
+        with open(self.path, "rb") as source, open(self.mask_path, "rb") as mask:
+            while True:
+                data = array(typecode)
+                data.frombytes(source.read(rows * itemsize))
+                if not data:
+                    break
+                if sys.byteorder == "big":
+                    data.byteswap()
+
+                valid = mask.read(len(data))
+                floats = array(
+                    "d",
+                    [
+                        float(value) if valid[index] else NAN
+                        for index, value in enumerate(data)
+                    ],
+                )
+                if sys.byteorder == "big":
+                    floats.byteswap()
+                fp.write(floats.tobytes())
+
+
+class Table:
+    """Table (e.g., a measurement) exported into a compressed .npz
+    file, one 1-D array per column, appended in chunks of rows
+    """
+
+    def __init__(self, path, kinds=None):
+        self.path = path
+        self.kinds = kinds or {}
+        self.rows = 0
+        self.columns = {}
+        self._folder = tempfile.mkdtemp(prefix="umbra-export-")
+
+    def append(self, columns, values):
+        """Appends a chunk of rows
+
+        Arguments:
+            columns {list} -- Names of the columns
+            values {list} -- Rows, lists of values in the order of columns
+        """
+        for index, name in enumerate(columns):
+            column = self.columns.get(name)
+            if column is None:
+                column = Column(self._folder, name, self.kinds.get(name, "string"))
+                column.pad(self.rows)
+                self.columns[name] = column
+
+            column.extend([row[index] for row in values])
+
+        self.rows += len(values)
+        for column in self.columns.values():
+            column.pad(self.rows)
+
+    def close(self):
+        """Writes the .npz file
+
+        Returns:
+            dict -- The table entry of the manifest (file, rows, columns dtypes)
+        """
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for column in self.columns.values():
+                column.write(archive)
+
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+        entry = {
+            "file": os.path.basename(self.path),
+            "rows": self.rows,
+            "columns": {name: column.dtype() for name, column in self.columns.items()},
+        }
+        return entry
+
+
+class Exporter:
+    """Exports the measurements of environment databases (InfluxDB),
+    and the events results, into compressed columnar files: one NumPy
+    .npz per measurement (a 1-D array per column), described in a JSON
+    manifest. Measurements are queried in chunks of chunk_size points
+    and appended to the columns on disk, so memory stays bounded.
+
+    A measurement is loaded with numpy.load(path) (or into pandas with
+    pandas.DataFrame(dict(numpy.load(path))))
+
+    The tables are written (files spooling and compression) in the loop
+    default executor, so the broker loop is not blocked while exporting.
+    """
+
+    CHUNK_SIZE = 10000
+
+    def __init__(self, client, folder, chunk_size=CHUNK_SIZE):
+        self.client = client
+        self.folder = folder
+        self.chunk_size = chunk_size
+
+    async def measurements(self, database):
+        results = await self.client.query("SHOW MEASUREMENTS", database=database)
+        series = results[0].get("series", []) if results else []
+        values = series[0].get("values", []) if series else []
+        return [value[0] for value in values]
+
+    async def kinds(self, database, measurement):
+        """Kinds of the columns of a measurement (time, tags and fields types)
+
+        Returns:
+            dict -- Kind (e.g., float, integer, string) indexed by column name
+        """
+        kinds = {"time": "time"}
+        name = measurement.replace('"', '\\"')
+
+        results = await self.client.query(
+            f'SHOW FIELD KEYS FROM "{name}"', database=database
+        )
+        for series in results[0].get("series", []) if results else []:
+            for key, kind in series.get("values", []):
+                kinds[key] = kind
+
+        return kinds
+
+    async def export_measurement(self, database, measurement, folder):
+        loop = asyncio.get_event_loop()
+        kinds = await self.kinds(database, measurement)
+        path = os.path.join(folder, filename(measurement) + ".npz")
+        table = Table(path, kinds)
+        name = measurement.replace('"', '\\"')
+
+        query = f'SELECT * FROM "{name}"'
+        async for series in self.client.query_chunks(
+            query, database=database, chunk_size=self.chunk_size
+        ):
+            await loop.run_in_executor(
+                None,
+                table.append,
+                series.get("columns", []),
+                series.get("values", []),
+            )
+
+        entry = await loop.run_in_executor(None, table.close)
+        entry["measurement"] = measurement
+        logger.info(f"Exported {database} {measurement} - {entry['rows']} rows")
+        return entry
+
+    async def export_database(self, database):
+        folder = os.path.join(self.folder, filename(database))
+        os.makedirs(folder, exist_ok=True)
+
+        entries = []
+        for measurement in await self.measurements(database):
+            entry = await self.export_measurement(database, measurement, folder)
+            entry["file"] = os.path.join(filename(database), entry["file"])
+            entries.append(entry)
+
+        return entries
+
+    def export_results(self, results):
+        """Exports events results (e.g., Results.get() of each event)
+        as events.npz, with columns event, index and result (JSON)
+
+        Arguments:
+            results {dict} -- Lists of results indexed by event id
+
+        Returns:
+            dict -- The table entry of the manifest
+        """
+        path = os.path.join(self.folder, "events.npz")
+        kinds = {"event": "string", "index": "integer", "result": "string"}
+        table = Table(path, kinds)
+        columns = ["event", "index", "result"]
+
+        for event, event_results in results.items():
+            rows = [
+                [str(event), index, json.dumps(result, default=str)]
+                for index, result in enumerate(event_results)
+            ]
+            table.append(columns, rows)
+
+        return table.close()
+
+    async def run(self, databases, results=None, name=""):
+        """Exports the databases measurements and the events results,
+        writing manifest.json in folder
+
+        Arguments:
+            databases {list} -- Names of the databases (environments)
+
+        Keyword Arguments:
+            results {dict} -- Lists of events results indexed by event id (default: {None})
+            name {string} -- Name of the experiment (default: {""})
+
+        Returns:
+            dict -- The manifest
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        manifest = {
+            "experiment": name,
+            "format": "npz",
+            "created": datetime.now().isoformat(),
+            "databases": {},
+        }
+
+        for database in databases:
+            manifest["databases"][database] = await self.export_database(database)
+
+        if results is not None:
+            loop = asyncio.get_event_loop()
+            manifest["events"] = await loop.run_in_executor(
+                None, self.export_results, results
+            )
+
+        with open(os.path.join(self.folder, "manifest.json"), "w") as fp:
+            json.dump(manifest, fp, indent=2)
+
+        return manifest
@@ -0,0 +1,472 @@
+import sys
+import gzip
+import math
+import json
+import time
+import logging
+
+import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+
+MEASUREMENT_ESCAPES = str.maketrans({",": "\\,", " ": "\\ "})
+KEY_ESCAPES = str.maketrans({",": "\\,", " ": "\\ ", "=": "\\="})
+STRING_ESCAPES = str.maketrans({'"': '\\"', "\\": "\\\\"})
+
+
+def encode_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value) + "i"
+    if isinstance(value, float):
+        return repr(value)
+    return '"' + str(value).translate(STRING_ESCAPES) + '"'
+
+
+def finite(value):
+    # NaN and infinite floats are not valid line protocol values
+    return not isinstance(value, float) or math.isfinite(value)
+
+
+def encode_point(point):
+    """Encodes a point (dict with measurement, tags, fields and
+    optionally time) into an InfluxDB line protocol line
+
+    Arguments:
+        point {dict} -- The point
+
+    Returns:
+        string -- The line, or None if the point has no fields
+    """
+    fields = ",".join(
+        str(key).translate(KEY_ESCAPES) + "=" + encode_value(value)
+        for key, value in point.get("fields", {}).items()
+        if value is not None and finite(value)
+    )
+
+    if not fields:
+        return None
+
+    line = str(point.get("measurement")).translate(MEASUREMENT_ESCAPES)
+
+    tags = point.get("tags")
+    if tags:
+        for key in sorted(tags):
+            value = tags[key]
+            if value is None or value == "":
+                continue
+            line += (
+                ","
+                + str(key).translate(KEY_ESCAPES)
+                + "="
+                + str(value).translate(KEY_ESCAPES)
+            )
+
+    line += " " + fields
+
+    timestamp = point.get("time")
+    if timestamp is not None:
+        line += " " + str(int(timestamp))
+
+    return line
+
+
+def encode(points):
+    """Encodes points into an InfluxDB line protocol body
+
+    Arguments:
+        points {list} -- Points (dicts with measurement, tags, fields)
+        or lines already encoded in line protocol
+
+    Returns:
+        bytes -- The body, one line per point
+    """
+    lines = [
+        point if isinstance(point, str) else encode_point(point) for point in points
+    ]
+    body = "\n".join(line for line in lines if line is not None)
+    return body.encode("utf-8")
+
+
+class StatsEncoder:
+    """Encodes the measurements of a Stats message (protobuf) straight
+    into line protocol lines, without building intermediate dicts.
+    The escaped measurement names, tags and field keys are cached as
+    interned strings, as the same ones repeat in every message.
+    """
+
+    def __init__(self, cache=100000):
+        self.cache = cache
+        self._names = {}
+        self._tags = {}
+        self._keys = {}
+
+    def _store(self, table, key, value):
+        if len(table) >= self.cache:
+            table.clear()
+        value = sys.intern(value)
+        table[key] = value
+        return value
+
+    def name(self, name):
+        escaped = self._names.get(name)
+        if escaped is None:
+            escaped = self._store(
+                self._names, name, name.translate(MEASUREMENT_ESCAPES)
+            )
+        return escaped
+
+    def tag(self, key, value):
+        escaped = self._tags.get((key, value))
+        if escaped is None:
+            escaped = self._store(
+                self._tags,
+                (key, value),
+                "," + key.translate(KEY_ESCAPES) + "=" + value.translate(KEY_ESCAPES),
+            )
+        return escaped
+
+    def key(self, key):
+        escaped = self._keys.get(key)
+        if escaped is None:
+            escaped = self._store(self._keys, key, key.translate(KEY_ESCAPES) + "=")
+        return escaped
+
+    def field(self, field):
+        """Encodes the value of a field
+
+        Arguments:
+            field {Field} -- The Field protobuf message
+
+        Raises:
+            ValueError: If the value is invalid (e.g., NaN float)
+
+        Returns:
+            string -- The encoded value
+        """
+        number = field.WhichOneof("number")
+        if number == "double_value":
+            return self.double(field.double_value)
+        if number == "int_value":
+            return str(field.int_value) + "i"
+
+        ftype = field.type
+        value = field.value
+
+        if ftype == "int":
+            return str(int(value)) + "i"
+        if ftype == "float":
+            return self.double(float(value))
+        return '"' + value.translate(STRING_ESCAPES) + '"'
+
+    def double(self, value):
+        if not math.isfinite(value):
+            raise ValueError(f"Not a finite float {value}")
+        return repr(value)
+
+    def series_tags(self, series, environment):
+        tags = [
+            (key, value)
+            for key, value in series.tags.items()
+            if value and key != "environment"
+        ]
+        if environment:
+            tags.append(("environment", environment))
+        tags.sort()
+
+        prefix = self.name(series.name)
+        for key, value in tags:
+            prefix += self.tag(key, value)
+        return prefix
+
+    def encode_series(self, series, environment):
+        """Encodes a Series (packed samples of a measurement),
+        one line per sample timestamp
+
+        Arguments:
+            series {Series} -- The Series protobuf message
+            environment {string} -- Name of the environment
+
+        Returns:
+            list -- Line protocol lines
+        """
+        prefix = self.series_tags(series, environment) + " "
+        timestamps = series.timestamps
+        samples = len(timestamps)
+
+        columns = []
+        for column in series.columns:
+            key = self.key(column.name)
+            if len(column.doubles) == samples:
+                # NaN marks a sample without the field (infinities are skipped)
+                values = [
+                    key + repr(v) if math.isfinite(v) else None for v in column.doubles
+                ]
+                columns.append(values)
+            elif len(column.ints) == samples:
+                columns.append([key + str(v) + "i" for v in column.ints])
+            else:
+                logger.debug(f"Series {series.name} column {column.name} skipped")
+
+        lines = []
+        for index in range(samples):
+            fields = ",".join(
+                values[index] for values in columns if values[index] is not None
+            )
+            if fields:
+                lines.append(prefix + fields + " " + str(timestamps[index]))
+
+        return lines
+
+    def encode(self, message, environment, timestamp=None):
+        """Encodes the measurements (and series) of a Stats message,
+        tagged with environment (as Collector.parse_message formats them)
+
+        Arguments:
+            message {Stats} -- The Stats protobuf message
+            environment {string} -- Name of the environment
+
+        Keyword Arguments:
+            timestamp {int} -- Time (ms) of the points (default: {None}, now)
+
+        Returns:
+            list -- Line protocol lines, one per measurement with fields
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        suffix = " " + str(timestamp)
+        environment_tag = ("environment", environment)
+        lines = []
+
+        for measurement in message.measurements:
+            fields = []
+            for key, field in measurement.fields.items():
+                try:
+                    fields.append(self.key(key) + self.field(field))
+                except ValueError:
+                    logger.debug(f"Invalid field {key} value {field.value}")
+
+            if not fields:
+                continue
+
+            tags = [
+                (key, value)
+                for key, value in measurement.tags.items()
+                if value and key != "environment"
+            ]
+            if environment:
+                tags.append(environment_tag)
+            tags.sort()
+
+            line = self.name(measurement.name)
+            for key, value in tags:
+                line += self.tag(key, value)
+            line += " " + ",".join(fields) + suffix
+
+            lines.append(line)
+
+        for series in message.series:
+            lines.extend(self.encode_series(series, environment))
+
+        return lines
+
+
+class InfluxError(Exception):
+    """Error of a query or write, with the HTTP status of
+    its response (None if the error was in its results)
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class InfluxClient:
+    """Asyncio InfluxDB (1.x HTTP API) client, writing points
+    in line protocol through a persistent pool of connections
+    """
+
+    def __init__(
+        self,
+        host,
+        port=8086,
+        user=None,
+        password=None,
+        database=None,
+        compress=True,
+        connections=8,
+        timeout=30,
+    ):
+        self.url = "http://" + host + ":" + str(port)
+        self.user = user
+        self.password = password
+        self.database = database
+        self.compress = compress
+        self.connections = connections
+        self.timeout = timeout
+        self._session = None
+
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connections)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout
+            )
+        return self._session
+
+    async def close(self):
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def params(self, **kwargs):
+        params = {k: v for k, v in kwargs.items() if v is not None}
+        if self.user:
+            params["u"] = self.user
+            params["p"] = self.password
+        return params
+
+    async def query(self, query, database=None, method="GET"):
+        """Executes a query
+
+        Arguments:
+            query {string} -- The InfluxQL query
+
+        Keyword Arguments:
+            database {string} -- Name of the database (default: {None})
+            method {string} -- HTTP method, POST for management
+            queries (default: {"GET"})
+
+        Raises:
+            InfluxError: If the query failed
+
+        Returns:
+            list -- The results of the query statements
+        """
+        url = self.url + "/query"
+        params = self.params(q=query, db=database)
+
+        async with self.session().request(method, url, params=params) as resp:
+            reply = await resp.json(content_type=None)
+
+            if resp.status != 200:
+                raise InfluxError(
+                    f"Query failed - status {resp.status} - {reply}", resp.status
+                )
+
+        results = reply.get("results", [])
+        for result in results:
+            if "error" in result:
+                raise InfluxError(f"Query failed - {result.get('error')}")
+
+        return results
+
+    async def query_chunks(self, query, database=None, chunk_size=10000, epoch="ms"):
+        """Executes a query with chunked responses, so its series are
+        streamed (and not loaded all at once)
+
+        Arguments:
+            query {string} -- The InfluxQL query
+
+        Keyword Arguments:
+            database {string} -- Name of the database (default: {None})
+            chunk_size {int} -- Points per chunk (default: {10000})
+            epoch {string} -- Precision of timestamps (default: {"ms"})
+
+        Raises:
+            InfluxError: If the query failed
+
+        Yields:
+            dict -- Series (name, columns, values) of each chunk
+        """
+        url = self.url + "/query"
+        params = self.params(
+            q=query, db=database, chunked="true", chunk_size=chunk_size, epoch=epoch
+        )
+
+        async with self.session().get(url, params=params) as resp:
+            if resp.status != 200:
+                reply = await resp.text()
+                raise InfluxError(
+                    f"Query failed - status {resp.status} - {reply}", resp.status
+                )
+
+            # Chunks are JSON documents separated by new lines
+            buffer = b""
+            async for data in resp.content.iter_any():
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+
+                for line in lines:
+                    for series in self._chunk_series(line):
+                        yield series
+
+            for series in self._chunk_series(buffer):
+                yield series
+
+    def _chunk_series(self, line):
+        if not line.strip():
+            return []
+
+        chunk = json.loads(line)
+        series = []
+
+        for result in chunk.get("results", []):
+            if "error" in result:
+                raise InfluxError(f"Query failed - {result.get('error')}")
+            series.extend(result.get("series", []))
+
+        return series
+
+    async def get_list_database(self):
+        results = await self.query("SHOW DATABASES")
+        series = results[0].get("series", []) if results else []
+        values = series[0].get("values", []) if series else []
+        databases = [{"name": value[0]} for value in values]
+        return databases
+
+    async def create_database(self, dbname):
+        await self.query(f'CREATE DATABASE "{dbname}"', method="POST")
+
+    async def drop_database(self, dbname):
+        await self.query(f'DROP DATABASE "{dbname}"', method="POST")
+
+    async def write_points(self, points, database=None, time_precision="ms"):
+        """Writes points in line protocol
+
+        Arguments:
+            points {list} -- Points (dicts with measurement, tags, fields)
+            or lines already encoded in line protocol
+
+        Keyword Arguments:
+            database {string} -- Name of the database (default: {None})
+            time_precision {string} -- Precision of points time (default: {"ms"})
+
+        Raises:
+            InfluxError: If the write failed
+        """
+        body = encode(points)
+        if not body:
+            return
+
+        headers = {"Content-Type": "application/octet-stream"}
+        if self.compress:
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+
+        url = self.url + "/write"
+        params = self.params(db=database or self.database, precision=time_precision)
+
+        async with self.session().post(
+            url, params=params, data=body, headers=headers
+        ) as resp:
+            if resp.status != 204:
+                reply = await resp.text()
+                raise InfluxError(
+                    f"Write failed - status {resp.status} - {reply}", resp.status
+                )
@@ -3,6 +3,7 @@ import asyncio
 import logging
 
 from umbra.common.protobuf.umbra_grpc import BrokerBase
+from umbra.common.protobuf.umbra_pb2 import Status
 from umbra.broker.operator import Operator
 from umbra.broker.collector import Collector
 
@@ -14,8 +15,8 @@ logging.getLogger("hpack").setLevel(logging.WARNING)
 class Broker(BrokerBase):
     def __init__(self, info):
         self.info = info
-        self.operator = Operator(info)
         self.collector = Collector(info)
+        self.operator = Operator(info, self.collector)
 
     async def Execute(self, stream):
         request = await stream.recv_message()
@@ -26,3 +27,19 @@ class Broker(BrokerBase):
         request = await stream.recv_message()
         reply = await self.collector.collect(request)
         await stream.send_message(reply)
+
+    async def CollectStream(self, stream):
+        async for request in stream:
+            try:
+                reply = await self.collector.collect(request)
+            except Exception as e:
+                logger.debug(f"Exception in collect stream: {repr(e)}")
+                reply = Status(info=str(False).encode("utf-8"), error=repr(e))
+
+            reply.id = str(request.sequence)
+            await stream.send_message(reply)
+
+    async def Recent(self, stream):
+        request = await stream.recv_message()
+        reply = self.collector.recent_query(request)
+        await stream.send_message(reply)
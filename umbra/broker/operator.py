@@ -1,3 +1,4 @@
+import os
 import logging
 import json
 import asyncio
@@ -13,6 +14,7 @@ from umbra.common.protobuf.umbra_grpc import ScenarioStub, MonitorStub
 from umbra.common.protobuf.umbra_pb2 import Report, Workflow, Directrix, Status
 
 from umbra.common.scheduler import Handler
+from umbra.common import sketch
 from umbra.design.basis import Topology, Experiment
 
 from umbra.broker.plugins.scenario import ScenarioEvents
@@ -20,12 +22,16 @@ from umbra.broker.plugins.scenario import ScenarioEvents
 from umbra.broker.plugins.fabric import FabricEvents
 from umbra.broker.plugins.iroha import IrohaEvents
 
+from umbra.broker.workers import Workers
+
 logger = logging.getLogger(__name__)
 
 
 class Operator:
-    def __init__(self, info):
+    def __init__(self, info, collector=None):
         self.info = info
+        self.collector = collector
+        self.scenario = None
         self.experiment = None
         self.topology = None
         self.plugins = {}
@@ -96,9 +102,26 @@ class Operator:
 
     def build_monitor_directrix(self, env, info, action):
 
+        links = {}
+        ports = {}
+        ports_links = {}
+
         if action == "start":
-            hosts = info.get("topology").get("hosts")
+            topology = info.get("topology")
+            hosts = topology.get("hosts")
             targets = repr(set(hosts.keys()))
+
+            # Interfaces of the links (e.g., peer0:eth1) tagged with the link
+            for name, link in topology.get("links", {}).items():
+                links[link.get("src") + ":" + link.get("src-port")] = name
+                links[link.get("dst") + ":" + link.get("dst-port")] = name
+
+            # Switches interfaces (e.g., s1-eth1) and their port numbers
+            for switch, switch_info in topology.get("switches", {}).items():
+                for intf, port in switch_info.get("intfs", {}).items():
+                    ports[intf] = (switch, port)
+                    if switch + ":" + intf in links:
+                        ports_links[intf] = links[switch + ":" + intf]
         else:
             targets = repr(set())
 
@@ -120,6 +143,40 @@ class Operator:
                     },
                     "schedule": {},
                 },
+                {
+                    "id": 3,
+                    "name": "network",
+                    "parameters": {
+                        "targets": targets,
+                        "links": repr(links),
+                        "duration": "3600",
+                        "interval": "5",
+                    },
+                    "schedule": {},
+                },
+                {
+                    "id": 4,
+                    "name": "switch",
+                    "parameters": {
+                        "ports": repr(ports),
+                        "links": repr(ports_links),
+                        "duration": "3600",
+                        "interval": "5",
+                    },
+                    "schedule": {},
+                },
+                {
+                    "id": 5,
+                    "name": "queue",
+                    "parameters": {
+                        "targets": targets,
+                        "ports": repr(ports),
+                        "links": repr(links),
+                        "duration": "3600",
+                        "interval": "5",
+                    },
+                    "schedule": {},
+                },
                 {
                     "id": 2,
                     "name": "host",
@@ -225,6 +282,7 @@ class Operator:
             scenario = self.parse_bytes(scenario_message)
             self.experiment = Experiment("tmp")
             self.experiment.parse(scenario)
+            self.scenario = scenario_message
             topology = self.experiment.get_topology()
             topology.build()
             self.topology = topology
@@ -286,6 +344,9 @@ class Operator:
             elif action == "stop":
                 info, error = await self.stop(uid)
 
+            elif action == "export":
+                info, error = await self.export()
+
             else:
                 error = {
                     "Execution error": f"Unkown action ({action}) to execute config"
@@ -326,6 +387,121 @@ class Operator:
         self.events_scenario.config(self.topology)
         self.plugins["scenario"] = self.events_scenario
 
+    def config_limits(self):
+        limits = self.experiment.limits
+
+        for name, limit in limits.items():
+            logger.info(f"Configuring events limit {name}: {limit}")
+            self.events_handler.limit(
+                name,
+                limit.get("inflight"),
+                policy=limit.get("policy", "queue"),
+                queue=limit.get("queue", 0),
+            )
+
+    def config_results(self):
+        name = self.experiment.name or "experiment"
+        folder = os.path.join("/tmp/umbra/results/", name)
+        logger.info(f"Events results spill folder: {folder}")
+        self.events_handler.results.spill(folder)
+
+    def events_results_all(self):
+        """All the results of the events iterations, including the ones
+        spilled (e.g., by workers) to the results folder
+
+        Returns:
+            dict -- Lists of results indexed by event id
+        """
+        results = self.events_handler.results
+        uids = dict.fromkeys(results.uids() + list(self.events_results))
+
+        all_results = {}
+        for uid in uids:
+            uid_results = results.get(uid, spilled=True)
+            if not uid_results and self.events_results.get(uid):
+                # Results not spilled by a worker, only the last one is known
+                uid_results = [self.events_results[uid]]
+            all_results[uid] = uid_results
+
+        return all_results
+
+    async def export(self):
+        """Exports the experiment telemetry (the measurements of the
+        environments databases and the events results) into columnar
+        files, in the folder /tmp/umbra/export/<experiment name>
+
+        Returns:
+            tuple -- (info, error) dicts, info with the export manifest
+        """
+        info, error = {}, {}
+
+        if not self.collector:
+            error = {"Export error": "No collector to export measurements from"}
+            return info, error
+
+        name = self.experiment.name or "experiment"
+        folder = os.path.join("/tmp/umbra/export/", name)
+        databases = list(self.topology.get_environments().keys())
+
+        try:
+            manifest = await self.collector.export(
+                folder, databases, results=self.events_results_all(), name=name
+            )
+        except Exception as e:
+            logger.info(f"Could not export experiment {name} - {repr(e)}")
+            error = {"Export error": repr(e)}
+        else:
+            logger.info(f"Experiment {name} exported to {folder}")
+            info = {"folder": folder, "manifest": manifest}
+
+        return info, error
+
+    def save_sketches(self):
+        """Saves the events latency sketches into the experiment results
+        folder, one file per run, so the runs can be merged (sketch.load())
+        """
+        folder = self.events_handler.results.folder
+        sketches = self.events_handler.sketches()
+
+        if not folder or not sketches:
+            return
+
+        filename = "sketches-" + datetime.now().strftime("%Y%m%d%H%M%S") + ".json"
+        filepath = os.path.join(folder, filename)
+
+        try:
+            sketch.save(filepath, sketches)
+        except OSError as e:
+            logger.info(f"Could not save events sketches {filepath} - {repr(e)}")
+        else:
+            logger.info(f"Events latency sketches saved: {filepath}")
+
+    def event_node(self, event):
+        node = event.get("node") or event.get("target")
+        if not node and event.get("peers"):
+            node = ",".join(sorted(event.get("peers")))
+        return node or event.get("org") or ""
+
+    def label_events(self, category, events, sched_evs):
+        limits = self.experiment.limits
+
+        for event in events:
+            ev_id = event.get("id")
+
+            if ev_id in sched_evs:
+                action = event.get("event", {}).get("action")
+                call, sched = sched_evs[ev_id]
+
+                labels = [category, category + ":" + str(action)]
+                sched = dict(sched)
+                sched["labels"] = labels
+                sched["node"] = self.event_node(event.get("event", {}))
+                if limits:
+                    sched["limits"] = labels
+                sched_evs[ev_id] = (call, sched)
+
+        return sched_evs
+
     async def handle_events(self, events):
         events_calls = {}
 
@@ -333,16 +509,67 @@ class Operator:
             evs_formatted = {ev_id: ev for ev_id, ev in evs.items()}
             events_calls.update(evs_formatted)
 
-        self.events_results = await self.events_handler.run(events_calls)
+        reporter = asyncio.create_task(self.report_timings())
 
-    def schedule_plugins(self):
+        try:
+            self.events_results = await self.events_handler.run(events_calls)
+        finally:
+            reporter.cancel()
+            await self.flush_timings()
+            self.save_sketches()
+
+        limits = self.events_handler.limits()
+        if limits:
+            logger.info(f"Events limits: {limits}")
+
+    async def flush_timings(self):
+        timings = self.events_handler.timings()
+        logger.debug(f"Events timings: {timings}")
+
+        if timings and self.collector:
+            await self.collector.timings(timings)
+
+    async def report_timings(self, interval=5):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_timings()
+
+    async def handle_workers(self, workers):
+        events = self.experiment.events.get()
+        events_ids = [event.get("id") for event in events.values()]
+
+        dependencies = {}
+        for event in events.values():
+            after = event.get("schedule", {}).get("after", [])
+            after = after if isinstance(after, list) else [after]
+            dependencies[event.get("id")] = after
+
+        logger.info(f"Executing events in {workers} workers")
+        pool = Workers(self.info, workers)
+        self.events_results, timings = await pool.run(
+            self.scenario, events_ids, dependencies
+        )
+
+        for worker_timings in timings:
+            self.events_handler.merge_timings(worker_timings)
+
+        await self.flush_timings()
+        self.config_results()
+        self.save_sketches()
+
+    def schedule_plugins(self, events_ids=None):
         sched_events = {}
 
         for name, plugin in self.plugins.items():
             logger.info("Scheduling plugin %s events", name)
             events = self.experiment.events.get_by_category(name)
+
+            if events_ids is not None:
+                events = [ev for ev in events if ev.get("id") in events_ids]
+
             logger.info(f"Scheduling {len(events)} events: {events}")
             plugin_sched_evs = plugin.schedule(events)
+            plugin_sched_evs = self.label_events(name, events, plugin_sched_evs)
             sched_events[plugin] = plugin_sched_evs
 
         return sched_events
@@ -356,7 +583,15 @@ class Operator:
         # topo.fill_config(info_topology)
         # topo.fill_hosts_config(info_hosts)
         # self.topology = topo
+        workers = self.experiment.workers
+        if workers > 1:
+            coro_workers = self.handle_workers(workers)
+            asyncio.create_task(coro_workers)
+            return
+
         self.config_plugins()
+        self.config_limits()
+        self.config_results()
 
         sched_events = self.schedule_plugins()
         # await self.handle_events(sched_events)
@@ -6,6 +6,8 @@ import logging
 from hfc.fabric import Client
 from hfc.fabric_ca.caservice import CAClient, CAService
 
+from umbra.common.scheduler import EventCall
+
 
 logger = logging.getLogger(__name__)
 
@@ -77,27 +79,27 @@ class FabricEvents:
         action = event.get("action")
 
         if action == "info_network":
-            task = self.event_info_network(event)
+            task = EventCall(self.event_info_network, event)
         if action == "create_channel":
-            task = self.event_create_channel(event)
+            task = EventCall(self.event_create_channel, event)
         if action == "join_channel":
-            task = self.event_join_channel(event)
+            task = EventCall(self.event_join_channel, event)
         if action == "info_channels":
-            task = self.event_info_channels(event)
+            task = EventCall(self.event_info_channels, event)
         if action == "info_channel":
-            task = self.event_info_channel(event)
+            task = EventCall(self.event_info_channel, event)
         if action == "info_channel_config":
-            task = self.event_info_channel_config(event)
+            task = EventCall(self.event_info_channel_config, event)
         if action == "info_channel_chaincodes":
-            task = self.event_info_channel_chaincodes(event)
+            task = EventCall(self.event_info_channel_chaincodes, event)
         if action == "chaincode_install":
-            task = self.event_chaincode_install(event)
+            task = EventCall(self.event_chaincode_install, event)
         if action == "chaincode_instantiate":
-            task = self.event_chaincode_instantiate(event)
+            task = EventCall(self.event_chaincode_instantiate, event)
         if action == "chaincode_invoke":
-            task = self.event_chaincode_invoke(event)
+            task = EventCall(self.event_chaincode_invoke, event)
         if action == "chaincode_query":
-            task = self.event_chaincode_query(event)
+            task = EventCall(self.event_chaincode_query, event)
 
         if task:
             return task
@@ -7,6 +7,8 @@ import binascii
 from iroha.primitive_pb2 import can_set_my_account_detail
 from iroha import Iroha, IrohaCrypto, IrohaGrpc
 
+from umbra.common.scheduler import EventCall
+
 
 logger = logging.getLogger(__name__)
 
@@ -43,25 +45,25 @@ class IrohaEvents:
         action = event.get("action")
 
         if action == "create_domain":
-            task = self.create_domain(event)
+            task = EventCall(self.create_domain, event)
         if action == "create_account":
-            task = self.create_account(event)
+            task = EventCall(self.create_account, event)
         if action == "set_account_detail":
-            task = self.set_account_detail(event)
+            task = EventCall(self.set_account_detail, event)
         if action == "grant_permission":
-            task = self.grant_permission(event)
+            task = EventCall(self.grant_permission, event)
         if action == "create_asset":
-            task = self.create_asset(event)
+            task = EventCall(self.create_asset, event)
         if action == "add_asset_quantity":
-            task = self.add_asset_quantity(event)
+            task = EventCall(self.add_asset_quantity, event)
         if action == "transfer_asset":
-            task = self.transfer_asset(event)
+            task = EventCall(self.transfer_asset, event)
         if action == "get_asset_info":
-            task = self.get_asset_info(event)
+            task = EventCall(self.get_asset_info, event)
         if action == "get_account_assets":
-            task = self.get_account_assets(event)
+            task = EventCall(self.get_account_assets, event)
         if action == "get_account_detail":
-            task = self.get_account_detail(event)
+            task = EventCall(self.get_account_detail, event)
 
         if task:
             return task
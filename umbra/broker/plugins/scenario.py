@@ -5,6 +5,7 @@ from grpclib.client import Channel
 
 from umbra.common.protobuf.umbra_grpc import ScenarioStub
 from umbra.common.protobuf.umbra_pb2 import Report, Workflow
+from umbra.common.scheduler import EventCall
 
 
 logger = logging.getLogger(__name__)
@@ -73,7 +74,7 @@ class ScenarioEvents:
 
             if address:
                 logger.info(f"Scheduling scenario event {event} to address {address}")
-                action_call = self.call_scenario(address, event)
+                action_call = EventCall(self.call_scenario, address, event)
                 evs_sched[ev_id] = (action_call, event.get("schedule"))
             else:
                 logger.info(
@@ -0,0 +1,205 @@
+import math
+import logging
+from array import array
+
+from umbra.common.protobuf.umbra_pb2 import Stats
+from umbra.broker.rollup import samples
+
+
+logger = logging.getLogger(__name__)
+
+
+NAN = float("nan")
+
+
+class Ring:
+    """Fixed size ring of the latest samples of a series: timestamps
+    and the values of each field kept in parallel arrays of doubles
+    (NaN where a sample has no value for a field)
+    """
+
+    __slots__ = ("size", "times", "columns", "head", "count")
+
+    def __init__(self, size):
+        self.size = size
+        self.times = array("d", [0.0]) * size
+        self.columns = {}
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, values):
+        index = self.head
+        self.times[index] = timestamp
+
+        for field, column in self.columns.items():
+            column[index] = values.get(field, NAN)
+
+        for field, value in values.items():
+            if field not in self.columns:
+                column = self.columns[field] = array("d", [NAN]) * self.size
+                column[index] = value
+
+        self.head = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def indexes(self, window=0):
+        """Indexes of the samples, oldest first
+
+        Keyword Arguments:
+            window {float} -- Seconds before the latest sample (default: {0}, all)
+
+        Returns:
+            list -- The indexes
+        """
+        start = (self.head - self.count) % self.size
+        indexes = [(start + offset) % self.size for offset in range(self.count)]
+
+        if window > 0 and indexes:
+            since = self.times[indexes[-1]] - window * 1000
+            indexes = [index for index in indexes if self.times[index] >= since]
+
+        return indexes
+
+    def latest(self):
+        if not self.count:
+            return None
+        return (self.head - 1) % self.size
+
+
+class Recent:
+    """Bounded in-memory store of the recent samples collected, one
+    Ring of size samples per series (environment, measurement, tags).
+    At most max_series are kept, evicting the least recently created.
+    Queries (see Query message) read the latest values, stats over a
+    window or the samples themselves, replied as a Stats message.
+    """
+
+    def __init__(self, size=600, max_series=10000):
+        self.size = size
+        self.max_series = max_series
+        self._rings = {}
+        self.counters = {"samples": 0, "evicted": 0}
+
+    def add(self, environment, name, tags, timestamp, values):
+        """Adds a sample of a series
+
+        Arguments:
+            environment {string} -- Name of the environment
+            name {string} -- Name of the measurement
+            tags {tuple} -- Sorted (key, value) tags of the measurement
+            timestamp {int} -- Time of the sample (ms)
+            values {dict} -- Numeric values of the sample fields
+        """
+        key = (environment, name, tags)
+        ring = self._rings.get(key)
+
+        if ring is None:
+            if len(self._rings) >= self.max_series:
+                del self._rings[next(iter(self._rings))]
+                self.counters["evicted"] += 1
+            ring = self._rings[key] = Ring(self.size)
+
+        ring.append(timestamp, values)
+        self.counters["samples"] += 1
+
+    def add_samples(self, environment, samples):
+        for name, tags, timestamp, values in samples:
+            self.add(environment, name, tags, timestamp, values)
+
+    def add_stats(self, message, environment, timestamp):
+        self.add_samples(environment, samples(message, timestamp))
+
+    def match(self, query):
+        """Series matching a query environment, measurement and
+        tags (a series matches if it has all the query tags)
+
+        Arguments:
+            query {Query} -- The Query protobuf message
+
+        Returns:
+            list -- Tuples of (name, tags, ring)
+        """
+        query_tags = set(query.tags.items())
+        matches = []
+
+        for (environment, name, tags), ring in self._rings.items():
+            if query.environment and environment != query.environment:
+                continue
+            if query.measurement and name != query.measurement:
+                continue
+            if query_tags and not query_tags.issubset(tags):
+                continue
+            matches.append((name, tags, ring))
+
+        return matches
+
+    def query(self, query):
+        """Reads the recent samples of the series matching query.
+        For kind latest (default) a series with the latest sample,
+        for series a series with the samples in the query window,
+        and for stats a measurement with <field>_count/_mean/_min/
+        _max/_last of the samples in the query window
+
+        Arguments:
+            query {Query} -- The Query protobuf message
+
+        Returns:
+            Stats -- The Stats message with the series/measurements
+        """
+        reply = Stats(environment=query.environment, source="broker", version=2)
+        kind = query.kind or "latest"
+        wanted = set(query.fields)
+
+        for name, tags, ring in self.match(query):
+            if kind == "latest":
+                indexes = [ring.latest()]
+            else:
+                indexes = ring.indexes(query.window)
+
+            fields = [
+                (field, column)
+                for field, column in ring.columns.items()
+                if not wanted or field in wanted
+            ]
+
+            if kind == "stats":
+                self.format_stats(reply, name, tags, indexes, fields)
+            else:
+                self.format_series(reply, name, tags, ring, indexes, fields)
+
+        return reply
+
+    def format_series(self, reply, name, tags, ring, indexes, fields):
+        series = reply.series.add(name=name)
+        series.tags.update(dict(tags))
+        series.timestamps.extend(int(ring.times[index]) for index in indexes)
+
+        for field, column in fields:
+            series.columns.add(name=field, doubles=[column[i] for i in indexes])
+
+    def format_stats(self, reply, name, tags, indexes, fields):
+        measurement = reply.measurements.add(name=name)
+        measurement.tags.update(dict(tags))
+
+        for field, column in fields:
+            values = [column[i] for i in indexes if not math.isnan(column[i])]
+            if not values:
+                continue
+
+            stats = {
+                "count": float(len(values)),
+                "mean": sum(values) / len(values),
+                "min": min(values),
+                "max": max(values),
+                "last": values[-1],
+            }
+            for stat, value in stats.items():
+                key = field + "_" + stat
+                measurement.fields[key].name = key
+                measurement.fields[key].double_value = value
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["series"] = len(self._rings)
+        return stats
@@ -0,0 +1,354 @@
+import logging
+
+from umbra.common.histogram import Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+def label(resolution):
+    """Label of a resolution, e.g., 10s, 1m, 10m, 1h
+
+    Arguments:
+        resolution {int} -- Resolution in seconds
+
+    Returns:
+        string -- The label
+    """
+    if resolution % 3600 == 0:
+        return str(resolution // 3600) + "h"
+    if resolution % 60 == 0:
+        return str(resolution // 60) + "m"
+    return str(resolution) + "s"
+
+
+def number(field):
+    """Numeric value of a Stats measurement field
+
+    Arguments:
+        field {Measurement.Field} -- The field protobuf message
+
+    Returns:
+        float -- The value, or None if the field is not a number
+    """
+    kind = field.WhichOneof("number")
+    if kind == "double_value":
+        return field.double_value
+    if kind == "int_value":
+        return float(field.int_value)
+
+    if field.type in ("int", "float"):
+        try:
+            return float(field.value)
+        except ValueError:
+            return None
+    return None
+
+
+def samples(message, timestamp):
+    """Numeric samples of the measurements and series of a Stats message
+
+    Arguments:
+        message {Stats} -- The Stats protobuf message
+        timestamp {int} -- Time (ms) of the message measurements
+
+    Returns:
+        list -- Tuples of (name, sorted tags tuple, timestamp (ms), values dict)
+    """
+    output = []
+
+    for measurement in message.measurements:
+        values = {}
+        for key, field in measurement.fields.items():
+            value = number(field)
+            if value is not None:
+                values[key] = value
+
+        if values:
+            output.append((measurement.name, tags(measurement.tags), timestamp, values))
+
+    for series in message.series:
+        series_tags = tags(series.tags)
+        columns = [
+            (column.name, column.doubles or column.ints) for column in series.columns
+        ]
+
+        for index, sample_timestamp in enumerate(series.timestamps):
+            values = {}
+            for name, column in columns:
+                if index < len(column) and column[index] == column[index]:
+                    values[name] = float(column[index])
+
+            if values:
+                output.append((series.name, series_tags, sample_timestamp, values))
+
+    return output
+
+
+def tags(tags):
+    return tuple(sorted((k, v) for k, v in tags.items() if v and k != "environment"))
+
+
+class Window:
+    """Aggregate of the values of a field in a time window"""
+
+    __slots__ = ("count", "total", "min", "max", "last", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.histogram = None
+
+    def add(self, value, precision):
+        self.count += 1
+        self.total += value
+        self.last = value
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if precision is not None and value >= 0:
+            if self.histogram is None:
+                self.histogram = Histogram(unit=1e-6, precision=precision)
+            self.histogram.record(value)
+
+    def merge(self, other):
+        """Adds the values of other (later) window
+
+        Arguments:
+            other {Window} -- The window
+        """
+        self.count += other.count
+        self.total += other.total
+        self.last = other.last
+
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+
+        if other.histogram is not None:
+            if self.histogram is None:
+                self.histogram = Histogram(
+                    unit=other.histogram.unit, precision=other.histogram.precision
+                )
+            self.histogram.merge(other.histogram)
+
+    def fields(self, name, percentiles):
+        fields = {
+            name + "_mean": self.total / self.count,
+            name + "_min": self.min,
+            name + "_max": self.max,
+            name + "_last": self.last,
+        }
+
+        if self.histogram and self.histogram.count == self.count:
+            for percentile in percentiles:
+                key = name + "_p" + format(percentile, "g")
+                fields[key] = float(self.histogram.percentile(percentile))
+
+        return fields
+
+
+class Rollup:
+    """Streaming per-window aggregates (mean/min/max/last and
+    percentiles) of the numeric fields collected, at several
+    resolutions (tiers). Windows are aligned to multiples of the
+    resolution; a window is closed (and its point emitted) when a
+    sample of a later window arrives for the same measurement, or
+    by expire() once the window plus grace seconds is over. Samples
+    are only added into the finest tier, and each window closed is
+    merged into the window of the next (coarser) tier.
+
+    The points of a tier are written into the measurement named
+    <measurement>_<label>, e.g., container_10s, with fields named
+    <field>_<aggregate>, e.g., cpu_percent_p95, and the window start
+    as timestamp.
+    """
+
+    PERCENTILES = [50, 95, 99]
+
+    def __init__(self, resolutions=(10, 60, 600), grace=5, precision=5):
+        self.resolutions = sorted(int(r) for r in resolutions)
+        self.labels = {r: label(r) for r in self.resolutions}
+        self.grace = grace
+        self.precision = precision
+        self._windows = {}
+        self.counters = {"samples": 0, "points": 0, "late": 0}
+
+    def add(self, environment, name, tags, timestamp, values):
+        """Adds a sample of a measurement into the windows of all tiers
+
+        Arguments:
+            environment {string} -- Name of the environment (database)
+            name {string} -- Name of the measurement
+            tags {tuple} -- Sorted (key, value) tags of the measurement
+            timestamp {int} -- Time of the sample (ms)
+            values {dict} -- Numeric values of the sample fields
+
+        Returns:
+            list -- Points (dicts) of the windows closed by the sample
+        """
+        points = []
+        self.counters["samples"] += 1
+
+        if not self.resolutions:
+            return points
+
+        windows = self._open((environment, name, tags, 0), timestamp, points)
+        if windows is None:
+            self.counters["late"] += 1
+            return points
+
+        for field, value in values.items():
+            window = windows.get(field)
+            if window is None:
+                window = windows[field] = Window()
+            window.add(value, self.precision)
+
+        return points
+
+    def _open(self, key, timestamp, points):
+        resolution = self.resolutions[key[3]]
+        start = timestamp - timestamp % (resolution * 1000)
+        current = self._windows.get(key)
+
+        if current is not None:
+            if current[0] == start:
+                return current[1]
+            if start < current[0]:
+                # Late sample of an already closed window
+                return None
+            self._close(key, current, points)
+
+        windows = {}
+        self._windows[key] = (start, windows)
+        return windows
+
+    def _close(self, key, current, points):
+        start, windows = current
+        del self._windows[key]
+        points.append(self.point(key, start, windows))
+
+        level = key[3] + 1
+        if level < len(self.resolutions):
+            coarse = self._open(key[:3] + (level,), start, points)
+
+            if coarse is not None:
+                for field, window in windows.items():
+                    coarse_window = coarse.get(field)
+                    if coarse_window is None:
+                        coarse_window = coarse[field] = Window()
+                    coarse_window.merge(window)
+
+    def add_samples(self, environment, samples):
+        """Adds samples (see samples()) of an environment
+
+        Arguments:
+            environment {string} -- Name of the environment
+            samples {list} -- Tuples of (name, tags, timestamp, values)
+
+        Returns:
+            list -- Points (dicts) of the windows closed
+        """
+        points = []
+        for name, tags, timestamp, values in samples:
+            points.extend(self.add(environment, name, tags, timestamp, values))
+        return points
+
+    def add_stats(self, message, environment, timestamp):
+        """Adds the measurements and series of a Stats message
+
+        Arguments:
+            message {Stats} -- The Stats protobuf message
+            environment {string} -- Name of the environment
+            timestamp {int} -- Time (ms) of the message measurements
+
+        Returns:
+            list -- Points (dicts) of the windows closed
+        """
+        return self.add_samples(environment, samples(message, timestamp))
+
+    def point(self, key, start, windows):
+        environment, name, tags, level = key
+        resolution = self.resolutions[level]
+
+        fields = {"count": max(window.count for window in windows.values())}
+        for field, window in windows.items():
+            fields.update(window.fields(field, self.PERCENTILES))
+
+        point = {
+            "measurement": name + "_" + self.labels[resolution],
+            "tags": dict(tags, environment=environment),
+            "fields": fields,
+            "time": start,
+        }
+        self.counters["points"] += 1
+        return point
+
+    def expire(self, now, flush=False):
+        """Closes the windows over before now (minus grace seconds)
+
+        Arguments:
+            now {int} -- Current time (ms)
+
+        Keyword Arguments:
+            flush {bool} -- Closes all the windows (default: {False})
+
+        Returns:
+            dict -- Points (dicts) of the windows closed, indexed by environment
+        """
+        closed = []
+
+        # Finer windows first, as they are merged into the coarser ones
+        for key in sorted(self._windows, key=lambda key: key[3]):
+            current = self._windows.get(key)
+            if current is None:
+                continue
+
+            end = current[0] + (self.resolutions[key[3]] + self.grace) * 1000
+            if flush or end <= now:
+                self._close(key, current, closed)
+
+        points = {}
+        for point in closed:
+            points.setdefault(point["tags"]["environment"], []).append(point)
+
+        return points
+
+    def tier(self, start, end, max_points=1000, raw=1):
+        """Measurement suffix of the cheapest tier to be read for a
+        time range, i.e., the finest resolution that does not exceed
+        max_points per series in the range (or the coarsest one)
+
+        Arguments:
+            start {float} -- Start of the range (s)
+            end {float} -- End of the range (s)
+
+        Keyword Arguments:
+            max_points {int} -- Points per series wanted at most (default: {1000})
+            raw {float} -- Interval of the raw samples (s) (default: {1})
+
+        Returns:
+            string -- Suffix (e.g., _1m), or "" for the raw points
+        """
+        span = max(end - start, 0)
+
+        if span / raw <= max_points:
+            return ""
+
+        for resolution in self.resolutions:
+            if span / resolution <= max_points:
+                return "_" + self.labels[resolution]
+
+        return "_" + self.labels[self.resolutions[-1]] if self.resolutions else ""
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["windows"] = len(self._windows)
+        return stats
@@ -0,0 +1,205 @@
+import os
+import json
+import asyncio
+import struct
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Spill:
+    """Append-only local log of points that could not be written
+    into the database (e.g., it is down or backlogged), to be replayed
+    in order once it recovers. Records are length-prefixed (4 bytes,
+    big-endian) JSON batches of points, appended to segment files that
+    are rotated at segment_size bytes. A segment is deleted once all its
+    records were replayed, and when the log exceeds max_size bytes its
+    oldest segments are dropped. Appends and replays must not run
+    concurrently (the Writer serializes them in its flushes).
+    """
+
+    HEADER = struct.Struct(">I")
+
+    def __init__(self, folder, segment_size=16 * 2 ** 20, max_size=2 ** 30):
+        self.folder = folder
+        self.segment_size = segment_size
+        self.max_size = max_size
+        self._segments = []
+        self._sizes = {}
+        self._file = None
+        self._cursor = 0
+        self._sequence = 0
+        self.counters = {
+            "spilled": 0,
+            "replayed": 0,
+            "dropped_segments": 0,
+            "dropped_bytes": 0,
+        }
+        self.load()
+
+    def load(self):
+        """Loads the segments left in folder (e.g., by a previous
+        execution), so their records are replayed
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        for filename in sorted(os.listdir(self.folder)):
+            if filename.startswith("spill-") and filename.endswith(".log"):
+                path = os.path.join(self.folder, filename)
+                self._segments.append(path)
+                self._sizes[path] = os.path.getsize(path)
+                sequence = int(filename[len("spill-") : -len(".log")])
+                self._sequence = max(self._sequence, sequence + 1)
+
+        if self._segments:
+            logger.info(
+                f"Spill log {self.folder} - {len(self._segments)} segments"
+                f" - {self.size()} bytes to be replayed"
+            )
+
+    def size(self):
+        return sum(self._sizes.values())
+
+    def pending(self):
+        return self.size() > 0
+
+    def _open(self):
+        filename = "spill-" + str(self._sequence).zfill(10) + ".log"
+        path = os.path.join(self.folder, filename)
+        self._sequence += 1
+        self._file = open(path, "ab")
+        self._segments.append(path)
+        self._sizes[path] = 0
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def append(self, points, database):
+        """Appends a batch of points to the log
+
+        Arguments:
+            points {list} -- Points (dicts with measurement, tags, fields, time)
+            database {string} -- Name of the database
+        """
+        record = json.dumps({"database": database, "points": points}).encode("utf-8")
+
+        if self._file is None:
+            self._open()
+
+        path = self._segments[-1]
+        self._file.write(self.HEADER.pack(len(record)) + record)
+        self._file.flush()
+        self._sizes[path] += self.HEADER.size + len(record)
+        self.counters["spilled"] += len(points)
+
+        if self._sizes[path] >= self.segment_size:
+            self._close()
+
+        while self.size() > self.max_size and len(self._segments) > 1:
+            self._remove(self._segments[0], dropped=True)
+
+    def _remove(self, path, dropped=False):
+        if dropped:
+            logger.info(f"Spill log over {self.max_size} bytes - dropping {path}")
+            self.counters["dropped_segments"] += 1
+            self.counters["dropped_bytes"] += self._sizes[path] - self._cursor
+
+        if self._file and path == self._segments[-1]:
+            self._close()
+
+        self._segments.remove(path)
+        del self._sizes[path]
+        self._cursor = 0
+
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.info(f"Could not remove spill segment {path} - {repr(e)}")
+
+    def read(self, path, offset):
+        """Reads the record of a segment at offset
+
+        Arguments:
+            path {string} -- Path of the segment
+            offset {int} -- Offset of the record
+
+        Returns:
+            tuple -- (offset after record, database, points), or None
+            at the end of the segment (or if it is truncated)
+        """
+        with open(path, "rb") as fp:
+            fp.seek(offset)
+            header = fp.read(self.HEADER.size)
+            if len(header) < self.HEADER.size:
+                return None
+
+            (length,) = self.HEADER.unpack(header)
+            data = fp.read(length)
+
+        if len(data) < length:
+            logger.info(f"Spill segment {path} truncated at {offset}")
+            return None
+
+        record = json.loads(data.decode("utf-8"))
+        position = offset + self.HEADER.size + length
+        return position, record["database"], record["points"]
+
+    async def replay(self, write):
+        """Replays the records of the log in order, deleting the
+        segments fully replayed, until a write fails. Records are read
+        one at a time in the loop default executor, so the loop is not
+        blocked by the file reads (and decoding) of a large log
+
+        Arguments:
+            write {function} -- Coroutine function called as write(points, database),
+            raises an exception if it fails
+
+        Returns:
+            bool -- True if the whole log was replayed, False otherwise
+        """
+        loop = asyncio.get_event_loop()
+
+        while self._segments:
+            path = self._segments[0]
+
+            if path == self._segments[-1]:
+                # Records appended while replaying go to a new segment
+                self._close()
+
+            while True:
+                record = await loop.run_in_executor(None, self.read, path, self._cursor)
+                if record is None:
+                    break
+
+                position, database, points = record
+                try:
+                    await write(points, database)
+                except Exception as e:
+                    logger.debug(
+                        f"Spill replay stopped at {path}:{self._cursor} - {repr(e)}"
+                    )
+                    return False
+
+                if path not in self._sizes:
+                    # Dropped (max_size) while being replayed
+                    break
+
+                self._cursor = position
+                self.counters["replayed"] += len(points)
+
+            if path in self._sizes:
+                self._remove(path)
+            else:
+                self._cursor = 0
+
+        logger.info(f"Spill log {self.folder} replayed")
+        return True
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["segments"] = len(self._segments)
+        stats["bytes"] = self.size()
+        return stats
@@ -0,0 +1,207 @@
+import json
+import time
+import logging
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from umbra.common.logs import Logs
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(info, index, scenario, events_ids, start):
+    """Entrypoint of a worker process, executes the shard
+    events_ids of the scenario events in its own asyncio loop
+
+    Arguments:
+        info {dict} -- The broker info (uuid, address, debug)
+        index {int} -- Index of the worker
+        scenario {bytes} -- The experiment scenario (as received by the broker)
+        events_ids {list} -- Ids of the events the worker executes
+        start {float} -- Wall clock time (epoch) the events schedule starts
+
+    Returns:
+        tuple -- (dict, dict) The events results (indexed by event id)
+        and the events timings (see Handler.dump_timings())
+    """
+    filename = (
+        "/tmp/umbra/logs/broker-"
+        + str(info.get("uuid"))
+        + "-worker-"
+        + str(index)
+        + ".log"
+    )
+    Logs(filename, debug=info.get("debug"), screen=False)
+
+    worker = Worker(info, index)
+    return asyncio.run(worker.run(scenario, events_ids, start))
+
+
+class Worker:
+    def __init__(self, info, index):
+        self.info = info
+        self.index = index
+
+    def serialize(self, results):
+        # Results cross the process boundary pickled, so the
+        # plugins outputs are converted to plain JSON types
+        serialized = {
+            uid: json.loads(json.dumps(result, default=str))
+            for uid, result in results.items()
+        }
+        return serialized
+
+    async def run(self, scenario, events_ids, start):
+        from umbra.broker.operator import Operator
+
+        logger.info(f"Worker {self.index} - events {events_ids}")
+
+        operator = Operator(self.info)
+        if not operator.load(scenario):
+            logger.info(f"Worker {self.index} could not load scenario")
+            return {}, {}
+
+        operator.config_plugins()
+        operator.config_limits()
+        operator.config_results()
+
+        sched_events = operator.schedule_plugins(events_ids)
+
+        events_calls = {}
+        for evs in sched_events.values():
+            events_calls.update(evs)
+
+        delay = start - time.time()
+        if delay > 0:
+            logger.info(f"Worker {self.index} waiting {delay} to start events")
+            await asyncio.sleep(delay)
+
+        handler = operator.events_handler
+        results = await handler.run(events_calls)
+        timings = handler.dump_timings()
+
+        # All the results are read back from the spill folder by the broker
+        handler.results.dump()
+
+        logger.info(f"Worker {self.index} finished events")
+        return self.serialize(results), timings
+
+
+class Workers:
+    """Shards the events of an experiment across worker processes,
+    each one with its own asyncio loop and plugins instances.
+    Workers are spawned (not forked) so they do not inherit the
+    broker event loop and its open connections.
+    """
+
+    STARTUP = 5
+
+    def __init__(self, info, amount):
+        self.info = info
+        self.amount = amount
+
+    def group(self, events_ids, dependencies):
+        """Groups the events ids that depend on each other (sched 'after'),
+        so they are executed by the same worker
+
+        Arguments:
+            events_ids {list} -- Ids of all events
+            dependencies {dict} -- Ids of the events each event depends on
+
+        Returns:
+            list -- A list of groups of events ids
+        """
+        parents = {ev_id: ev_id for ev_id in events_ids}
+
+        def root(ev_id):
+            while parents[ev_id] != ev_id:
+                parents[ev_id] = parents[parents[ev_id]]
+                ev_id = parents[ev_id]
+            return ev_id
+
+        for ev_id, after in dependencies.items():
+            for dependency in after:
+                if ev_id in parents and dependency in parents:
+                    parents[root(ev_id)] = root(dependency)
+
+        groups = {}
+        for ev_id in events_ids:
+            groups.setdefault(root(ev_id), []).append(ev_id)
+
+        return list(groups.values())
+
+    def shard(self, events_ids, dependencies=None):
+        """Splits events ids in round-robin shards, one per worker,
+        keeping the events that depend on each other in the same shard
+
+        Arguments:
+            events_ids {list} -- Ids of all events
+
+        Keyword Arguments:
+            dependencies {dict} -- Ids of the events each event
+            depends on (default: {None})
+
+        Returns:
+            list -- A list of events ids per worker
+        """
+        groups = self.group(events_ids, dependencies or {})
+        shards = [[] for _ in range(self.amount)]
+
+        for index, group in enumerate(groups):
+            shards[index % self.amount].extend(group)
+
+        shards = [shard for shard in shards if shard]
+        return shards
+
+    async def run(self, scenario, events_ids, dependencies=None):
+        """Executes the events in the worker processes
+
+        Arguments:
+            scenario {bytes} -- The experiment scenario (as received by the broker)
+            events_ids {list} -- Ids of all the events to be executed
+
+        Keyword Arguments:
+            dependencies {dict} -- Ids of the events each event
+            depends on (default: {None})
+
+        Returns:
+            tuple -- (dict, list) The merged events results (indexed by
+            event id), and the list of events timings dumps of workers
+        """
+        results = {}
+        timings = []
+
+        shards = self.shard(events_ids, dependencies)
+        if not shards:
+            return results, timings
+
+        # All workers share the same wall clock start, so events of
+        # different shards keep their relative schedule
+        start = time.time() + self.STARTUP
+
+        loop = asyncio.get_event_loop()
+        context = multiprocessing.get_context("spawn")
+
+        logger.info(f"Starting {len(shards)} workers")
+
+        with ProcessPoolExecutor(len(shards), mp_context=context) as pool:
+            aws = [
+                loop.run_in_executor(
+                    pool, run_worker, self.info, index, scenario, shard, start
+                )
+                for index, shard in enumerate(shards)
+            ]
+            outputs = await asyncio.gather(*aws, return_exceptions=True)
+
+        for index, output in enumerate(outputs):
+            if isinstance(output, Exception):
+                logger.info(f"Worker {index} failed - exception {repr(output)}")
+            else:
+                worker_results, worker_timings = output
+                results.update(worker_results)
+                timings.append(worker_timings)
+
+        logger.info(f"Finished {len(shards)} workers")
+        return results, timings
@@ -0,0 +1,298 @@
+import time
+import asyncio
+import logging
+
+from umbra.common.histogram import Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+def rejected(error):
+    """If the exception of a failed write means the database rejected
+    its points (an HTTP 4xx status, e.g., malformed lines), so writing
+    them again would fail again, unlike connection errors and 5xx ones
+
+    Arguments:
+        error {Exception} -- The exception raised by the write function
+
+    Returns:
+        bool -- True if the points were rejected
+    """
+    status = getattr(error, "status", None)
+    return isinstance(status, int) and 400 <= status < 500
+
+
+class Writer:
+    """Buffers points per database and writes them in batches from a
+    background task, so the coroutines enqueueing points never wait
+    for the database. A flush happens when the buffered points reach
+    batch, or when the oldest buffered point is age seconds old.
+    A blocking write function is executed in the loop default executor,
+    while a coroutine function (e.g., InfluxClient.write_points) is awaited.
+
+    With a spill log (see Spill), points of failed writes and points beyond
+    maxsize are appended to it instead of being retried/dropped, and while
+    it has points all batches go through it, so they are replayed in order.
+    Points are stamped with their enqueue time (ms) if they have none, so
+    replayed points keep their original time. Batches the database rejected
+    (see rejected()) are dropped and counted, never retried.
+    """
+
+    def __init__(self, write, batch=5000, age=1.0, maxsize=500000, spill=None):
+        """
+        Arguments:
+            write {function} -- Called as write(points, database), writes
+            a batch of points and raises an exception if it fails (it can
+            be a coroutine function)
+
+        Keyword Arguments:
+            batch {int} -- Amount of buffered points that triggers a flush (default: {5000})
+            age {float} -- Maximum time in seconds a point is buffered (default: {1.0})
+            maxsize {int} -- Maximum amount of buffered points, the oldest
+            points are dropped (or spilled) beyond it (default: {500000})
+            spill {Spill} -- Spill log of points not written (default: {None})
+        """
+        self._write = write
+        self.batch = batch
+        self.age = age
+        self.maxsize = maxsize
+        self.spill = spill
+        self._buffers = {}
+        self._overflow = []
+        self._size = 0
+        self._oldest = None
+        self._wakeup = None
+        self._task = None
+        self._flushing = None
+        self.latency = Histogram()
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "errors": 0,
+            "spilled": 0,
+            "rejected": 0,
+        }
+
+    def start(self):
+        """Starts the background flush task (if not running)
+        in the running event loop
+        """
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stops the background flush task, writing the buffered points"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+    def put(self, points, database):
+        """Enqueues points to be written in database, never blocks
+
+        Arguments:
+            points {list} -- Points (dicts with measurement, tags, fields)
+            or encoded lines (with time), as accepted by the write function
+            database {string} -- Name of the database
+        """
+        if not points:
+            return
+
+        self.start()
+
+        now = int(time.time() * 1000)
+        for point in points:
+            if type(point) is dict and "time" not in point:
+                point["time"] = now
+
+        buffer = self._buffers.setdefault(database, [])
+        buffer.extend(points)
+        self._size += len(points)
+        self.counters["enqueued"] += len(points)
+
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+        if self._size > self.maxsize:
+            self._drop(self._size - self.maxsize)
+
+        if self._size >= self.batch:
+            self._wakeup.set()
+
+    def _drop(self, amount):
+        for database, buffer in self._buffers.items():
+            dropped = min(amount, len(buffer))
+
+            if self.spill:
+                # Spilled by the next flush, without blocking put()
+                self._overflow.append((database, buffer[:dropped]))
+            else:
+                self.counters["dropped"] += dropped
+
+            del buffer[:dropped]
+            self._size -= dropped
+            amount -= dropped
+
+            if amount <= 0:
+                break
+
+        if self.spill:
+            if self._wakeup:
+                self._wakeup.set()
+        else:
+            dropped = self.counters["dropped"]
+            logger.info(f"Writer buffer full - dropped {dropped} points")
+
+    def _spill(self, points, database):
+        try:
+            self.spill.append(points, database)
+        except OSError as e:
+            logger.info(f"Could not spill {len(points)} points - {repr(e)}")
+            self.counters["dropped"] += len(points)
+        else:
+            self.counters["spilled"] += len(points)
+
+    async def _append(self, points, database):
+        # Spill log files are written in the loop default executor
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._spill, points, database)
+
+    def _requeue(self, points, database):
+        buffer = self._buffers.setdefault(database, [])
+        buffer[:0] = points
+        self._size += len(points)
+
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+        if self._size > self.maxsize:
+            self._drop(self._size - self.maxsize)
+
+    async def _run(self):
+        while True:
+            if self._oldest is None:
+                timeout = self.age
+            else:
+                timeout = max(self._oldest + self.age - time.monotonic(), 0)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+
+            if self._size or self._overflow or (self.spill and self.spill.pending()):
+                await self.flush()
+
+    async def flush(self):
+        """Writes all the buffered points, one batch per database.
+        Points of a failed write are kept to be retried in the next flush
+        (spilled or requeued), unless the database rejected them.
+        Flushes (e.g., of the background task and of an export) are
+        serialized, as they share the spill log replay position
+        """
+        if self._flushing is None:
+            self._flushing = asyncio.Lock()
+
+        async with self._flushing:
+            await self._flush()
+
+    async def _flush(self):
+        buffers, self._buffers = self._buffers, {}
+        overflow, self._overflow = self._overflow, []
+        self._size = 0
+        self._oldest = None
+
+        # Points beyond maxsize are the oldest ones, spilled first
+        for database, points in overflow:
+            await self._append(points, database)
+
+        if self.spill and self.spill.pending():
+            # Keeps the order of points: new batches go after the spilled ones
+            for database, points in buffers.items():
+                if points:
+                    await self._append(points, database)
+
+            await self.spill.replay(self._deliver)
+            return
+
+        for database, points in buffers.items():
+            if not points:
+                continue
+
+            try:
+                await self._deliver(points, database)
+            except Exception as e:
+                logger.info(
+                    f"Could not write {len(points)} points - database {database}"
+                    f" - exception {repr(e)}"
+                )
+
+                if self.spill:
+                    await self._append(points, database)
+                else:
+                    self._requeue(points, database)
+
+    async def _deliver(self, points, database):
+        """Sends a batch of points, dropping it if the database rejected it
+
+        Raises:
+            Exception: If the write failed and can be retried
+        """
+        try:
+            await self._send(points, database)
+        except Exception as e:
+            if not rejected(e):
+                raise
+
+            self.counters["rejected"] += len(points)
+            logger.info(
+                f"Rejected {len(points)} points - database {database}"
+                f" - dropped - exception {repr(e)}"
+            )
+
+    async def _send(self, points, database):
+        loop = asyncio.get_event_loop()
+        start = time.monotonic()
+
+        try:
+            if asyncio.iscoroutinefunction(self._write):
+                await self._write(points, database)
+            else:
+                await loop.run_in_executor(None, self._write, points, database)
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        else:
+            self.counters["written"] += len(points)
+            self.counters["flushes"] += 1
+            logger.debug(
+                f"Written {len(points)} points - database {database}"
+                f" - queue depth {self._size}"
+            )
+        finally:
+            self.latency.record(time.monotonic() - start)
+
+    def stats(self):
+        """Counters of the writer, its queue depth (buffered points)
+        and the latency of its flushes (writes of batches)
+
+        Returns:
+            dict -- The writer stats
+        """
+        stats = dict(self.counters)
+        stats["depth"] = self._size + sum(len(p) for _, p in self._overflow)
+        stats["latency"] = self.latency.stats()
+        if self.spill:
+            stats["spill"] = self.spill.stats()
+        return stats
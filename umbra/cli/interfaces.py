@@ -89,3 +89,9 @@ class BrokerInterface(UmbraInterface):
         action = "stop"
         reply, error = await self.call(address, action, topology)
         return reply, error
+
+    async def export(self, environment, topology):
+        address = environment.get("address")
+        action = "export"
+        reply, error = await self.call(address, action, topology)
+        return reply, error
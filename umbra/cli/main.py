@@ -32,6 +32,7 @@ class CLIRunner:
             "uninstall": self.uninstall,
             "begin": self.begin,
             "end": self.end,
+            "export": self.export,
         }
 
         self._status = {
@@ -42,6 +43,7 @@ class CLIRunner:
             "uninstall": False,
             "begin": False,
             "end": False,
+            "export": False,
         }
         logger.info("CLIRunner init")
 
@@ -195,6 +197,32 @@ class CLIRunner:
         logger.info(f"{messages}")
         return ack, messages
 
+    async def export(self):
+        logger.info(f"export triggered")
+
+        print_cli(f"Exporting", style="attention")
+
+        default_env = self.topology.get_default_environment()
+        default_env_components = default_env.get("components")
+        broker_env = default_env_components.get("broker")
+
+        print_cli(f"Experiment Export", style="info")
+        scenario = self.experiment.dump()
+        reply, error = await self.broker_interface.export(broker_env, scenario)
+
+        ack = False if error else True
+        self._status["export"] = ack
+
+        if ack:
+            print_cli(f"Exported Umbra Experiment", style="normal")
+            messages = reply
+        else:
+            print_cli(f"Exported Umbra Experiment Error", style="error")
+            messages = error
+
+        logger.info(f"{messages}")
+        return ack, messages
+
     def status(self, command):
         ack = False
         error = ""
@@ -226,6 +254,9 @@ class CLIRunner:
         if command == "end":
             pass
 
+        if command == "export":
+            pass
+
         return True, error
 
     async def execute(self, cmds):
@@ -260,7 +291,16 @@ class CLIRunner:
 
 class CLI:
     umbra_completer = WordCompleter(
-        ["load", "start", "stop", "install", "uninstall", "begin", "end"],
+        [
+            "load",
+            "start",
+            "stop",
+            "install",
+            "uninstall",
+            "begin",
+            "end",
+            "export",
+        ],
         ignore_case=True,
     )
 
@@ -300,6 +340,7 @@ class CLI:
                 "load": source_files_dict,
                 "begin": None,
                 "end": None,
+                "export": None,
                 "start": None,
                 "stop": None,
                 "install": None,
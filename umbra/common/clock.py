@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import selectors
+
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualClock:
+    """Simulated time source: time only moves forward when
+    advanced (i.e., when the event loop would be waiting)
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+
+class VirtualSelector(selectors.DefaultSelector):
+    """Selector that polls I/O without blocking and, instead of
+    sleeping until the next loop timer is due, advances the
+    virtual clock to it
+    """
+
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # No timer scheduled, only I/O can wake the loop up
+            return super().select(None)
+
+        events = super().select(0)
+        if not events:
+            self._clock.advance(timeout)
+        return events
+
+
+class VirtualLoop(asyncio.SelectorEventLoop):
+    """Event loop running on a VirtualClock: timers (call_at/call_later,
+    asyncio.sleep, wait_for timeouts) are due in virtual time, so
+    schedules of hours are executed as fast as their calls allow.
+    Calls must not depend on wall-clock time (e.g., stub plugins that
+    await asyncio.sleep to emulate their duration), and time does not
+    advance while callbacks keep the loop busy.
+    """
+
+    def __init__(self, start=0.0):
+        self.clock = VirtualClock(start)
+        super().__init__(VirtualSelector(self.clock))
+
+    def time(self):
+        return self.clock.time()
+
+
+def run_virtual(main, start=0.0):
+    """Runs the coroutine main in a new VirtualLoop, like asyncio.run()
+
+    Arguments:
+        main {coroutine} -- The coroutine to be executed
+
+    Keyword Arguments:
+        start {float} -- Initial virtual time in seconds (default: {0.0})
+
+    Returns:
+        object -- The output of main
+    """
+    loop = VirtualLoop(start)
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            logger.debug(f"Virtual loop finished at time {loop.time()}")
+            asyncio.set_event_loop(None)
+            loop.close()
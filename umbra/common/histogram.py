@@ -0,0 +1,166 @@
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """HDR-style histogram of positive values (e.g., seconds).
+    Values are recorded as integer amounts of unit into log-linear
+    buckets: each power of 2 is split into 2^precision sub-buckets,
+    so the relative error of any percentile is below 2^-precision.
+    Buckets are kept sparse, and histograms with the same unit and
+    precision can be merged.
+    """
+
+    PERCENTILES = [50, 90, 95, 99, 99.9]
+
+    def __init__(self, unit=1e-6, precision=7):
+        self.unit = unit
+        self.precision = precision
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        sub = 1 << self.precision
+        if value < sub:
+            return value
+        shift = value.bit_length() - self.precision - 1
+        return ((shift + 1) << self.precision) + (value >> shift) - sub
+
+    def _value(self, index):
+        sub = 1 << self.precision
+        if index < sub:
+            return index
+        shift = (index >> self.precision) - 1
+        low = (index - ((shift + 1) << self.precision) + sub) << shift
+        return low + ((1 << shift) - 1) / 2.0
+
+    def record(self, value, count=1):
+        """Records a value
+
+        Arguments:
+            value {float} -- Value in the same measure of unit (e.g., seconds)
+
+        Keyword Arguments:
+            count {int} -- Amount of times value is recorded (default: {1})
+        """
+        if value < 0:
+            value = 0.0
+
+        index = self._index(int(value / self.unit))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Adds all the values recorded in other histogram
+
+        Arguments:
+            other {Histogram} -- Histogram with same unit and precision
+        """
+        if other.unit != self.unit or other.precision != self.precision:
+            raise ValueError("Histograms with different unit/precision")
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+        self.count += other.count
+        self.total += other.total
+
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percentile):
+        """Value below which percentile % of the recorded values are
+
+        Arguments:
+            percentile {float} -- Percentile in range [0, 100]
+
+        Returns:
+            float -- The percentile value, or None if histogram is empty
+        """
+        if not self.count:
+            return None
+
+        rank = percentile / 100.0 * self.count
+        accumulated = 0
+
+        for index in sorted(self.counts):
+            accumulated += self.counts[index]
+            if accumulated >= rank:
+                value = self._value(index) * self.unit
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def stats(self):
+        """Summary of the histogram
+
+        Returns:
+            dict -- Count, min, max, mean and percentiles (e.g., p99, p99.9)
+        """
+        stats = {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean(),
+        }
+
+        for percentile in self.PERCENTILES:
+            name = "p" + format(percentile, "g")
+            stats[name] = self.percentile(percentile)
+
+        return stats
+
+    def dump(self):
+        """Serializes the histogram into a JSON-compatible dict
+
+        Returns:
+            dict -- The histogram data, to be loaded by load()
+        """
+        data = {
+            "unit": self.unit,
+            "precision": self.precision,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(index): count for index, count in self.counts.items()},
+        }
+        return data
+
+    @classmethod
+    def load(cls, data):
+        """Builds a histogram from the output of dump()
+
+        Arguments:
+            data {dict} -- The histogram data
+
+        Returns:
+            Histogram -- The loaded histogram
+        """
+        histogram = cls(unit=data.get("unit"), precision=data.get("precision"))
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        histogram.counts = {
+            int(index): count for index, count in data.get("counts", {}).items()
+        }
+        return histogram
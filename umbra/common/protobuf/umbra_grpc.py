@@ -24,6 +24,14 @@ class BrokerBase(abc.ABC):
     async def Collect(self, stream: 'grpclib.server.Stream[umbra_pb2.Stats, umbra_pb2.Status]') -> None:
         pass
 
+    @abc.abstractmethod
+    async def CollectStream(self, stream: 'grpclib.server.Stream[umbra_pb2.Stats, umbra_pb2.Status]') -> None:
+        pass
+
+    @abc.abstractmethod
+    async def Recent(self, stream: 'grpclib.server.Stream[umbra_pb2.Query, umbra_pb2.Stats]') -> None:
+        pass
+
     def __mapping__(self) -> typing.Dict[str, grpclib.const.Handler]:
         return {
             '/umbra.Broker/Execute': grpclib.const.Handler(
@@ -38,6 +46,18 @@ class BrokerBase(abc.ABC):
                 umbra_pb2.Stats,
                 umbra_pb2.Status,
             ),
+            '/umbra.Broker/CollectStream': grpclib.const.Handler(
+                self.CollectStream,
+                grpclib.const.Cardinality.STREAM_STREAM,
+                umbra_pb2.Stats,
+                umbra_pb2.Status,
+            ),
+            '/umbra.Broker/Recent': grpclib.const.Handler(
+                self.Recent,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                umbra_pb2.Query,
+                umbra_pb2.Stats,
+            ),
         }
 
 
@@ -56,6 +76,18 @@ class BrokerStub:
             umbra_pb2.Stats,
             umbra_pb2.Status,
         )
+        self.CollectStream = grpclib.client.StreamStreamMethod(
+            channel,
+            '/umbra.Broker/CollectStream',
+            umbra_pb2.Stats,
+            umbra_pb2.Status,
+        )
+        self.Recent = grpclib.client.UnaryUnaryMethod(
+            channel,
+            '/umbra.Broker/Recent',
+            umbra_pb2.Query,
+            umbra_pb2.Stats,
+        )
 
 
 class ScenarioBase(abc.ABC):
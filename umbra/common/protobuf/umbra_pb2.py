@@ -21,7 +21,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0bumbra.proto\x12\x05umbra\x1a\x1cgoogle/protobuf/struct.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"e\n\x06\x43onfig\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x10\n\x08scenario\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"`\n\x06Report\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04info\x18\x02 \x01(\x0c\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"g\n\x08Workflow\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x10\n\x08scenario\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"`\n\x06Status\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0c\n\x04info\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"X\n\x05Sched\x12\x0c\n\x04\x66rom\x18\x01 \x01(\r\x12\r\n\x05until\x18\x02 \x01(\r\x12\x10\n\x08\x64uration\x18\x03 \x01(\r\x12\x10\n\x08interval\x18\x04 \x01(\r\x12\x0e\n\x06repeat\x18\x05 \x01(\r\"\xd7\x02\n\x0bInstruction\x12\n\n\x02id\x18\x01 \x01(\t\x12*\n\x07\x61\x63tions\x18\x02 \x03(\x0b\x32\x19.umbra.Instruction.Action\x1a\x8f\x02\n\x06\x41\x63tion\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04tool\x18\x02 \x01(\t\x12\x30\n\x06output\x18\x03 \x01(\x0b\x32 .umbra.Instruction.Action.Output\x12=\n\nparameters\x18\x04 \x03(\x0b\x32).umbra.Instruction.Action.ParametersEntry\x12\x1e\n\x08schedule\x18\x05 \x01(\x0b\x32\x0c.umbra.Sched\x1a\'\n\x06Output\x12\x0c\n\x04live\x18\x01 \x01(\x08\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x9f\x03\n\nEvaluation\x12\n\n\x02id\x18\x01 \x01(\t\x12(\n\x06source\x18\x02 \x01(\x0b\x32\x18.umbra.Evaluation.Source\x12)\n\x07metrics\x18\x03 \x03(\x0b\x32\x18.umbra.Evaluation.Metric\x12.\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1b.umbra.Evaluation.Timestamp\x1a$\n\x06Source\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04\x63\x61ll\x18\x02 \x01(\t\x1ax\n\x06Metric\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0c\n\x04unit\x18\x03 \x01(\t\x12\x10\n\x06scalar\x18\x04 \x01(\x01H\x00\x12)\n\x06series\x18\x05 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x42\x07\n\x05value\x1a`\n\tTimestamp\x12)\n\x05start\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12(\n\x04stop\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\">\n\x08Snapshot\x12\n\n\x02id\x18\x01 \x01(\t\x12&\n\x0b\x65valuations\x18\x02 \x03(\x0b\x32\x11.umbra.Evaluation\"\xaf\x02\n\x0bMeasurement\x12\x0c\n\x04name\x18\x01 \x01(\t\x12*\n\x04tags\x18\x02 \x03(\x0b\x32\x1c.umbra.Measurement.TagsEntry\x12.\n\x06\x66ields\x18\x03 \x03(\x0b\x32\x1e.umbra.Measurement.FieldsEntry\x1a@\n\x05\x46ield\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0c\n\x04unit\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\t\x1a+\n\tTagsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1aG\n\x0b\x46ieldsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.umbra.Measurement.Field:\x02\x38\x01\"\xa8\x01\n\x06Source\x12\n\n\x02id\x18\x01 \x01(\r\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x31\n\nparameters\x18\x03 \x03(\x0b\x32\x1d.umbra.Source.ParametersEntry\x12\x1e\n\x08schedule\x18\x04 \x01(\x0b\x32\x0c.umbra.Sched\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x9f\x01\n\tDirectrix\x12%\n\x05\x66lush\x18\x01 \x01(\x0b\x32\x16.umbra.Directrix.Flush\x12\x1e\n\x07sources\x18\x02 \x03(\x0b\x32\r.umbra.Source\x12\x0e\n\x06\x61\x63tion\x18\x03 \x01(\t\x1a;\n\x05\x46lush\x12\x0c\n\x04live\x18\x01 \x01(\x08\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x13\n\x0b\x65nvironment\x18\x03 \x01(\t\"V\n\x05Stats\x12\x13\n\x0b\x65nvironment\x18\x01 \x01(\t\x12\x0e\n\x06source\x18\x02 \x01(\t\x12(\n\x0cmeasurements\x18\x03 \x03(\x0b\x32\x12.umbra.Measurement\"\x8f\x01\n\x05State\x12\x0e\n\x06source\x18\x01 \x01(\t\x12&\n\x08messages\x18\x02 \x03(\x0b\x32\x14.umbra.State.Content\x12&\n\x02ts\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x1a&\n\x07\x43ontent\x12\x0c\n\x04info\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t2Y\n\x06\x42roker\x12\'\n\x07\x45xecute\x12\r.umbra.Config\x1a\r.umbra.Report\x12&\n\x07\x43ollect\x12\x0c.umbra.Stats\x1a\r.umbra.Status2`\n\x08Scenario\x12+\n\tEstablish\x12\x0f.umbra.Workflow\x1a\r.umbra.Status\x12\'\n\x05Stats\x12\x0f.umbra.Workflow\x1a\r.umbra.Status25\n\x07Monitor\x12*\n\x07Measure\x12\x10.umbra.Directrix\x1a\r.umbra.Status25\n\x05\x41gent\x12,\n\x05Probe\x12\x12.umbra.Instruction\x1a\x0f.umbra.Snapshot2,\n\x03\x43LI\x12%\n\x06Inform\x12\x0c.umbra.State\x1a\r.umbra.Statusb\x06proto3'
+  serialized_pb=b'\n\x0bumbra.proto\x12\x05umbra\x1a\x1cgoogle/protobuf/struct.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"e\n\x06\x43onfig\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x10\n\x08scenario\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"`\n\x06Report\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04info\x18\x02 \x01(\x0c\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"g\n\x08Workflow\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x10\n\x08scenario\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"`\n\x06Status\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0c\n\x04info\x18\x03 \x01(\x0c\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"X\n\x05Sched\x12\x0c\n\x04\x66rom\x18\x01 \x01(\r\x12\r\n\x05until\x18\x02 \x01(\r\x12\x10\n\x08\x64uration\x18\x03 \x01(\r\x12\x10\n\x08interval\x18\x04 \x01(\r\x12\x0e\n\x06repeat\x18\x05 \x01(\r\"\xd7\x02\n\x0bInstruction\x12\n\n\x02id\x18\x01 \x01(\t\x12*\n\x07\x61\x63tions\x18\x02 \x03(\x0b\x32\x19.umbra.Instruction.Action\x1a\x8f\x02\n\x06\x41\x63tion\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04tool\x18\x02 \x01(\t\x12\x30\n\x06output\x18\x03 \x01(\x0b\x32 .umbra.Instruction.Action.Output\x12=\n\nparameters\x18\x04 \x03(\x0b\x32).umbra.Instruction.Action.ParametersEntry\x12\x1e\n\x08schedule\x18\x05 \x01(\x0b\x32\x0c.umbra.Sched\x1a\'\n\x06Output\x12\x0c\n\x04live\x18\x01 \x01(\x08\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x9f\x03\n\nEvaluation\x12\n\n\x02id\x18\x01 \x01(\t\x12(\n\x06source\x18\x02 \x01(\x0b\x32\x18.umbra.Evaluation.Source\x12)\n\x07metrics\x18\x03 \x03(\x0b\x32\x18.umbra.Evaluation.Metric\x12.\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1b.umbra.Evaluation.Timestamp\x1a$\n\x06Source\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04\x63\x61ll\x18\x02 \x01(\t\x1ax\n\x06Metric\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0c\n\x04unit\x18\x03 \x01(\t\x12\x10\n\x06scalar\x18\x04 \x01(\x01H\x00\x12)\n\x06series\x18\x05 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x42\x07\n\x05value\x1a`\n\tTimestamp\x12)\n\x05start\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12(\n\x04stop\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\">\n\x08Snapshot\x12\n\n\x02id\x18\x01 \x01(\t\x12&\n\x0b\x65valuations\x18\x02 \x03(\x0b\x32\x11.umbra.Evaluation\"\xe6\x02\n\x0bMeasurement\x12\x0c\n\x04name\x18\x01 \x01(\t\x12*\n\x04tags\x18\x02 \x03(\x0b\x32\x1c.umbra.Measurement.TagsEntry\x12.\n\x06\x66ields\x18\x03 \x03(\x0b\x32\x1e.umbra.Measurement.FieldsEntry\x1aw\n\x05\x46ield\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0c\n\x04unit\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\t\x12\x16\n\x0c\x64ouble_value\x18\x05 \x01(\x01H\x00\x12\x13\n\tint_value\x18\x06 \x01(\x03H\x00\x42\x08\n\x06number\x1a+\n\tTagsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1aG\n\x0b\x46ieldsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.umbra.Measurement.Field:\x02\x38\x01\"\xea\x01\n\x06Series\x12\x0c\n\x04name\x18\x01 \x01(\t\x12%\n\x04tags\x18\x02 \x03(\x0b\x32\x17.umbra.Series.TagsEntry\x12\x12\n\ntimestamps\x18\x03 \x03(\x03\x12%\n\x07\x63olumns\x18\x04 \x03(\x0b\x32\x14.umbra.Series.Column\x1a\x43\n\x06\x43olumn\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04unit\x18\x02 \x01(\t\x12\x0f\n\x07\x64oubles\x18\x03 \x03(\x01\x12\x0c\n\x04ints\x18\x04 \x03(\x12\x1a+\n\tTagsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xa8\x01\n\x06Source\x12\n\n\x02id\x18\x01 \x01(\r\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x31\n\nparameters\x18\x03 \x03(\x0b\x32\x1d.umbra.Source.ParametersEntry\x12\x1e\n\x08schedule\x18\x04 \x01(\x0b\x32\x0c.umbra.Sched\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x9f\x01\n\tDirectrix\x12%\n\x05\x66lush\x18\x01 \x01(\x0b\x32\x16.umbra.Directrix.Flush\x12\x1e\n\x07sources\x18\x02 \x03(\x0b\x32\r.umbra.Source\x12\x0e\n\x06\x61\x63tion\x18\x03 \x01(\t\x1a;\n\x05\x46lush\x12\x0c\n\x04live\x18\x01 \x01(\x08\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x13\n\x0b\x65nvironment\x18\x03 \x01(\t\"\x98\x01\n\x05Stats\x12\x13\n\x0b\x65nvironment\x18\x01 \x01(\t\x12\x0e\n\x06source\x18\x02 \x01(\t\x12(\n\x0cmeasurements\x18\x03 \x03(\x0b\x32\x12.umbra.Measurement\x12\x0f\n\x07version\x18\x04 \x01(\r\x12\x1d\n\x06series\x18\x05 \x03(\x0b\x32\r.umbra.Series\x12\x10\n\x08sequence\x18\x06 \x01(\x04\"\xb2\x01\n\x05Query\x12\x13\n\x0b\x65nvironment\x18\x01 \x01(\t\x12\x13\n\x0bmeasurement\x18\x02 \x01(\t\x12$\n\x04tags\x18\x03 \x03(\x0b\x32\x16.umbra.Query.TagsEntry\x12\x0e\n\x06\x66ields\x18\x04 \x03(\t\x12\x0c\n\x04kind\x18\x05 \x01(\t\x12\x0e\n\x06window\x18\x06 \x01(\x01\x1a+\n\tTagsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x8f\x01\n\x05State\x12\x0e\n\x06source\x18\x01 \x01(\t\x12&\n\x08messages\x18\x02 \x03(\x0b\x32\x14.umbra.State.Content\x12&\n\x02ts\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x1a&\n\x07\x43ontent\x12\x0c\n\x04info\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t2\xb1\x01\n\x06\x42roker\x12\'\n\x07\x45xecute\x12\r.umbra.Config\x1a\r.umbra.Report\x12&\n\x07\x43ollect\x12\x0c.umbra.Stats\x1a\r.umbra.Status\x12\x30\n\rCollectStream\x12\x0c.umbra.Stats\x1a\r.umbra.Status(\x01\x30\x01\x12$\n\x06Recent\x12\x0c.umbra.Query\x1a\x0c.umbra.Stats2`\n\x08Scenario\x12+\n\tEstablish\x12\x0f.umbra.Workflow\x1a\r.umbra.Status\x12\'\n\x05Stats\x12\x0f.umbra.Workflow\x1a\r.umbra.Status25\n\x07Monitor\x12*\n\x07Measure\x12\x10.umbra.Directrix\x1a\r.umbra.Status25\n\x05\x41gent\x12,\n\x05Probe\x12\x12.umbra.Instruction\x1a\x0f.umbra.Snapshot2,\n\x03\x43LI\x12%\n\x06Inform\x12\x0c.umbra.State\x1a\r.umbra.Statusb\x06proto3'
   ,
   dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,])
 
@@ -742,6 +742,20 @@ _MEASUREMENT_FIELD = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='double_value', full_name='umbra.Measurement.Field.double_value', index=4,
+      number=5, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='int_value', full_name='umbra.Measurement.Field.int_value', index=5,
+      number=6, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -753,9 +767,14 @@ _MEASUREMENT_FIELD = _descriptor.Descriptor(
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
+    _descriptor.OneofDescriptor(
+      name='number', full_name='umbra.Measurement.Field.number',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
   ],
   serialized_start=1529,
-  serialized_end=1593,
+  serialized_end=1648,
 )
 
 _MEASUREMENT_TAGSENTRY = _descriptor.Descriptor(
@@ -792,8 +811,8 @@ _MEASUREMENT_TAGSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1595,
-  serialized_end=1638,
+  serialized_start=1650,
+  serialized_end=1693,
 )
 
 _MEASUREMENT_FIELDSENTRY = _descriptor.Descriptor(
@@ -830,8 +849,8 @@ _MEASUREMENT_FIELDSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1640,
-  serialized_end=1711,
+  serialized_start=1695,
+  serialized_end=1766,
 )
 
 _MEASUREMENT = _descriptor.Descriptor(
@@ -876,7 +895,150 @@ _MEASUREMENT = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=1408,
-  serialized_end=1711,
+  serialized_end=1766,
+)
+
+
+_SERIES_COLUMN = _descriptor.Descriptor(
+  name='Column',
+  full_name='umbra.Series.Column',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='umbra.Series.Column.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='unit', full_name='umbra.Series.Column.unit', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='doubles', full_name='umbra.Series.Column.doubles', index=2,
+      number=3, type=1, cpp_type=5, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='ints', full_name='umbra.Series.Column.ints', index=3,
+      number=4, type=18, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1891,
+  serialized_end=1958,
+)
+
+_SERIES_TAGSENTRY = _descriptor.Descriptor(
+  name='TagsEntry',
+  full_name='umbra.Series.TagsEntry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='key', full_name='umbra.Series.TagsEntry.key', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='umbra.Series.TagsEntry.value', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=b'8\001',
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1650,
+  serialized_end=1693,
+)
+
+_SERIES = _descriptor.Descriptor(
+  name='Series',
+  full_name='umbra.Series',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='umbra.Series.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='tags', full_name='umbra.Series.tags', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='timestamps', full_name='umbra.Series.timestamps', index=2,
+      number=3, type=3, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='columns', full_name='umbra.Series.columns', index=3,
+      number=4, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[_SERIES_COLUMN, _SERIES_TAGSENTRY, ],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1769,
+  serialized_end=2003,
 )
 
 
@@ -966,8 +1128,8 @@ _SOURCE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1714,
-  serialized_end=1882,
+  serialized_start=2006,
+  serialized_end=2174,
 )
 
 
@@ -1012,8 +1174,8 @@ _DIRECTRIX_FLUSH = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1985,
-  serialized_end=2044,
+  serialized_start=2277,
+  serialized_end=2336,
 )
 
 _DIRECTRIX = _descriptor.Descriptor(
@@ -1057,8 +1219,8 @@ _DIRECTRIX = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1885,
-  serialized_end=2044,
+  serialized_start=2177,
+  serialized_end=2336,
 )
 
 
@@ -1091,6 +1253,27 @@ _STATS = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='version', full_name='umbra.Stats.version', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='series', full_name='umbra.Stats.series', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='umbra.Stats.sequence', index=5,
+      number=6, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -1103,8 +1286,113 @@ _STATS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2046,
-  serialized_end=2132,
+  serialized_start=2339,
+  serialized_end=2491,
+)
+
+
+_QUERY_TAGSENTRY = _descriptor.Descriptor(
+  name='TagsEntry',
+  full_name='umbra.Query.TagsEntry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='key', full_name='umbra.Query.TagsEntry.key', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='umbra.Query.TagsEntry.value', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=b'8\001',
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1650,
+  serialized_end=1693,
+)
+
+_QUERY = _descriptor.Descriptor(
+  name='Query',
+  full_name='umbra.Query',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='environment', full_name='umbra.Query.environment', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='measurement', full_name='umbra.Query.measurement', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='tags', full_name='umbra.Query.tags', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='fields', full_name='umbra.Query.fields', index=3,
+      number=4, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='kind', full_name='umbra.Query.kind', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='window', full_name='umbra.Query.window', index=5,
+      number=6, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[_QUERY_TAGSENTRY, ],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2494,
+  serialized_end=2672,
 )
 
 
@@ -1142,8 +1430,8 @@ _STATE_CONTENT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2240,
-  serialized_end=2278,
+  serialized_start=2780,
+  serialized_end=2818,
 )
 
 _STATE = _descriptor.Descriptor(
@@ -1187,8 +1475,8 @@ _STATE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2135,
-  serialized_end=2278,
+  serialized_start=2675,
+  serialized_end=2818,
 )
 
 _CONFIG.fields_by_name['timestamp'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
@@ -1219,11 +1507,21 @@ _EVALUATION.fields_by_name['metrics'].message_type = _EVALUATION_METRIC
 _EVALUATION.fields_by_name['timestamp'].message_type = _EVALUATION_TIMESTAMP
 _SNAPSHOT.fields_by_name['evaluations'].message_type = _EVALUATION
 _MEASUREMENT_FIELD.containing_type = _MEASUREMENT
+_MEASUREMENT_FIELD.oneofs_by_name['number'].fields.append(
+  _MEASUREMENT_FIELD.fields_by_name['double_value'])
+_MEASUREMENT_FIELD.fields_by_name['double_value'].containing_oneof = _MEASUREMENT_FIELD.oneofs_by_name['number']
+_MEASUREMENT_FIELD.oneofs_by_name['number'].fields.append(
+  _MEASUREMENT_FIELD.fields_by_name['int_value'])
+_MEASUREMENT_FIELD.fields_by_name['int_value'].containing_oneof = _MEASUREMENT_FIELD.oneofs_by_name['number']
 _MEASUREMENT_TAGSENTRY.containing_type = _MEASUREMENT
 _MEASUREMENT_FIELDSENTRY.fields_by_name['value'].message_type = _MEASUREMENT_FIELD
 _MEASUREMENT_FIELDSENTRY.containing_type = _MEASUREMENT
 _MEASUREMENT.fields_by_name['tags'].message_type = _MEASUREMENT_TAGSENTRY
 _MEASUREMENT.fields_by_name['fields'].message_type = _MEASUREMENT_FIELDSENTRY
+_SERIES_COLUMN.containing_type = _SERIES
+_SERIES_TAGSENTRY.containing_type = _SERIES
+_SERIES.fields_by_name['tags'].message_type = _SERIES_TAGSENTRY
+_SERIES.fields_by_name['columns'].message_type = _SERIES_COLUMN
 _SOURCE_PARAMETERSENTRY.containing_type = _SOURCE
 _SOURCE.fields_by_name['parameters'].message_type = _SOURCE_PARAMETERSENTRY
 _SOURCE.fields_by_name['schedule'].message_type = _SCHED
@@ -1231,6 +1529,9 @@ _DIRECTRIX_FLUSH.containing_type = _DIRECTRIX
 _DIRECTRIX.fields_by_name['flush'].message_type = _DIRECTRIX_FLUSH
 _DIRECTRIX.fields_by_name['sources'].message_type = _SOURCE
 _STATS.fields_by_name['measurements'].message_type = _MEASUREMENT
+_STATS.fields_by_name['series'].message_type = _SERIES
+_QUERY_TAGSENTRY.containing_type = _QUERY
+_QUERY.fields_by_name['tags'].message_type = _QUERY_TAGSENTRY
 _STATE_CONTENT.containing_type = _STATE
 _STATE.fields_by_name['messages'].message_type = _STATE_CONTENT
 _STATE.fields_by_name['ts'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
@@ -1243,9 +1544,11 @@ DESCRIPTOR.message_types_by_name['Instruction'] = _INSTRUCTION
 DESCRIPTOR.message_types_by_name['Evaluation'] = _EVALUATION
 DESCRIPTOR.message_types_by_name['Snapshot'] = _SNAPSHOT
 DESCRIPTOR.message_types_by_name['Measurement'] = _MEASUREMENT
+DESCRIPTOR.message_types_by_name['Series'] = _SERIES
 DESCRIPTOR.message_types_by_name['Source'] = _SOURCE
 DESCRIPTOR.message_types_by_name['Directrix'] = _DIRECTRIX
 DESCRIPTOR.message_types_by_name['Stats'] = _STATS
+DESCRIPTOR.message_types_by_name['Query'] = _QUERY
 DESCRIPTOR.message_types_by_name['State'] = _STATE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -1384,6 +1687,29 @@ _sym_db.RegisterMessage(Measurement.Field)
 _sym_db.RegisterMessage(Measurement.TagsEntry)
 _sym_db.RegisterMessage(Measurement.FieldsEntry)
 
+Series = _reflection.GeneratedProtocolMessageType('Series', (_message.Message,), {
+
+  'Column' : _reflection.GeneratedProtocolMessageType('Column', (_message.Message,), {
+    'DESCRIPTOR' : _SERIES_COLUMN,
+    '__module__' : 'umbra_pb2'
+    # @@protoc_insertion_point(class_scope:umbra.Series.Column)
+    })
+  ,
+
+  'TagsEntry' : _reflection.GeneratedProtocolMessageType('TagsEntry', (_message.Message,), {
+    'DESCRIPTOR' : _SERIES_TAGSENTRY,
+    '__module__' : 'umbra_pb2'
+    # @@protoc_insertion_point(class_scope:umbra.Series.TagsEntry)
+    })
+  ,
+  'DESCRIPTOR' : _SERIES,
+  '__module__' : 'umbra_pb2'
+  # @@protoc_insertion_point(class_scope:umbra.Series)
+  })
+_sym_db.RegisterMessage(Series)
+_sym_db.RegisterMessage(Series.Column)
+_sym_db.RegisterMessage(Series.TagsEntry)
+
 Source = _reflection.GeneratedProtocolMessageType('Source', (_message.Message,), {
 
   'ParametersEntry' : _reflection.GeneratedProtocolMessageType('ParametersEntry', (_message.Message,), {
@@ -1421,6 +1747,21 @@ Stats = _reflection.GeneratedProtocolMessageType('Stats', (_message.Message,), {
   })
 _sym_db.RegisterMessage(Stats)
 
+Query = _reflection.GeneratedProtocolMessageType('Query', (_message.Message,), {
+
+  'TagsEntry' : _reflection.GeneratedProtocolMessageType('TagsEntry', (_message.Message,), {
+    'DESCRIPTOR' : _QUERY_TAGSENTRY,
+    '__module__' : 'umbra_pb2'
+    # @@protoc_insertion_point(class_scope:umbra.Query.TagsEntry)
+    })
+  ,
+  'DESCRIPTOR' : _QUERY,
+  '__module__' : 'umbra_pb2'
+  # @@protoc_insertion_point(class_scope:umbra.Query)
+  })
+_sym_db.RegisterMessage(Query)
+_sym_db.RegisterMessage(Query.TagsEntry)
+
 State = _reflection.GeneratedProtocolMessageType('State', (_message.Message,), {
 
   'Content' : _reflection.GeneratedProtocolMessageType('Content', (_message.Message,), {
@@ -1440,7 +1781,9 @@ _sym_db.RegisterMessage(State.Content)
 _INSTRUCTION_ACTION_PARAMETERSENTRY._options = None
 _MEASUREMENT_TAGSENTRY._options = None
 _MEASUREMENT_FIELDSENTRY._options = None
+_SERIES_TAGSENTRY._options = None
 _SOURCE_PARAMETERSENTRY._options = None
+_QUERY_TAGSENTRY._options = None
 
 _BROKER = _descriptor.ServiceDescriptor(
   name='Broker',
@@ -1449,8 +1792,8 @@ _BROKER = _descriptor.ServiceDescriptor(
   index=0,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=2280,
-  serialized_end=2369,
+  serialized_start=2821,
+  serialized_end=2998,
   methods=[
   _descriptor.MethodDescriptor(
     name='Execute',
@@ -1472,6 +1815,26 @@ _BROKER = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='CollectStream',
+    full_name='umbra.Broker.CollectStream',
+    index=2,
+    containing_service=None,
+    input_type=_STATS,
+    output_type=_STATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='Recent',
+    full_name='umbra.Broker.Recent',
+    index=3,
+    containing_service=None,
+    input_type=_QUERY,
+    output_type=_STATS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_BROKER)
 
@@ -1485,8 +1848,8 @@ _SCENARIO = _descriptor.ServiceDescriptor(
   index=1,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=2371,
-  serialized_end=2467,
+  serialized_start=3000,
+  serialized_end=3096,
   methods=[
   _descriptor.MethodDescriptor(
     name='Establish',
@@ -1521,8 +1884,8 @@ _MONITOR = _descriptor.ServiceDescriptor(
   index=2,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=2469,
-  serialized_end=2522,
+  serialized_start=3098,
+  serialized_end=3151,
   methods=[
   _descriptor.MethodDescriptor(
     name='Measure',
@@ -1547,8 +1910,8 @@ _AGENT = _descriptor.ServiceDescriptor(
   index=3,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=2524,
-  serialized_end=2577,
+  serialized_start=3153,
+  serialized_end=3206,
   methods=[
   _descriptor.MethodDescriptor(
     name='Probe',
@@ -1573,8 +1936,8 @@ _CLI = _descriptor.ServiceDescriptor(
   index=4,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=2579,
-  serialized_end=2623,
+  serialized_start=3208,
+  serialized_end=3252,
   methods=[
   _descriptor.MethodDescriptor(
     name='Inform',
@@ -1,7 +1,18 @@
 import os
+import json
+import time
 import logging
+import math
+import heapq
+import random
 import asyncio
+import itertools
+import collections
 from datetime import datetime
+from functools import partial
+
+from umbra.common.histogram import Histogram
+from umbra.common.sketch import Sketches
 
 
 logger = logging.getLogger(__name__)
@@ -77,9 +88,743 @@ class Loader:
             return self._files
 
 
-class Handler:
+class Timers:
+    """Keeps the due times of scheduled entries in a binary heap,
+    arming a single event loop timer for the earliest of them.
+    An entry callback is only called when its due time is reached,
+    so pending entries do not hold any task/coroutine in the loop.
+
+    The clock is an object providing the time() and call_at() methods of
+    an event loop (e.g., a common.clock.VirtualLoop), by default the
+    running event loop itself.
+    """
+
+    def __init__(self, clock=None):
+        self._clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+        self._handle = None
+        self._handle_when = None
+        self._alive = 0
+
+    def __len__(self):
+        return self._alive
+
+    def time(self):
+        """Monotonic time of the event loop used to define due times
+
+        Returns:
+            float -- Current loop time in seconds
+        """
+        return self.clock().time()
+
+    def clock(self):
+        return self._clock or asyncio.get_event_loop()
+
+    def push(self, when, callback, *args):
+        """Adds a callback to be called at time when
+
+        Arguments:
+            when {float} -- Loop time (see time()) when callback is due
+            callback {function} -- Function called with args when due
+
+        Returns:
+            list -- The heap entry, to be used in cancel()
+        """
+        entry = [when, next(self._counter), callback, args]
+        heapq.heappush(self._heap, entry)
+        self._alive += 1
+
+        if self._handle_when is None or when < self._handle_when:
+            self._arm()
+
+        return entry
+
+    def cancel(self, entry):
+        """Cancels a heap entry (lazy removal from heap)
+
+        Arguments:
+            entry {list} -- Entry returned by push()
+        """
+        if entry and entry[2] is not None:
+            entry[2] = None
+            entry[3] = None
+            self._alive -= 1
+
+    def _arm(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+            self._handle_when = None
+
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+        if self._heap:
+            when = self._heap[0][0]
+            self._handle = self.clock().call_at(when, self._expire)
+            self._handle_when = when
+
+    def _expire(self):
+        self._handle = None
+        self._handle_when = None
+        now = self.time()
+
+        try:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, callback, args = heapq.heappop(self._heap)
+                if callback is not None:
+                    self._alive -= 1
+                    try:
+                        callback(*args)
+                    except Exception as e:
+                        logger.info(f"Timer callback {callback} failed - {repr(e)}")
+        finally:
+            # All the pending callbacks depend on the loop timer being armed
+            self._arm()
+
+
+class Arrivals:
+    """Open-loop arrival process of a scheduled call, defined by the
+    sched 'arrival' type. Arrival times are generated lazily, as offsets
+    (in seconds) from the sched 'from' time, until the sched 'until'
+    offset (if not 0) or the amount of sched 'repeat' arrivals (if not 0).
+
+    Arrival types (and their sched parameters):
+    'constant': 'rate' arrivals per second evenly spaced
+    'poisson': 'rate' arrivals per second on average with exponentially
+        distributed inter-arrival times ('seed' optional)
+    'ramp': rate linearly changing from 'rate' to 'rate_end' in 'until' seconds
+    'step': rate changing along 'steps', a list of [offset, rate] pairs
+    """
+
+    TYPES = ["constant", "poisson", "ramp", "step"]
+
+    def __init__(self, sched):
+        """Validates the sched arrival parameters (e.g., loaded from JSON)
+
+        Arguments:
+            sched {dict} -- The sched of the call
+
+        Raises:
+            ValueError: If the arrival type or its parameters are invalid
+        """
+        self.type = sched.get("arrival")
+        if self.type not in self.TYPES:
+            raise ValueError(f"Unknown arrival type {self.type} - types {self.TYPES}")
+
+        try:
+            self.rate = float(sched.get("rate", 0))
+            self.rate_end = float(sched.get("rate_end", self.rate))
+            self.until = float(sched.get("until", 0))
+            self.repeat = int(sched.get("repeat", 0))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid arrival parameters - {e}") from e
+
+        if self.rate < 0 or self.rate_end < 0:
+            raise ValueError("Invalid arrival rate - must not be negative")
+
+        self.steps = self.parse_steps(sched.get("steps", []))
+        self.seed = sched.get("seed", None)
+
+    def parse_steps(self, steps):
+        """Steps as a sorted list of (offset, rate) floats
+
+        Arguments:
+            steps {list} -- The sched steps, [offset, rate] pairs
+
+        Raises:
+            ValueError: If steps are not [offset, rate] pairs of numbers
+
+        Returns:
+            list -- The steps
+        """
+        if not isinstance(steps, (list, tuple)):
+            raise ValueError(f"Invalid arrival steps {steps} - must be a list")
+
+        parsed = []
+        for step in steps:
+            try:
+                begin, rate = step
+                begin, rate = float(begin), float(rate)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid arrival step {step} - {e}") from e
+
+            if begin < 0 or rate < 0:
+                raise ValueError(f"Invalid arrival step {step} - must not be negative")
+            parsed.append((begin, rate))
+
+        return sorted(parsed)
+
+    def __iter__(self):
+        if self.type == "poisson":
+            times = self._poisson()
+        elif self.type == "ramp":
+            times = self._ramp()
+        elif self.type == "step":
+            times = self._step(self.steps)
+        else:
+            times = self._step([(0.0, self.rate)])
+
+        count = 0
+        for offset in times:
+            if self.until and offset >= self.until:
+                break
+            if self.repeat and count >= self.repeat:
+                break
+            count += 1
+            yield offset
+
+    def _poisson(self):
+        if self.rate <= 0:
+            return
+
+        rand = random.Random(self.seed)
+        offset = 0.0
+        while True:
+            yield offset
+            offset += rand.expovariate(self.rate)
+
+    def _ramp(self):
+        if not self.until:
+            logger.info(f"Arrival ramp requires sched until - using constant rate")
+            yield from self._step([(0.0, self.rate)])
+            return
+
+        accel = (self.rate_end - self.rate) / self.until
+
+        if accel == 0:
+            yield from self._step([(0.0, self.rate)])
+            return
+
+        # arrival k happens when the integral of the rate
+        # rate*t + accel*t^2/2 reaches k
+        k = 0
+        while True:
+            delta = self.rate * self.rate + 2 * accel * k
+            if delta < 0:
+                return
+            yield (math.sqrt(delta) - self.rate) / accel
+            k += 1
+
+    def _step(self, steps):
+        base = 0.0
+
+        for index, (begin, rate) in enumerate(steps):
+            if index + 1 < len(steps):
+                end = steps[index + 1][0]
+            else:
+                end = math.inf
+
+            if rate > 0:
+                count = base + rate * (end - begin)
+                k = math.ceil(base)
+                while k < count:
+                    yield begin + (k - base) / rate
+                    k += 1
+                base = count
+
+
+class Limiter:
+    """Bounds the amount of in-flight iterations of the calls
+    that reference it (by name) in their sched 'limits' list.
+    When all slots are in use, an iteration is either queued (FIFO)
+    waiting for a free slot, or dropped: the policy 'queue' drops
+    iterations only when 'queue' (if not 0) of them are already waiting,
+    and the policy 'drop' drops iterations without queueing them
+    """
+
+    POLICIES = ["queue", "drop"]
+
+    def __init__(self, name, inflight, policy="queue", queue=0):
+        self.name = name
+        self.size = inflight
+        self.policy = policy
+        self.queue = queue
+        self.inflight = 0
+        self.queued = 0
+        self.dropped = 0
+        self.completed = 0
+        self._waiters = collections.deque()
+
+    def stats(self):
+        """Counters of the limiter
+
+        Returns:
+            dict -- Current in-flight and queued iterations, and total
+            amount of queued, dropped and completed iterations
+        """
+        stats = {
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "completed": self.completed,
+        }
+        return stats
+
+    async def acquire(self):
+        """Acquires a slot for an iteration
+
+        Returns:
+            bool -- True if slot was acquired, False if iteration was dropped
+        """
+        if self.inflight < self.size and not self._waiters:
+            self.inflight += 1
+            return True
+
+        if self.policy == "drop" or (self.queue and len(self._waiters) >= self.queue):
+            self.dropped += 1
+            return False
+
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._free()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+        return True
+
+    def release(self):
+        """Releases a slot, handing it over to the first queued iteration"""
+        self.completed += 1
+        self._free()
+
+    def _free(self):
+        self.inflight -= 1
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(True)
+                break
+
+
+class Results:
+    """Keeps the results of call iterations as they complete, in a bounded
+    ring buffer per call uid (the most recent 'size' results).
+    If a spill folder is set, results evicted from a ring buffer are
+    appended to a JSON lines file per call uid in that folder, so all
+    results of a call can be read back with get(uid, spilled=True).
+    Sinks are functions called with (uid, result) for every result.
+    """
+
+    def __init__(self, size=1000, folder=None):
+        self.size = size
+        self.folder = None
+        self._buffers = {}
+        self._sinks = []
+        self.spill(folder)
+
+    def spill(self, folder):
+        """Sets the folder where evicted results are stored
+
+        Arguments:
+            folder {string} -- Path to spill folder (None disables spilling)
+        """
+        if folder:
+            try:
+                os.makedirs(folder, exist_ok=True)
+            except OSError as e:
+                logger.info(f"Could not create results folder {folder} - {e}")
+                folder = None
+
+        self.folder = folder
+
+    def add_sink(self, sink):
+        """Adds a function called with (uid, result) for every result
+
+        Arguments:
+            sink {function} -- The sink function
+        """
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+
+    def _filepath(self, uid):
+        filename = "results-" + str(uid) + ".jsonl"
+        return os.path.join(self.folder, filename)
+
+    def reset(self, uid):
+        """Removes all results (in buffer and spilled) of a call uid
+
+        Arguments:
+            uid {string} -- Unique identifier of call
+        """
+        self._buffers.pop(uid, None)
+
+        if self.folder:
+            filepath = self._filepath(uid)
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    def add(self, uid, result):
+        """Stores the result of a call uid iteration
+
+        Arguments:
+            uid {string} -- Unique identifier of call
+            result {object} -- Output of the call iteration
+        """
+        buffer = self._buffers.get(uid)
+        if buffer is None:
+            buffer = collections.deque(maxlen=self.size)
+            self._buffers[uid] = buffer
+
+        if self.folder and len(buffer) == buffer.maxlen:
+            self._write(uid, [buffer[0]])
+
+        buffer.append(result)
+
+        for sink in self._sinks:
+            try:
+                sink(uid, result)
+            except Exception as e:
+                logger.debug(f"Could not sink result of {uid} - exception {e}")
+
+    def _write(self, uid, results):
+        try:
+            with open(self._filepath(uid), "a") as f:
+                for result in results:
+                    f.write(json.dumps(result, default=str))
+                    f.write("\n")
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Could not spill result of {uid} - exception {e}")
+
+    def dump(self):
+        """Moves the results kept in the ring buffers to the spill folder,
+        so all of them can be read back (e.g., by another process) with
+        get(uid, spilled=True)
+        """
+        if not self.folder:
+            return
+
+        for uid, buffer in self._buffers.items():
+            self._write(uid, buffer)
+            buffer.clear()
+
+    def _read(self, uid):
+        filepath = self._filepath(uid)
+
+        if os.path.exists(filepath):
+            with open(filepath, "r") as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def last(self, uid):
+        """Most recent result of a call uid
+
+        Arguments:
+            uid {string} -- Unique identifier of call
+
+        Returns:
+            object -- The result, or None if there is none
+        """
+        buffer = self._buffers.get(uid)
+        if buffer:
+            return buffer[-1]
+        return None
+
+    def get(self, uid, spilled=False):
+        """Results of a call uid in order of completion
+
+        Arguments:
+            uid {string} -- Unique identifier of call
+
+        Keyword Arguments:
+            spilled {bool} -- Include the results spilled to
+            the spill folder (default: {False})
+
+        Returns:
+            list -- The results of the call uid
+        """
+        results = []
+
+        if spilled and self.folder:
+            results.extend(self._read(uid))
+
+        results.extend(self._buffers.get(uid, []))
+        return results
+
+    def uids(self):
+        return list(self._buffers.keys())
+
+
+class Timing:
+    """Instrumentation of the iterations of the calls with a same label:
+    histograms of lateness (fired time - planned time), wait (started
+    time - fired time, e.g., queued by a limiter) and duration (finished
+    time - started time), and the count of iterations per outcome
+    (ok, empty, error, cancelled, dropped)
+
+    The latency (duration of the ok iterations) is also kept in
+    DDSketches per node and time window (see Sketches), to be queried
+    and merged across workers and repeated runs
+    """
+
     def __init__(self):
+        self.lateness = Histogram()
+        self.wait = Histogram()
+        self.duration = Histogram()
+        self.latency = Sketches()
+        self.outcomes = {}
+
+    def record(
+        self, outcome, lateness=None, wait=None, duration=None, node="", timestamp=0.0
+    ):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+        if lateness is not None:
+            self.lateness.record(lateness)
+        if wait is not None:
+            self.wait.record(wait)
+        if duration is not None:
+            self.duration.record(duration)
+            if outcome == "ok":
+                self.latency.record(duration, node, timestamp)
+
+    def stats(self):
+        stats = {
+            "lateness": self.lateness.stats(),
+            "wait": self.wait.stats(),
+            "duration": self.duration.stats(),
+            "latency": self.latency.stats(),
+            "outcomes": dict(self.outcomes),
+        }
+        return stats
+
+    def dump(self):
+        data = {
+            "lateness": self.lateness.dump(),
+            "wait": self.wait.dump(),
+            "duration": self.duration.dump(),
+            "latency": self.latency.dump(),
+            "outcomes": dict(self.outcomes),
+        }
+        return data
+
+    def merge(self, data):
+        """Merges the output of another Timing dump() into this one
+
+        Arguments:
+            data {dict} -- Output of Timing dump()
+        """
+        self.lateness.merge(Histogram.load(data.get("lateness")))
+        self.wait.merge(Histogram.load(data.get("wait")))
+        self.duration.merge(Histogram.load(data.get("duration")))
+
+        if "latency" in data:
+            self.latency.merge(Sketches.load(data.get("latency")))
+
+        for outcome, count in data.get("outcomes", {}).items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+
+
+class EventCall:
+    """Lightweight factory of an event call: holds an async function
+    and its arguments, and only creates the coroutine when called.
+    Plugins schedule EventCall instances, so each iteration of a
+    repeated event awaits a fresh coroutine, and pending events do
+    not hold coroutine objects until they are fired.
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __call__(self):
+        return self.func(*self.args)
+
+    def __repr__(self):
+        name = getattr(self.func, "__name__", repr(self.func))
+        return f"EventCall({name})"
+
+
+class Call:
+    """Scheduling state of a call uid, kept by the Handler
+    while the call is pending (in Timers) or running (tasks)
+
+    Its sched mode can be:
+    'interval' (default): the next iteration is due an interval after
+        the previous iteration finished (iterations never overlap)
+    'deadline': iteration k is due at the absolute time from + k*interval
+        (iterations may overlap, passed deadlines are counted as missed)
+    'arrival': set when sched contains an 'arrival' type (see Arrivals),
+        iterations are due at the times of an open-loop arrival process
+        (iterations may overlap)
+
+    The sched 'limits' list contains the names of the Handler limiters
+    that bound the in-flight iterations of the call (see Limiter), and the
+    sched 'labels' list the names the call iterations timings are
+    instrumented with (see Timing), with the sched 'node' (if any)
+    the call is related to
+
+    The sched 'after' uid (or list of uids) defines the calls that must
+    be finished before the call starts, and its 'from' is then counted
+    from the moment the last of them finished. With the sched 'condition'
+    'success' (default) the call only starts if all the iterations of
+    those calls were ok, otherwise it is skipped (and so its dependents);
+    with 'done' it starts whenever they finish
+    """
+
+    MODES = ("interval", "deadline", "arrival")
+
+    __slots__ = (
+        "uid",
+        "call",
+        "begin",
+        "finish",
+        "duration",
+        "interval",
+        "repeat",
+        "count",
+        "timeout",
+        "mode",
+        "start",
+        "missed",
+        "arrivals",
+        "limits",
+        "labels",
+        "node",
+        "entry",
+        "tasks",
+        "done",
+        "after",
+        "condition",
+        "waiting",
+        "dependents",
+        "failed",
+    )
+
+    def __init__(self, uid, call, sched):
+        """Builds the scheduling state of a call, validating its sched
+
+        Raises:
+            ValueError: If the sched is invalid (e.g., a string interval)
+        """
+        self.uid = uid
+        self.call = call
+        try:
+            self.begin = float(sched.get("from", 0))
+            self.finish = float(sched.get("until", 0))
+            self.duration = float(sched.get("duration", 0))
+            self.interval = float(sched.get("interval", 0))
+            repeat = int(sched.get("repeat", 0))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid sched - {e}") from e
+        self.repeat = 1 if repeat == 0 else repeat
+        self.mode = sched.get("mode", "interval")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown mode {self.mode} - modes {self.MODES}")
+        if self.mode == "arrival" and "arrival" not in sched:
+            raise ValueError("Arrival mode requires an arrival type")
+        if self.mode == "deadline" and self.interval <= 0:
+            raise ValueError("Deadline mode requires an interval > 0")
+        self.limits = sched.get("limits", [])
+        self.labels = sched.get("labels", [])
+        self.node = sched.get("node", "")
+        self.arrivals = None
+        if "arrival" in sched:
+            self.mode = "arrival"
+            self.arrivals = iter(Arrivals(sched))
+        self.count = 0
+        self.timeout = 0
+        self.start = 0
+        self.missed = 0
+        self.entry = None
+        self.tasks = set()
+        self.done = None
+        after = sched.get("after", [])
+        self.after = after if isinstance(after, (list, tuple)) else [after]
+        self.condition = sched.get("condition", "success")
+        self.waiting = 0
+        self.dependents = []
+        self.failed = False
+
+
+class Handler:
+    def __init__(self, results_size=1000, results_folder=None, clock=None):
+        self.results = Results(results_size, results_folder)
         self._tasks = {}
+        self._timers = Timers(clock)
+        self._limiters = {}
+        self._timings = {}
+        self.counters = {}
+
+    def limit(self, name, inflight, policy="queue", queue=0):
+        """Defines a limiter of in-flight call iterations, used by
+        the calls containing its name in their sched 'limits' list
+
+        Arguments:
+            name {string} -- Name of the limiter (e.g., plugin or plugin:action)
+            inflight {int} -- Maximum amount of in-flight iterations
+
+        Keyword Arguments:
+            policy {string} -- Either 'queue' or 'drop' (default: {"queue"})
+            queue {int} -- Maximum amount of queued iterations, 0 for
+            unbounded (default: {0})
+        """
+        if policy not in Limiter.POLICIES:
+            logger.info(f"Unknown limit policy {policy} - policies {Limiter.POLICIES}")
+            policy = "queue"
+
+        logger.debug(f"Limit {name} - inflight {inflight} - policy {policy}")
+        self._limiters[name] = Limiter(name, inflight, policy, queue)
+
+    def limits(self):
+        """Counters of all limiters
+
+        Returns:
+            dict -- Limiter stats() indexed by limiter name
+        """
+        stats = {name: limiter.stats() for name, limiter in self._limiters.items()}
+        return stats
+
+    async def _acquire(self, call):
+        """Acquires the slots of all limiters of a call
+
+        Arguments:
+            call {Call} -- The scheduling state of the call
+
+        Returns:
+            list -- The acquired limiters, or None if the iteration was dropped
+        """
+        acquired = []
+
+        for name in call.limits:
+            limiter = self._limiters.get(name)
+
+            if limiter:
+                try:
+                    ack = await limiter.acquire()
+                except asyncio.CancelledError:
+                    self._release(acquired)
+                    raise
+
+                if ack:
+                    acquired.append(limiter)
+                else:
+                    logger.debug(f"Task {call.uid} dropped by limit {name}")
+                    self._release(acquired)
+                    return None
+
+        return acquired
+
+    def _release(self, acquired):
+        for limiter in acquired:
+            limiter.release()
 
     def _check_finish(self, uid, finish, timeout):
         """Checks if task has reached timeout
@@ -102,6 +847,24 @@ class Handler:
                 logger.debug(f"Task {uid} timeout {timeout}")
         return False
 
+    async def _sleep(self, seconds):
+        """Sleeps in the time of the handler clock (see Timers)
+
+        Arguments:
+            seconds {float} -- Amount of time to sleep
+        """
+        waiter = asyncio.get_event_loop().create_future()
+
+        def wake():
+            if not waiter.done():
+                waiter.set_result(None)
+
+        entry = self._timers.push(self._timers.time() + seconds, wake)
+        try:
+            await waiter
+        finally:
+            self._timers.cancel(entry)
+
     async def _check_task(self, uid, task, duration):
         """Checks task if finished to obtain output result
 
@@ -115,7 +878,7 @@ class Handler:
         """
         if duration != 0:
             logger.debug(f"Waiting for task {uid} duration")
-            await asyncio.sleep(duration)
+            await self._sleep(duration)
             logger.debug(f"Task {uid} duration ended")
             task_duration = duration
         else:
@@ -154,97 +917,398 @@ class Handler:
         logger.debug(f"Task result: {result}")
         return result
 
-    async def _schedule(self, uid, call, sched):
-        """Executes a call uid to the command cmd following the
-        scheduling (time) properties of sched
+    def _fire(self, call):
+        """Called by timers when call is due, creates the task
+        that executes one iteration of the call
 
         Arguments:
-            uid {string} -- The call unique id
-            cmd {string} -- The command to be called/executed
-            sched {dict} -- Contains keys that determine the timely manner
-            that the cmd is going to be called
-
-        Returns:
-            list -- A list of results of the called cmd according to sched parameters
+            call {Call} -- The scheduling state of the call
         """
-        logger.debug(f"Scheduling call uid {uid}")
-        logger.debug(f"Schedule parameters: {sched}")
+        planned = call.entry[0]
+        fired = self._timers.time()
+        call.entry = None
+
+        if call.mode == "deadline":
+            self._fire_deadline(call, planned, fired)
+        elif call.mode == "arrival":
+            self._fire_arrival(call, planned, fired)
+        else:
+            self._spawn(call, self._schedule(call, planned, fired))
+
+    def _spawn(self, call, aw):
         loop = asyncio.get_event_loop()
-        results = []
+        task = loop.create_task(aw)
+        call.tasks.add(task)
+        task.add_done_callback(partial(self._reap, call))
+
+    def _reap(self, call, task):
+        call.tasks.discard(task)
+        if not call.tasks and call.entry is None:
+            self._finished(call)
+
+    def _finished(self, call):
+        if call.done:
+            logger.debug(
+                f"Call {call.uid} finished - fired {call.count - call.missed}"
+                f" - missed {call.missed}"
+            )
+            self.counters[call.uid] = {
+                "fired": call.count - call.missed,
+                "missed": call.missed,
+            }
+            done, call.done = call.done, None
+
+            for dependent in call.dependents:
+                self._resolve(dependent, call)
+            call.dependents = []
+
+            done(call)
+
+    def _resolve(self, call, dependency):
+        """Called when a dependency of call is finished, starts the call
+        when all its dependencies are finished, or skips it if its
+        condition was not satisfied
 
-        begin = sched.get("from", 0)
-        finish = sched.get("until", 0)
-        duration = sched.get("duration", 0)
-        repeat = sched.get("repeat", 0)
-        interval = sched.get("interval", 0)
+        Arguments:
+            call {Call} -- The scheduling state of the dependent call
+            dependency {Call} -- The scheduling state of the finished call
+        """
+        if call.done is None:
+            return
+
+        if dependency.failed and call.condition == "success":
+            call.failed = True
+
+        call.waiting -= 1
+        if call.waiting > 0:
+            return
+
+        if call.failed:
+            logger.info(f"Call {call.uid} skipped - dependencies {call.after} failed")
+            self._record(call, "skipped")
+            self._finished(call)
+        else:
+            logger.debug(f"Call {call.uid} dependencies {call.after} finished")
+            self._begin(call, self._timers.time())
+
+    async def _execute(self, call, planned, fired):
+        """Executes an iteration of the call following the
+        duration (time) property of its sched
 
-        timeout = 0
+        Arguments:
+            call {Call} -- The scheduling state of the call
+            planned {float} -- Time the iteration was due
+            fired {float} -- Time the iteration was fired
+
+        Returns:
+            float -- Amount of time in seconds that task took to be executed
+        """
+        uid = call.uid
+        loop = asyncio.get_event_loop()
+        task = None
         task_duration = 0
-        repeat = 1 if repeat == 0 else repeat
 
-        try:
-            for _ in range(repeat):
+        acquired = await self._acquire(call)
+        if acquired is None:
+            self._record(call, "dropped", planned, fired)
+            return task_duration
 
-                await asyncio.sleep(begin)
-                begin = interval
+        started = self._timers.time()
+        outcome = "error"
 
-                if asyncio.iscoroutine(call):
-                    logger.debug(f"Call is coroutine")
-                    aw = call
-                else:
-                    logger.debug(f"Call is not coroutine")
-                    aw = call()
+        try:
+            if asyncio.iscoroutine(call.call):
+                aw = call.call
+                # A coroutine object can only be awaited once,
+                # repeated calls must be scheduled as factories
+                call.call = None
+            elif call.call is None:
+                raise RuntimeError(f"Call {uid} coroutine already awaited")
+            else:
+                aw = call.call()
 
+            if call.duration != 0:
                 task = loop.create_task(aw)
-                logger.debug(f"Task {uid} created {task}")
-
-                task_duration = await self._check_task(uid, task, duration)
+                logger.debug(f"Task {uid} created")
+                task_duration = await self._check_task(uid, task, call.duration)
                 result = await self._check_task_result(uid, task)
+            else:
+                logger.debug(f"Waiting for task {uid} (normal execution)")
+                start = self._timers.time()
+                result = await aw
+                task_duration = self._timers.time() - start
+
+            if result:
+                logger.debug(f"Task {uid} result available")
+                self.results.add(uid, result)
+                outcome = "ok"
+            else:
+                logger.debug(f"Task {uid} result unavailable")
+                outcome = "empty"
 
-                if result:
-                    logger.debug(f"Task {uid} result available")
-                    results.append(result)
-                else:
-                    logger.debug(f"Task {uid} result unavailable")
-
-                timeout += task_duration + interval
-                if self._check_finish(uid, finish, timeout):
-                    break
         except asyncio.CancelledError:
             logger.debug(f"Cancelling task {uid}")
+            outcome = "cancelled"
 
             try:
-                if not task.done():
+                if task and not task.done():
                     task.cancel()
                     await task
 
             except asyncio.CancelledError:
                 logger.debug(f"Task {uid} cancelled")
 
+            raise
+
+        except Exception as e:
+            logger.debug(f"Could not run _schedule {uid} - exception {repr(e)}")
+
         finally:
-            return results
+            self._release(acquired)
+            self._record(call, outcome, planned, fired, started)
+
+        return task_duration
 
-    async def _build(self, calls):
-        """Builds list of command calls as coroutines to be
-        executed by asyncio loop
+    def _record(self, call, outcome, planned=None, fired=None, started=None):
+        """Records the timings of a call iteration into
+        the Timing of each one of the call labels
 
         Arguments:
-            calls {list} -- List of command calls
+            call {Call} -- The scheduling state of the call
+            outcome {string} -- Outcome of the iteration
+
+        Keyword Arguments:
+            planned {float} -- Time the iteration was due (default: {None})
+            fired {float} -- Time the iteration was fired (default: {None})
+            started {float} -- Time the iteration started (default: {None})
+        """
+        lateness, wait, duration = None, None, None
+
+        if outcome != "ok":
+            call.failed = True
+
+        if planned is not None:
+            lateness = fired - planned
+
+        if started is not None:
+            wait = started - fired
+            duration = self._timers.time() - started
+
+        now = time.time()
+
+        for label in call.labels or ["calls"]:
+            timing = self._timings.get(label)
+            if timing is None:
+                timing = Timing()
+                self._timings[label] = timing
+            timing.record(outcome, lateness, wait, duration, call.node, now)
+
+    def timings(self):
+        """Instrumentation of call iterations
 
         Returns:
-            list -- Set of coroutines scheduled to be called
+            dict -- Timing stats() indexed by call label
         """
-        logger.debug(f"Building calls into coroutines")
-        aws = {}
+        stats = {label: timing.stats() for label, timing in self._timings.items()}
+        return stats
+
+    def sketches(self):
+        """Latency sketches of call iterations
+
+        Returns:
+            dict -- Timing latency (Sketches) indexed by call label
+        """
+        return {label: timing.latency for label, timing in self._timings.items()}
+
+    def dump_timings(self):
+        """Serializes the instrumentation of call iterations
+
+        Returns:
+            dict -- Timing dump() indexed by call label
+        """
+        data = {label: timing.dump() for label, timing in self._timings.items()}
+        return data
+
+    def merge_timings(self, data):
+        """Merges instrumentation of call iterations from
+        another Handler (e.g., running in another process)
+
+        Arguments:
+            data {dict} -- Output of dump_timings()
+        """
+        for label, timing_data in data.items():
+            timing = self._timings.get(label)
+            if timing is None:
+                timing = Timing()
+                self._timings[label] = timing
+            timing.merge(timing_data)
+
+    async def _schedule(self, call, planned, fired):
+        """Executes an iteration of the call, and when repeated
+        pushes the call next iteration into timers, an interval
+        after the iteration finished
+
+        Arguments:
+            call {Call} -- The scheduling state of the call
+        """
+        task_duration = await self._execute(call, planned, fired)
+
+        call.count += 1
+        call.timeout += task_duration + call.interval
+
+        if call.count < call.repeat and not self._check_finish(
+            call.uid, call.finish, call.timeout
+        ):
+            when = self._timers.time() + call.interval
+            call.entry = self._timers.push(when, self._fire, call)
+
+    def _fire_deadline(self, call, planned, fired):
+        """Executes an iteration of the call and pushes the call next
+        iteration into timers at its absolute deadline, i.e., start + k*interval,
+        regardless of the previous iterations being finished or not.
+        Deadlines already passed when the call fires are skipped and
+        counted as missed
+
+        Arguments:
+            call {Call} -- The scheduling state of the call
+        """
+        if call.interval > 0:
+            deadline = call.start + call.count * call.interval
+            late = self._timers.time() - deadline
+
+            if late >= call.interval:
+                missed = min(int(late // call.interval), call.repeat - call.count - 1)
+                logger.debug(f"Call {call.uid} missed {missed} deadlines")
+                call.missed += missed
+                call.count += missed
+
+        call.count += 1
+
+        if call.count < call.repeat and not self._check_finish(
+            call.uid, call.finish, call.count * call.interval
+        ):
+            when = call.start + call.count * call.interval
+            call.entry = self._timers.push(when, self._fire, call)
+
+        self._spawn(call, self._execute(call, planned, fired))
+
+    def _fire_arrival(self, call, planned, fired):
+        """Executes an iteration of the call and pushes the call next
+        iteration into timers at the time of its next arrival, regardless
+        of the previous iterations being finished or not
+
+        Arguments:
+            call {Call} -- The scheduling state of the call
+        """
+        call.count += 1
+
+        offset = next(call.arrivals, None)
+        if offset is not None:
+            call.entry = self._timers.push(call.start + offset, self._fire, call)
+
+        self._spawn(call, self._execute(call, planned, fired))
+
+    def _build(self, calls, done):
+        """Builds the scheduling state of calls and pushes
+        their first iteration into timers
+
+        Arguments:
+            calls {dict} -- Command calls (call, sched) indexed by uid
+            done {function} -- Called with a Call when it is finished
+
+        Returns:
+            dict -- The scheduling state (Call) of calls indexed by uid
+        """
+        logger.debug(f"Building calls into timers")
+        now = self._timers.time()
+        built = {}
+
         for uid, (call, call_sched) in calls.items():
-            aw = self._schedule(uid, call, call_sched)
-            aws[uid] = aw
+            try:
+                state = Call(uid, call, call_sched)
+            except ValueError as e:
+                logger.info(f"Invalid call {uid} sched {call_sched} - {e}")
+                raise ValueError(f"Call {uid} sched {call_sched} - {e}") from e
+
+            state.done = done
+            built[uid] = state
+
+        for uid in built:
+            self.results.reset(uid)
 
-        return aws
+        blocked = self._depend(built)
+
+        for state in built.values():
+            if state.done is None:
+                continue
+
+            if state.uid in blocked:
+                logger.info(f"Call {state.uid} skipped - cyclic dependencies")
+                state.failed = True
+                self._record(state, "skipped")
+                self._finished(state)
+            elif not state.waiting:
+                self._begin(state, now)
+
+        logger.debug(f"Scheduled {len(built)} calls into timers")
+        return built
+
+    def _depend(self, built):
+        """Links the calls to the calls they depend on (sched 'after')
+
+        Arguments:
+            built {dict} -- The scheduling state (Call) of calls indexed by uid
+
+        Returns:
+            set -- The uids of calls that can never start (dependency cycles)
+        """
+        for state in built.values():
+            for uid in state.after:
+                dependency = built.get(uid)
+
+                if dependency is None:
+                    logger.info(f"Call {state.uid} unknown dependency {uid} - ignored")
+                else:
+                    dependency.dependents.append(state)
+                    state.waiting += 1
+
+        waiting = {uid: state.waiting for uid, state in built.items()}
+        ready = [uid for uid, amount in waiting.items() if amount == 0]
+
+        while ready:
+            state = built[ready.pop()]
+            for dependent in state.dependents:
+                waiting[dependent.uid] -= 1
+                if waiting[dependent.uid] == 0:
+                    ready.append(dependent.uid)
+
+        blocked = {uid for uid, amount in waiting.items() if amount > 0}
+        return blocked
+
+    def _begin(self, state, now):
+        """Pushes the first iteration of a call into timers
+
+        Arguments:
+            state {Call} -- The scheduling state of the call
+            now {float} -- Time from which the call sched 'from' is counted
+        """
+        state.start = now + state.begin
+
+        if state.arrivals:
+            offset = next(state.arrivals, None)
+            if offset is None:
+                logger.info(f"Call {state.uid} has no arrivals")
+                self._finished(state)
+                return
+        else:
+            offset = 0
+
+        state.entry = self._timers.push(state.start + offset, self._fire, state)
 
     async def run(self, calls):
         """Executes the list of calls as coroutines
-        returning their results
+        returning their results (all the results of
+        the calls iterations are kept in self.results)
 
         Arguments:
             calls {list} -- Set of commands to be scheduled and called as subprocesses
@@ -254,29 +1318,81 @@ class Handler:
         """
         results = {}
 
-        aws = await self._build(calls)
+        if not calls:
+            return results
 
-        logger.debug(f"Running built coroutines")
-        tasks = await asyncio.gather(*(aws.values()), return_exceptions=True)
+        loop = asyncio.get_event_loop()
+        finished = loop.create_future()
+        pending = len(calls)
 
-        calls_ids = list(calls.keys())
-        counter = 0
+        def done(call):
+            nonlocal pending
+            pending -= 1
+            if pending == 0 and not finished.done():
+                finished.set_result(True)
 
-        for aw in tasks:
-            uid = calls_ids[counter]
+        built = self._build(calls, done)
 
-            if isinstance(aw, Exception):
-                logger.debug(f"Could not run _schedule {calls[uid]} - exception {aw}")
-            else:
-                if aw:
-                    results[uid] = aw.pop()
-                else:
-                    results[uid] = {}
+        logger.debug(f"Running built calls")
+        try:
+            await finished
+        except asyncio.CancelledError:
+            await self._cancel(built)
+            raise
 
-            counter += 1
+        for uid in built:
+            result = self.results.last(uid)
+            if result:
+                results[uid] = result
+            else:
+                results[uid] = {}
 
         return results
 
+    async def _cancel(self, calls):
+        """Cancels the scheduled/running iterations of calls
+
+        Arguments:
+            calls {dict} -- Set of Call to be cancelled indexed by uid
+
+        Returns:
+            dict -- Outputs of cancelled tasks (or exceptions) indexed by uid
+        """
+        outputs = {}
+        aws = {}
+
+        # Calls waiting for cancelled calls are skipped
+        for call in calls.values():
+            call.failed = True
+
+        for uid, call in calls.items():
+            if call.entry:
+                self._timers.cancel(call.entry)
+                call.entry = None
+
+            if call.tasks:
+                for task in call.tasks:
+                    task.cancel()
+                aws[uid] = asyncio.gather(*call.tasks, return_exceptions=True)
+            else:
+                self._finished(call)
+                outputs[uid] = None
+
+        tasks = await asyncio.gather(*aws.values(), return_exceptions=True)
+
+        for uid, out in zip(aws.keys(), tasks):
+            if isinstance(out, list):
+                errors = [
+                    o
+                    for o in out
+                    if isinstance(o, Exception)
+                    and not isinstance(o, asyncio.CancelledError)
+                ]
+                out = errors.pop() if errors else None
+            outputs[uid] = out
+
+        return outputs
+
     async def start(self, calls):
         """Executes the list of calls as coroutines
         returning their results
@@ -289,56 +1405,54 @@ class Handler:
         """
         results = {}
 
-        aws = await self._build(calls)
+        def done(call):
+            if self._tasks.get(call.uid) is call:
+                del self._tasks[call.uid]
+
+        built = self._build(calls, done)
 
         logger.debug(f"Starting tasks")
-        for uid, aw in aws.items():
+        for uid, call in built.items():
             logger.debug(f"Starting task {uid}")
-            uid_task = asyncio.create_task(aw)
-            self._tasks[uid] = uid_task
-
-            if uid_task:
-                results[uid] = "ok"
-            else:
-                results[uid] = "error"
+            self._tasks[uid] = call
+            results[uid] = "ok"
 
         logger.debug(f"Finished tasks start")
         return results
 
+    def running(self):
+        """Uids of the calls started (see start()) and not finished yet
+
+        Returns:
+            list -- The uids of the running calls
+        """
+        return list(self._tasks)
+
     async def stop(self, calls):
         results = {}
 
-        aws = []
-
         logger.debug(f"Stopping tasks")
 
         logger.debug(f"Running tasks - {self._tasks.items()}")
         logger.debug(f"Stopping tasks - {calls.keys()}")
 
+        stopping = {}
         for uid in calls.keys():
-            task = self._tasks.get(uid, None)
+            call = self._tasks.get(uid, None)
 
-            if task:
+            if call:
                 logger.debug(f"Stopping task {uid}")
-                task.cancel()
-                aws.append(task)
+                stopping[uid] = call
 
         logger.debug(f"Waiting tasks stop")
-        tasks = await asyncio.gather(*aws, return_exceptions=True)
+        outputs = await self._cancel(stopping)
 
-        calls_ids = list(calls.keys())
-        counter = 0
-
-        for aw in tasks:
-            uid = calls_ids[counter]
-
-            if isinstance(aw, Exception):
-                logger.debug(f"Could not run _schedule {calls[uid]} - exception {aw}")
+        for uid in calls.keys():
+            if isinstance(outputs.get(uid), Exception):
+                logger.debug(f"Could not stop _schedule {calls[uid]}")
                 results[uid] = "error"
             else:
                 results[uid] = "ok"
 
-            counter += 1
-
         logger.debug(f"Finished tasks stop")
         return results
@@ -0,0 +1,322 @@
+import math
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class DDSketch:
+    """DDSketch of positive values (e.g., latencies in seconds).
+    A value v is counted in the bin of index ceil(log_gamma(v)), with
+    gamma = (1 + a) / (1 - a), so any percentile is estimated within a
+    relative error a (relative_accuracy) of the exact one, whatever the
+    range of the values. Sketches with the same relative accuracy are
+    merged by adding their bins counts. When there are more than
+    max_bins, the lowest bins are collapsed (so only the accuracy of
+    the lowest percentiles is lost).
+    """
+
+    PERCENTILES = [50, 90, 95, 99, 99.9]
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def _value(self, key):
+        return 2.0 * self.gamma ** key / (self.gamma + 1)
+
+    def record(self, value, count=1):
+        """Records a value
+
+        Arguments:
+            value {float} -- The value (negative values are counted as 0)
+
+        Keyword Arguments:
+            count {int} -- Amount of times value is recorded (default: {1})
+        """
+        if value < self.MIN_VALUE:
+            value = max(value, 0.0)
+            self.zero += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += count
+        self.total += value * count
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        lowest = keys[excess]
+
+        for key in keys[:excess]:
+            self.bins[lowest] += self.bins.pop(key)
+
+    def merge(self, other):
+        """Adds all the values recorded in other sketch
+
+        Arguments:
+            other {DDSketch} -- Sketch with the same relative accuracy
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different relative accuracy")
+
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percentile):
+        """Value below which percentile % of the recorded values are
+
+        Arguments:
+            percentile {float} -- Percentile in range [0, 100]
+
+        Returns:
+            float -- The percentile value, or None if sketch is empty
+        """
+        if not self.count:
+            return None
+
+        rank = percentile / 100.0 * (self.count - 1)
+
+        if rank < self.zero:
+            return self.min
+
+        accumulated = self.zero
+        for key in sorted(self.bins):
+            accumulated += self.bins[key]
+            if accumulated > rank:
+                return min(max(self._value(key), self.min), self.max)
+
+        return self.max
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def stats(self):
+        """Summary of the sketch
+
+        Returns:
+            dict -- Count, min, max, mean and percentiles (e.g., p99, p99.9)
+        """
+        stats = {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean(),
+        }
+
+        for percentile in self.PERCENTILES:
+            name = "p" + format(percentile, "g")
+            stats[name] = self.percentile(percentile)
+
+        return stats
+
+    def dump(self):
+        """Serializes the sketch into a JSON-compatible dict
+
+        Returns:
+            dict -- The sketch data, to be loaded by load()
+        """
+        data = {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "zero": self.zero,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "bins": {str(key): count for key, count in self.bins.items()},
+        }
+        return data
+
+    @classmethod
+    def load(cls, data):
+        """Builds a sketch from the output of dump()
+
+        Arguments:
+            data {dict} -- The sketch data
+
+        Returns:
+            DDSketch -- The loaded sketch
+        """
+        sketch = cls(
+            relative_accuracy=data.get("relative_accuracy"),
+            max_bins=data.get("max_bins"),
+        )
+        sketch.zero = data.get("zero", 0)
+        sketch.count = data.get("count", 0)
+        sketch.total = data.get("total", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch.bins = {int(key): count for key, count in data.get("bins", {}).items()}
+        return sketch
+
+
+class Sketches:
+    """DDSketches of values per node and time window (window seconds
+    long, aligned to epoch), queried by merging the sketches of the
+    nodes and windows wanted
+    """
+
+    def __init__(self, window=60, relative_accuracy=0.01):
+        self.window = window
+        self.relative_accuracy = relative_accuracy
+        self.sketches = {}
+
+    def record(self, value, node="", timestamp=0.0):
+        """Records a value
+
+        Arguments:
+            value {float} -- The value
+
+        Keyword Arguments:
+            node {string} -- Node the value is related to (default: {""})
+            timestamp {float} -- Time (epoch) of the value (default: {0.0})
+        """
+        start = int(timestamp // self.window * self.window)
+        key = (node, start)
+
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = DDSketch(self.relative_accuracy)
+
+        sketch.record(value)
+
+    def nodes(self):
+        return sorted(set(node for node, _ in self.sketches))
+
+    def query(self, node=None, start=None, end=None):
+        """Merges the sketches of a node (or all) with windows
+        starting in [start, end)
+
+        Keyword Arguments:
+            node {string} -- Name of the node (default: {None}, all)
+            start {float} -- Start time (epoch) (default: {None})
+            end {float} -- End time (epoch) (default: {None})
+
+        Returns:
+            DDSketch -- The merged sketch
+        """
+        merged = DDSketch(self.relative_accuracy)
+
+        for (sketch_node, sketch_start), sketch in self.sketches.items():
+            if node is not None and sketch_node != node:
+                continue
+            if start is not None and sketch_start < start:
+                continue
+            if end is not None and sketch_start >= end:
+                continue
+            merged.merge(sketch)
+
+        return merged
+
+    def stats(self):
+        return self.query().stats()
+
+    def merge(self, other):
+        """Adds the sketches of other (e.g., of another worker or run)
+
+        Arguments:
+            other {Sketches} -- Sketches with the same window
+        """
+        if other.window != self.window:
+            raise ValueError("Sketches with different windows")
+
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = DDSketch.load(sketch.dump())
+
+    def dump(self):
+        data = {
+            "window": self.window,
+            "relative_accuracy": self.relative_accuracy,
+            "sketches": [
+                {"node": node, "start": start, "sketch": sketch.dump()}
+                for (node, start), sketch in self.sketches.items()
+            ],
+        }
+        return data
+
+    @classmethod
+    def load(cls, data):
+        sketches = cls(data.get("window"), data.get("relative_accuracy"))
+        for item in data.get("sketches", []):
+            key = (item.get("node"), item.get("start"))
+            sketches.sketches[key] = DDSketch.load(item.get("sketch"))
+        return sketches
+
+
+def save(filepath, sketches):
+    """Saves sketches indexed by label (e.g., event type) into a JSON file
+
+    Arguments:
+        filepath {string} -- Path of the file
+        sketches {dict} -- Sketches indexed by label
+    """
+    data = {label: label_sketches.dump() for label, label_sketches in sketches.items()}
+
+    with open(filepath, "w") as fp:
+        json.dump(data, fp)
+
+
+def load(filepaths):
+    """Loads and merges the sketches saved (see save()) in files,
+    e.g., of repeated runs of an experiment
+
+    Arguments:
+        filepaths {list} -- Paths of the files
+
+    Returns:
+        dict -- Sketches indexed by label
+    """
+    sketches = {}
+
+    for filepath in filepaths:
+        with open(filepath) as fp:
+            data = json.load(fp)
+
+        for label, label_data in data.items():
+            label_sketches = Sketches.load(label_data)
+            if label in sketches:
+                sketches[label].merge(label_sketches)
+            else:
+                sketches[label] = label_sketches
+
+    return sketches
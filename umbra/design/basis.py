@@ -775,7 +775,22 @@ class Events:
         'interval': delay for the next iteration if 'repeat' is set
         'repeat': repeat the cmd by 'x' iteration. Set to 0 to run
             command only once
-
+        'mode': 'interval' (default) waits 'interval' after an iteration
+            finishes to start the next one; 'deadline' starts iteration k
+            at 'from' + k*'interval' (iterations may overlap, and deadlines
+            passed while the broker is busy are counted as missed)
+        'arrival': open-loop arrival process of the event iterations
+            from 'from' until 'until', one of: 'constant' or 'poisson' (with
+            'rate'), 'ramp' (from 'rate' to 'rate_end'), and 'step' (with
+            'steps' as a list of [offset, rate]) - see common.scheduler.Arrivals
+        'after': id (or list of ids) of the events that must finish before
+            this event starts, 'from' is then counted from the moment they
+            finished
+        'condition': 'success' (default) only starts the event if all the
+            'after' events succeeded (otherwise it is skipped), 'done' starts
+            it whenever they finish
+
+        Returns the id of the added event (to be used in 'after')
         """
         sched = {"from": 0, "until": 0, "duration": 0, "interval": 0, "repeat": 0}
         sched.update(schedule)
@@ -790,6 +805,7 @@ class Events:
         self._events[ev_id] = event
         self._events_by_category[category].append(event)
         self._ev_id += 1
+        return ev_id
 
     def build(self):
         return self._events
@@ -811,6 +827,8 @@ class Experiment:
         self.folder_settings = "/tmp/umbra/"
         self.topology = None
         self.events = Events()
+        self.limits = {}
+        self.workers = 0
 
     def parse(self, data):
         topo = Topology(None, None)
@@ -818,12 +836,51 @@ class Experiment:
         if ack:
             self.topology = topo
             self.events.parse(data.get("events", {}))
+            self.limits = data.get("limits", {})
+            self.workers = data.get("workers", 0)
             self.name = data.get("name", None)
             return True
         return False
 
     def add_event(self, sched, category, event):
-        self.events.add(sched, category, event)
+        """Adds an event to the experiment (see Events.add)
+
+        Returns:
+            int -- The id of the added event (to be used in 'after')
+        """
+        return self.events.add(sched, category, event)
+
+    def add_limit(self, category, inflight, action=None, policy="queue", queue=0):
+        """Bounds the amount of in-flight events of a category
+        (i.e., plugin), or of an action of a category if action is set
+
+        Arguments:
+            category {string} -- Events category (e.g., fabric, iroha, scenario)
+            inflight {int} -- Maximum amount of events being executed at once
+
+        Keyword Arguments:
+            action {string} -- Event action (e.g., chaincode_invoke) (default: {None})
+            policy {string} -- When all in-flight slots are taken, either
+            'queue' the event or 'drop' it (default: {"queue"})
+            queue {int} -- Maximum amount of queued events before dropping
+            them, 0 for unbounded (default: {0})
+        """
+        name = category if not action else category + ":" + action
+        self.limits[name] = {
+            "inflight": inflight,
+            "policy": policy,
+            "queue": queue,
+        }
+
+    def set_workers(self, workers):
+        """Sets the amount of broker worker processes the events
+        are sharded across (0 or 1 executes all events in the
+        broker process). Events limits apply to each worker.
+
+        Arguments:
+            workers {int} -- Amount of worker processes
+        """
+        self.workers = workers
 
     def set_topology(self, topology):
         self.topology = topology
@@ -840,6 +897,8 @@ class Experiment:
             "name": self.name,
             "topology": topo_built,
             "events": events_built,
+            "limits": self.limits,
+            "workers": self.workers,
         }
         return experiment
 
@@ -0,0 +1,363 @@
+import os
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# USER_HZ, unit of the cpuacct.stat (cgroup v1) times
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read(path):
+    with open(path) as fp:
+        return fp.read()
+
+
+def read_int(path):
+    """Integer value of a cgroup file (e.g., memory.current)
+
+    Returns:
+        int -- The value, or None if the file does not exist or is
+        not an integer (e.g., "max")
+    """
+    try:
+        return int(read(path).strip())
+    except (OSError, ValueError):
+        return None
+
+
+def read_keys(path):
+    """Values of a flat keyed cgroup file (e.g., cpu.stat, memory.stat),
+    i.e., lines of "<key> <value>"
+
+    Returns:
+        dict -- Integer values indexed by key (empty if no file)
+    """
+    values = {}
+    try:
+        lines = read(path).splitlines()
+    except OSError:
+        return values
+
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 2:
+            try:
+                values[parts[0]] = int(parts[1])
+            except ValueError:
+                pass
+    return values
+
+
+def read_meminfo(path):
+    """Values of /proc/meminfo (lines of "<key>: <value> kB")
+
+    Returns:
+        dict -- Integer values (kB) indexed by key
+    """
+    values = {}
+    try:
+        lines = read(path).splitlines()
+    except OSError:
+        return values
+
+    for line in lines:
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if parts:
+            try:
+                values[key] = int(parts[0])
+            except ValueError:
+                pass
+    return values
+
+
+class Cgroup:
+    """Paths of the cgroup folders of a container: the unified one
+    (cgroup v2) or one per controller (cgroup v1, e.g., cpuacct, memory)
+    """
+
+    __slots__ = ("version", "paths")
+
+    def __init__(self, version, paths):
+        self.version = version
+        self.paths = paths
+
+    def has(self, controller):
+        return ("" if self.version == 2 else controller) in self.paths
+
+    def path(self, controller, filename):
+        folder = self.paths.get("" if self.version == 2 else controller)
+        return os.path.join(folder, filename) if folder else None
+
+
+class CgroupSampler:
+    """Samples the resources usage of containers reading their cgroup
+    (v1 or v2) files straight from cgroup filesystem, i.e., cpu.stat,
+    memory.current/memory.stat and io.stat in v2 (cpuacct.*, memory.*
+    and blkio.* in v1). Reading these files does not block as the
+    Docker stats API does (it waits for two samples of each container),
+    so all containers are sampled in a single pass. Rates (e.g.,
+    cpu_percent, io_read_rate) are computed from the previous sample of
+    each container, cached in the sampler.
+
+    The fields of the samples are named as the ones of the Docker
+    stats (see MonContainer), e.g., cpu_percent, mem_usage, io_read.
+    """
+
+    def __init__(self, root="/sys/fs/cgroup", proc="/proc"):
+        self.root = root
+        self.proc = proc
+        self.version = self.detect()
+        self._previous = {}
+        self._mem_total = None
+
+    def detect(self):
+        if os.path.exists(os.path.join(self.root, "cgroup.controllers")):
+            return 2
+        if os.path.isdir(os.path.join(self.root, "memory")):
+            return 1
+        return None
+
+    def available(self):
+        return self.version is not None
+
+    def find(self, container_id, pid=None):
+        """Finds the cgroup of a container, from the cgroups of its
+        process (/proc/<pid>/cgroup), or else from the folders where
+        the Docker cgroupfs and systemd drivers create them
+
+        Arguments:
+            container_id {string} -- Full id of the container
+
+        Keyword Arguments:
+            pid {int} -- Pid of the container init process (default: {None})
+
+        Returns:
+            Cgroup -- The cgroup of the container, or None if not found
+        """
+        if not self.version:
+            return None
+
+        paths = self._proc_paths(pid) if pid else {}
+
+        if not paths:
+            candidates = [
+                os.path.join("docker", container_id),
+                os.path.join("system.slice", "docker-" + container_id + ".scope"),
+            ]
+            controllers = ["cpuacct", "memory", "blkio"]
+            for controller in [""] if self.version == 2 else controllers:
+                for candidate in candidates:
+                    folder = os.path.join(self.root, controller, candidate)
+                    if os.path.isdir(folder):
+                        paths[controller] = folder
+                        break
+
+        if self.version == 2 and "" not in paths:
+            return None
+        if self.version == 1 and "cpuacct" not in paths:
+            return None
+
+        return Cgroup(self.version, paths)
+
+    def _proc_paths(self, pid):
+        paths = {}
+        try:
+            lines = read(os.path.join(self.proc, str(pid), "cgroup")).splitlines()
+        except OSError:
+            return paths
+
+        for line in lines:
+            _, controllers, path = line.split(":", 2)
+            path = path.lstrip("/")
+
+            if self.version == 2 and not controllers:
+                paths[""] = os.path.join(self.root, path)
+
+            if self.version == 1:
+                for controller in controllers.split(","):
+                    if controller in ("cpuacct", "memory", "blkio"):
+                        folder = os.path.join(self.root, controller, path)
+                        if not os.path.isdir(folder):
+                            # e.g., cpu,cpuacct mounted together
+                            folder = os.path.join(self.root, controllers, path)
+                        paths[controller] = folder
+
+        return {key: path for key, path in paths.items() if os.path.isdir(path)}
+
+    def mem_total(self):
+        if self._mem_total is None:
+            meminfo = read_meminfo(os.path.join(self.proc, "meminfo"))
+            self._mem_total = meminfo.get("MemTotal", 0) * 1024
+        return self._mem_total
+
+    def sample(self, name, cgroup, tm=None):
+        """Samples the resources usage of a container
+
+        Arguments:
+            name {string} -- Name of the container (key of its previous sample)
+            cgroup {Cgroup} -- The cgroup of the container
+
+        Keyword Arguments:
+            tm {float} -- Time of the sample (s) (default: {None}, now)
+
+        Returns:
+            dict -- The sample fields, or None if the cgroup is gone
+        """
+        if tm is None:
+            tm = time.time()
+
+        if cgroup.version == 2:
+            stats = self._sample_v2(cgroup)
+        else:
+            stats = self._sample_v1(cgroup)
+
+        if stats is None:
+            self._previous.pop(name, None)
+            return None
+
+        self._rates(name, tm, stats)
+        return stats
+
+    def _sample_v2(self, cgroup):
+        cpu = read_keys(cgroup.path("", "cpu.stat"))
+        if not cpu:
+            return None
+
+        stats = {
+            "cpu_total_usage": cpu.get("usage_usec", 0) * 1000,
+            "cpu_usage_in_usermode": cpu.get("user_usec", 0) * 1000,
+            "cpu_usage_in_kernelmode": cpu.get("system_usec", 0) * 1000,
+        }
+
+        usage = read_int(cgroup.path("", "memory.current")) or 0
+        limit = read_int(cgroup.path("", "memory.max")) or self.mem_total()
+        self._memory(stats, usage, limit, read_keys(cgroup.path("", "memory.stat")))
+
+        peak = read_int(cgroup.path("", "memory.peak"))
+        if peak is not None:
+            stats["mem_max_usage"] = peak
+
+        io_read = io_write = 0
+        try:
+            lines = read(cgroup.path("", "io.stat")).splitlines()
+        except OSError:
+            lines = []
+
+        for line in lines:
+            for item in line.split()[1:]:
+                key, _, value = item.partition("=")
+                if key == "rbytes":
+                    io_read += int(value)
+                elif key == "wbytes":
+                    io_write += int(value)
+
+        stats["io_read"] = io_read
+        stats["io_write"] = io_write
+        return stats
+
+    def _sample_v1(self, cgroup):
+        usage = read_int(cgroup.path("cpuacct", "cpuacct.usage"))
+        if usage is None:
+            return None
+
+        ticks = read_keys(cgroup.path("cpuacct", "cpuacct.stat"))
+        tick = 1e9 / CLOCK_TICKS
+        stats = {
+            "cpu_total_usage": usage,
+            "cpu_usage_in_usermode": int(ticks.get("user", 0) * tick),
+            "cpu_usage_in_kernelmode": int(ticks.get("system", 0) * tick),
+        }
+
+        if cgroup.has("memory"):
+            memory = cgroup.path("memory", "memory.usage_in_bytes")
+            usage = read_int(memory) or 0
+            limit = read_int(cgroup.path("memory", "memory.limit_in_bytes"))
+            mem_total = self.mem_total()
+            if not limit or (mem_total and limit > mem_total):
+                limit = mem_total
+
+            mem_stats = read_keys(cgroup.path("memory", "memory.stat"))
+            self._memory(stats, usage, limit, mem_stats)
+
+            peak = read_int(cgroup.path("memory", "memory.max_usage_in_bytes"))
+            if peak is not None:
+                stats["mem_max_usage"] = peak
+
+        io_read = io_write = 0
+        if cgroup.has("blkio"):
+            for filename in (
+                "blkio.throttle.io_service_bytes_recursive",
+                "blkio.io_service_bytes_recursive",
+            ):
+                try:
+                    lines = read(cgroup.path("blkio", filename)).splitlines()
+                except OSError:
+                    continue
+
+                for line in lines:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[1] == "Read":
+                        io_read += int(parts[2])
+                    elif len(parts) == 3 and parts[1] == "Write":
+                        io_write += int(parts[2])
+                break
+
+        stats["io_read"] = io_read
+        stats["io_write"] = io_write
+        return stats
+
+    def _memory(self, stats, usage, limit, mem_stats):
+        for key, value in mem_stats.items():
+            stats["mem_" + key] = value
+
+        stats["mem_usage"] = usage
+        stats["mem_limit"] = limit
+        stats["mem_percent"] = 100.0 * usage / limit if limit else 0.0
+
+    def _rates(self, name, tm, stats):
+        previous = self._previous.get(name)
+        self._previous[name] = (
+            tm,
+            stats["cpu_total_usage"],
+            stats["io_read"],
+            stats["io_write"],
+        )
+
+        stats["cpu_percent"] = 0.0
+        stats["io_read_rate"] = 0.0
+        stats["io_write_rate"] = 0.0
+
+        if previous is None:
+            return
+
+        prev_tm, prev_cpu, prev_read, prev_write = previous
+        elapsed = tm - prev_tm
+        if elapsed <= 0:
+            return
+
+        # Counters reset if the container restarted
+        cpu_delta = stats["cpu_total_usage"] - prev_cpu
+        if cpu_delta >= 0:
+            stats["cpu_percent"] = 100.0 * cpu_delta / (elapsed * 1e9)
+
+        read_delta = stats["io_read"] - prev_read
+        write_delta = stats["io_write"] - prev_write
+        if read_delta >= 0:
+            stats["io_read_rate"] = read_delta / elapsed
+        if write_delta >= 0:
+            stats["io_write_rate"] = write_delta / elapsed
+
+    def forget(self, names):
+        """Drops the previous samples of containers not in names
+
+        Arguments:
+            names {list} -- Names of the containers still sampled
+        """
+        for name in list(self._previous):
+            if name not in names:
+                del self._previous[name]
+
@@ -0,0 +1,135 @@
+import os
+import re
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns sampled of /proc/net/dev, the first ones of the 8 receive
+# counters and of the 8 transmit counters of an interface line
+COLUMNS = ["bytes", "packets", "errs", "drop"]
+TX_OFFSET = 8
+
+
+def parse(content):
+    """Parses the content of a /proc/<pid>/net/dev file
+
+    Arguments:
+        content {string} -- The file content
+
+    Returns:
+        dict -- Counters (rx_bytes, rx_packets, rx_errs, rx_drop,
+        tx_bytes, ...) indexed by interface name
+    """
+    counters = {}
+
+    # The first two lines are the table header
+    for line in content.splitlines()[2:]:
+        name, _, values = line.partition(":")
+        values = values.split()
+        if len(values) < 16:
+            continue
+
+        interface = {}
+        for index, column in enumerate(COLUMNS):
+            interface["rx_" + column] = int(values[index])
+            interface["tx_" + column] = int(values[TX_OFFSET + index])
+
+        counters[name.strip()] = interface
+
+    return counters
+
+
+class NetDevSampler:
+    """Samples the counters of the network interfaces of processes
+    (e.g., the containers of the emulated nodes) from /proc/<pid>/net/dev,
+    which shows the interfaces of the process network namespace.
+    Rates per second (e.g., rx_bytes_rate) are computed from the previous
+    sample of each (node, interface), cached in the sampler.
+    Only interfaces matching the interfaces pattern are sampled
+    (by default eth<N>, also as <node>-eth<N>, not lo or tunnels).
+    """
+
+    INTERFACES = r"(.*-)?eth\d+$"
+
+    def __init__(self, proc="/proc", interfaces=INTERFACES):
+        self.proc = proc
+        self.interfaces = re.compile(interfaces)
+        self._previous = {}
+
+    def read(self, pid):
+        """Counters of the interfaces in the namespace of a process
+
+        Arguments:
+            pid {int} -- Pid of the process
+
+        Returns:
+            dict -- Counters indexed by interface, or None if no process
+        """
+        filepath = os.path.join(self.proc, str(pid), "net", "dev")
+
+        try:
+            with open(filepath) as fp:
+                content = fp.read()
+        except OSError:
+            return None
+
+        counters = parse(content)
+        return {
+            interface: values
+            for interface, values in counters.items()
+            if self.interfaces.match(interface)
+        }
+
+    def sample(self, node, pid, tm=None):
+        """Samples the interfaces of a node
+
+        Arguments:
+            node {string} -- Name of the node
+            pid {int} -- Pid of a process of the node (e.g., container init)
+
+        Keyword Arguments:
+            tm {float} -- Time of the sample (s) (default: {None}, now)
+
+        Returns:
+            dict -- Counters and rates indexed by interface,
+            or None if the process is gone
+        """
+        if tm is None:
+            tm = time.time()
+
+        counters = self.read(pid)
+        if counters is None:
+            self.forget(node)
+            return None
+
+        for interface, values in counters.items():
+            key = (node, interface)
+            previous = self._previous.get(key)
+            self._previous[key] = (tm, dict(values))
+
+            for name in list(values):
+                values[name + "_rate"] = 0.0
+
+            if previous is None:
+                continue
+
+            prev_tm, prev_values = previous
+            elapsed = tm - prev_tm
+            if elapsed <= 0:
+                continue
+
+            for name, value in prev_values.items():
+                delta = values[name] - value
+                # Counters reset if the interface was recreated
+                if delta >= 0:
+                    values[name + "_rate"] = delta / elapsed
+
+        return counters
+
+    def forget(self, node):
+        for key in list(self._previous):
+            if key[0] == node:
+                del self._previous[key]
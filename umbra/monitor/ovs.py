@@ -0,0 +1,173 @@
+import json
+import time
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# Interfaces of all the bridges, read in a single OVSDB transaction
+LIST_INTERFACES = [
+    "ovs-vsctl",
+    "--format=json",
+    "--columns=name,type,ofport,statistics",
+    "list",
+    "Interface",
+]
+
+# Counters of the Interface statistics column that are sampled
+COUNTERS = [
+    "rx_bytes",
+    "rx_packets",
+    "rx_dropped",
+    "rx_errors",
+    "tx_bytes",
+    "tx_packets",
+    "tx_dropped",
+    "tx_errors",
+]
+
+
+def value(datum):
+    """Value of an OVSDB JSON datum, e.g., ["map", [[k, v], ...]] as a dict,
+    ["set", []] (empty optional) as None, and atoms as they are
+
+    Arguments:
+        datum {object} -- The datum
+
+    Returns:
+        object -- The value
+    """
+    if isinstance(datum, list) and len(datum) == 2:
+        kind, items = datum
+        if kind == "map":
+            return {key: value(item) for key, item in items}
+        if kind == "set":
+            return [value(item) for item in items] or None
+        if kind in ("uuid", "named-uuid"):
+            return items
+    return datum
+
+
+def parse(output):
+    """Parses the JSON output of ovs-vsctl list Interface
+
+    Arguments:
+        output {string} -- The ovs-vsctl output
+
+    Returns:
+        dict -- Interfaces (ofport and counters) indexed by name,
+        bridge internal interfaces excluded
+    """
+    table = json.loads(output)
+    headings = table.get("headings", [])
+    interfaces = {}
+
+    for row in table.get("data", []):
+        columns = dict(zip(headings, (value(datum) for datum in row)))
+
+        if columns.get("type") == "internal":
+            continue
+
+        statistics = columns.get("statistics") or {}
+        interfaces[columns.get("name")] = {
+            "ofport": columns.get("ofport"),
+            "counters": {key: statistics.get(key, 0) for key in COUNTERS},
+        }
+
+    return interfaces
+
+
+class OVSSampler:
+    """Samples the port counters of all the Open vSwitch bridges (the
+    switches of the emulated topology) with a single ovs-vsctl call,
+    i.e., one OVSDB transaction, per sample. Rates per second (e.g.,
+    rx_bytes_rate, tx_dropped_rate) are computed from the previous
+    sample of each interface, cached in the sampler.
+    """
+
+    def __init__(self, command=LIST_INTERFACES, timeout=5):
+        self.command = command
+        self.timeout = timeout
+        self._previous = {}
+
+    async def read(self):
+        """Reads the interfaces of the bridges (without blocking the loop)
+
+        Returns:
+            dict -- Interfaces indexed by name, None if ovs-vsctl failed
+        """
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.info(f"Could not read ovs interfaces - {repr(e)}")
+            return None
+
+        if proc.returncode != 0:
+            logger.info(f"Could not read ovs interfaces - {stderr.decode().strip()}")
+            return None
+
+        return parse(stdout.decode())
+
+    def rates(self, interfaces, tm):
+        """Adds the rates of the interfaces counters
+
+        Arguments:
+            interfaces {dict} -- Interfaces (see parse()) indexed by name
+            tm {float} -- Time of the sample (s)
+
+        Returns:
+            dict -- Interfaces ofport and fields (counters and rates)
+            indexed by interface name
+        """
+        samples = {}
+
+        for name, interface in interfaces.items():
+            fields = dict(interface["counters"])
+            previous = self._previous.get(name)
+            self._previous[name] = (tm, interface["counters"])
+
+            for key in interface["counters"]:
+                fields[key + "_rate"] = 0.0
+
+            if previous is not None and tm > previous[0]:
+                elapsed = tm - previous[0]
+                for key, prev_value in previous[1].items():
+                    delta = fields[key] - prev_value
+                    # Counters reset if the port was recreated
+                    if delta >= 0:
+                        fields[key + "_rate"] = delta / elapsed
+
+            samples[name] = {"ofport": interface["ofport"], "fields": fields}
+
+        for name in list(self._previous):
+            if name not in interfaces:
+                del self._previous[name]
+
+        return samples
+
+    async def sample(self, tm=None):
+        """Samples the counters (and rates) of all the bridges interfaces
+
+        Keyword Arguments:
+            tm {float} -- Time of the sample (s) (default: {None}, now)
+
+        Returns:
+            dict -- Interfaces ofport and fields indexed by name (empty if failed)
+        """
+        interfaces = await self.read()
+        if tm is None:
+            tm = time.time()
+
+        if interfaces is None:
+            return {}
+
+        return self.rates(interfaces, tm)
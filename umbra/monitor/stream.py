@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from collections import deque, OrderedDict
+
+from grpclib.client import Channel
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+
+from umbra.common.protobuf.umbra_grpc import BrokerStub
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatsStream:
+    """Long-lived CollectStream to the broker, sending Stats messages
+    as they are put, with at most window of them unacknowledged (flow
+    control). The broker acknowledges each message with a Status whose
+    id is the message sequence. If the stream breaks, the messages not
+    acknowledged are sent again (in order) once it is reopened, and
+    beyond maxsize queued messages the oldest ones are dropped.
+    """
+
+    def __init__(self, address, window=32, maxsize=1000, retry=1.0):
+        self.address = address
+        self.window = window
+        self.maxsize = maxsize
+        self.retry = retry
+        self._queue = deque()
+        self._inflight = OrderedDict()
+        self._sequence = 0
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self.counters = {
+            "sent": 0,
+            "acked": 0,
+            "errors": 0,
+            "dropped": 0,
+            "resent": 0,
+            "connects": 0,
+        }
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout=5.0):
+        """Stops the stream once the queued messages were acknowledged,
+        or after timeout seconds
+
+        Keyword Arguments:
+            timeout {float} -- Seconds to wait for pending messages (default: {5.0})
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Stats stream {self.address} stopped with pending messages")
+        finally:
+            self._task = None
+
+    def put(self, message):
+        """Queues a Stats message to be sent
+
+        Arguments:
+            message {Stats} -- The Stats protobuf message
+        """
+        if len(self._queue) >= self.maxsize:
+            self._queue.popleft()
+            self.counters["dropped"] += 1
+
+        self._queue.append(message)
+        self.start()
+        self._wakeup.set()
+
+    def pending(self):
+        return len(self._queue) + len(self._inflight)
+
+    async def _run(self):
+        while True:
+            try:
+                await self._stream()
+                return
+
+            except (GRPCError, StreamTerminatedError, OSError) as e:
+                logger.info(f"Stats stream {self.address} broken - {repr(e)}")
+
+            except Exception as e:
+                logger.debug(f"Exception in stats stream: {repr(e)}")
+
+            self._requeue()
+
+            if self._stopping:
+                return
+
+            await asyncio.sleep(self.retry)
+
+    def _requeue(self):
+        unacked = list(self._inflight.values())
+        self._inflight.clear()
+        self._queue.extendleft(reversed(unacked))
+        self.counters["resent"] += len(unacked)
+
+        while len(self._queue) > self.maxsize:
+            self._queue.popleft()
+            self.counters["dropped"] += 1
+
+    async def _stream(self):
+        host, port = self.address.split(":")
+        channel = Channel(host, int(port))
+
+        try:
+            stub = BrokerStub(channel)
+            async with stub.CollectStream.open() as stream:
+                await stream.send_request()
+                self.counters["connects"] += 1
+                receiver = asyncio.create_task(self._receive(stream))
+
+                try:
+                    await self._send(stream, receiver)
+                finally:
+                    if not receiver.done():
+                        receiver.cancel()
+
+        finally:
+            channel.close()
+
+    async def _send(self, stream, receiver):
+        while True:
+            if receiver.done():
+                # Raises the exception that ended the stream, if any
+                receiver.result()
+                raise ConnectionError("Stream closed by the broker")
+
+            if self._queue and len(self._inflight) < self.window:
+                message = self._queue.popleft()
+                self._sequence += 1
+                message.sequence = self._sequence
+                self._inflight[self._sequence] = message
+                await stream.send_message(message)
+                self.counters["sent"] += 1
+                continue
+
+            if self._stopping and not self._queue and not self._inflight:
+                await stream.end()
+                await receiver
+                return
+
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _receive(self, stream):
+        try:
+            async for status in stream:
+                self._inflight.pop(int(status.id), None)
+                self.counters["acked"] += 1
+
+                if status.error:
+                    self.counters["errors"] += 1
+                    logger.debug(f"Stats stream error reply: {status.error}")
+
+                self._wakeup.set()
+        finally:
+            self._wakeup.set()
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["queued"] = len(self._queue)
+        stats["inflight"] = len(self._inflight)
+        return stats
@@ -0,0 +1,176 @@
+import json
+import time
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# Qdiscs of all the interfaces of a network namespace, with statistics
+SHOW_QDISCS = ["tc", "-s", "-j", "qdisc", "show"]
+
+# Runs a command in the network namespace of a process
+NSENTER = ["nsenter", "-n", "-t"]
+
+# Counters of a qdisc, their rates per second are sampled
+COUNTERS = ["bytes", "packets", "drops", "overlimits", "requeues"]
+
+# Gauges of a qdisc, sampled as they are
+GAUGES = ["backlog", "qlen"]
+
+# Qdiscs without a queue (e.g., of loopback and veth default)
+NO_QUEUE = ("noqueue",)
+
+
+def parse(output):
+    """Parses the JSON output of tc -s -j qdisc show
+
+    Arguments:
+        output {string} -- The tc output
+
+    Returns:
+        list -- Qdiscs (dicts with dev, kind, handle, parent, and
+        values of the COUNTERS and GAUGES)
+    """
+    qdiscs = []
+
+    for item in json.loads(output or "[]"):
+        kind = item.get("kind")
+        if kind in NO_QUEUE:
+            continue
+
+        qdisc = {
+            "dev": item.get("dev"),
+            "kind": kind,
+            "handle": item.get("handle", ""),
+            "parent": "root" if item.get("root") else item.get("parent", ""),
+        }
+        for key in COUNTERS + GAUGES:
+            qdisc[key] = item.get(key, 0)
+
+        qdiscs.append(qdisc)
+
+    return qdiscs
+
+
+class TCSampler:
+    """Samples the statistics of the tc qdiscs (e.g., the htb/tbf and
+    netem ones TCLink sets to shape the emulated links) of network
+    namespaces: the root one (e.g., switches interfaces) and the ones
+    of containers (by the pid of a process in the namespace). Each
+    namespace is read with a single tc call, all of them concurrently.
+    Rates per second of the counters (e.g., drops_rate) are computed
+    from the previous sample of each qdisc, cached in the sampler.
+    """
+
+    def __init__(self, command=SHOW_QDISCS, timeout=5):
+        self.command = command
+        self.timeout = timeout
+        self._previous = {}
+
+    async def read(self, pid=None):
+        """Reads the qdiscs of a network namespace
+
+        Keyword Arguments:
+            pid {int} -- Pid of a process in the namespace (default: {None}, root)
+
+        Returns:
+            list -- The qdiscs (see parse()), None if tc failed
+        """
+        command = self.command
+        if pid:
+            command = NSENTER + [str(pid)] + command
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.info(f"Could not read qdiscs (pid {pid}) - {repr(e)}")
+            return None
+
+        if proc.returncode != 0:
+            logger.info(f"Could not read qdiscs (pid {pid}) - {stderr.decode()}")
+            return None
+
+        try:
+            return parse(stdout.decode())
+        except ValueError as e:
+            logger.info(f"Could not parse qdiscs (pid {pid}) - {repr(e)}")
+            return None
+
+    def rates(self, namespace, qdiscs, tm):
+        """Fields of the qdiscs of a namespace: gauges, counters and
+        the rates of the counters since the previous sample
+
+        Arguments:
+            namespace {string} -- Name of the namespace (e.g., node)
+            qdiscs {list} -- The qdiscs (see parse())
+            tm {float} -- Time of the sample (s)
+
+        Returns:
+            list -- Tuples of (qdisc, fields)
+        """
+        samples = []
+
+        for qdisc in qdiscs:
+            key = (namespace, qdisc["dev"], qdisc["handle"], qdisc["parent"])
+            previous = self._previous.get(key)
+            self._previous[key] = (tm, qdisc)
+
+            fields = {name: qdisc[name] for name in COUNTERS + GAUGES}
+            for name in COUNTERS:
+                fields[name + "_rate"] = 0.0
+
+            if previous is not None and tm > previous[0]:
+                elapsed = tm - previous[0]
+                for name in COUNTERS:
+                    delta = qdisc[name] - previous[1][name]
+                    # Counters reset if the qdisc was replaced
+                    if delta >= 0:
+                        fields[name + "_rate"] = delta / elapsed
+
+            samples.append((qdisc, fields))
+
+        return samples
+
+    async def sample(self, namespaces, tm=None):
+        """Samples the qdiscs of namespaces, read concurrently
+
+        Arguments:
+            namespaces {dict} -- Pids indexed by namespace name (pid None
+            for the root namespace)
+
+        Keyword Arguments:
+            tm {float} -- Time of the sample (s) (default: {None}, now)
+
+        Returns:
+            list -- Tuples of (namespace, qdisc, fields)
+        """
+        names = list(namespaces)
+        reads = await asyncio.gather(*[self.read(namespaces[n]) for n in names])
+
+        if tm is None:
+            tm = time.time()
+
+        samples = []
+        for namespace, qdiscs in zip(names, reads):
+            if qdiscs is None:
+                self.forget(namespace)
+                continue
+
+            for qdisc, fields in self.rates(namespace, qdiscs, tm):
+                samples.append((namespace, qdisc, fields))
+
+        return samples
+
+    def forget(self, namespace):
+        for key in list(self._previous):
+            if key[0] == namespace:
+                del self._previous[key]
@@ -13,19 +13,29 @@ import platform as pl
 
 from subprocess import check_output, CalledProcessError
 
-from grpclib.client import Channel
-from grpclib.exceptions import GRPCError
 from google.protobuf import json_format
 
 from umbra.common.scheduler import Handler
 from umbra.common.protobuf.umbra_pb2 import Stats
-from umbra.common.protobuf.umbra_grpc import BrokerStub
+from umbra.monitor.stream import StatsStream
+from umbra.monitor.cgroup import CgroupSampler
+from umbra.monitor.netdev import NetDevSampler
+from umbra.monitor.ovs import OVSSampler
+from umbra.monitor.tc import TCSampler
 
 
 logger = logging.getLogger(__name__)
 
 
 class Tool:
+    # Version of the Stats messages sent: 0/1 have string field values,
+    # 2 has typed field values (double_value/int_value) and series
+    STATS_VERSION = 2
+
+    # Long-lived CollectStream per (broker address, environment),
+    # shared by the tools of the monitor
+    STREAMS = {}
+
     def __init__(self, id_, name):
         self.is_process = False
         self.id = id_
@@ -41,58 +51,172 @@ class Tool:
         self._tstop = None
         self.cfg()
 
-    async def _send(self, address, message):
-        logger.info(f"Sending message Stats")
+    def format_field(self, name, value, unit=""):
+        # Numbers are sent as doubles, as series columns are, so a field
+        # keeps the same type in the database whatever the sample format
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return {"name": name, "type": "str", "unit": unit, "value": str(value)}
 
-        try:
-            host, port = address.split(":")
-            channel = Channel(host, port)
-            stub = BrokerStub(channel)
-
-            info = json_format.ParseDict(message, Stats())
-            reply = await stub.Collect(info)
-            info_reply = json_format.MessageToDict(
-                reply, preserving_proto_field_name=True
-            )
+        return {"name": name, "type": "float", "unit": unit, "double_value": value}
+
+    def format_series(self, name, tags, samples):
+        """Packs samples of a measurement into a series, i.e.,
+        the values of each field in a column parallel to timestamps
 
-        except GRPCError as e:
-            logger.info(f"Error in reaching: Stats")
-            logger.debug(f"Exception in stats: {repr(e)}")
-            info_reply = {}
+        Arguments:
+            name {string} -- Name of the measurement
+            tags {dict} -- Tags of the measurement
+            samples {list} -- Tuples of (timestamp (ms), fields dict)
 
-        except OSError as e:
-            logger.info(f"Could not reach channel for Stats")
-            logger.debug(f"Exception: {repr(e)}")
-            info_reply = {}
+        Returns:
+            dict -- The series (Stats.series item)
+        """
+        timestamps = []
+        columns = {}
 
-        except Exception as e:
-            logger.debug(f"Exception: {repr(e)}")
-            info_reply = {}
+        for index, (timestamp, fields) in enumerate(samples):
+            timestamps.append(int(timestamp))
 
-        finally:
-            channel.close()
-            logger.info(f"Reply message Stats {info_reply}")
-            # return info_reply
+            for key, value in fields.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
 
-    def format_metrics(self, metrics):
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = {"name": key, "doubles": []}
+                    column["doubles"].extend([float("nan")] * index)
+
+                column["doubles"].append(float(value))
+
+            for column in columns.values():
+                if len(column["doubles"]) < len(timestamps):
+                    column["doubles"].append(float("nan"))
+
+        series = {
+            "name": name,
+            "tags": tags,
+            "timestamps": timestamps,
+            "columns": list(columns.values()),
+        }
+        return series
+
+    def format_metrics(self, metrics, series=None):
         message = {
             "environment": self.output.get("environment"),
             "source": self.output.get("source"),
+            "version": self.STATS_VERSION,
             "measurements": metrics,
+            "series": series or [],
         }
         return message
 
-    async def flush(self, metrics):
-        message = self.format_metrics(metrics)
+    def stream(self):
+        key = (self.output.get("address"), self.output.get("environment"))
+        stream = self.STREAMS.get(key)
 
-        address = self.output.get("address")
+        if stream is None:
+            stream = self.STREAMS[key] = StatsStream(key[0])
 
-        # loop = asyncio.get_event_loop()
-        # loop.create_task(self._send(stub, message))
-        asyncio.create_task(self._send(address, message))
+        return stream
+
+    async def flush(self, metrics, series=None):
+        message = self.format_metrics(metrics, series)
+        self.stream().put(json_format.ParseDict(message, Stats()))
+
+    @classmethod
+    async def stop_streams(cls):
+        """Stops the streams of the tools, once their queued messages
+        were acknowledged by the broker, and removes them
+        """
+        streams = list(cls.STREAMS.values())
+        cls.STREAMS.clear()
+
+        await asyncio.gather(*[stream.stop() for stream in streams])
+
+    async def sample(self):
+        """Samples the measurements of the tool once, called every
+        interval by sampling() (tools that sample override it)
+
+        Returns:
+            list -- Tuples of (tags, fields) of the measurements
+        """
+        return []
+
+    def format_measurement(self, samples):
+        output = []
+
+        for tags, fields in samples:
+            out = {
+                "name": self.name,
+                "tags": tags,
+                "fields": {
+                    name: self.format_field(name, value)
+                    for name, value in fields.items()
+                },
+            }
+            output.append(out)
+
+        return output
+
+    async def flush_series(self, samples):
+        series = [
+            self.format_series(self.name, dict(tags), values)
+            for tags, values in samples.items()
+        ]
+        await self.flush([], series)
+
+    async def sampling(self, opts):
+        """Samples the measurements of the tool (see sample()) every
+        interval during duration, sending them live: as measurements,
+        or packed in series of batch samples per message if batch > 1
+
+        Arguments:
+            opts {dict} -- Options of the tool (interval, duration, batch)
+
+        Returns:
+            list -- The metrics of the tool (empty, all were sent live)
+        """
+        output_live = self.output.get("live")
+
+        metrics = []
+        interval = float(opts.get("interval", 1))
+        t = float(opts.get("duration", 3))
+
+        # Samples per message, sent packed as series when > 1
+        batch = int(opts.get("batch", 1))
+        series = {}
+        batched = 0
+
+        past = datetime.now()
+        while True:
+            current = datetime.now()
+            seconds = (current - past).total_seconds()
+            if seconds > t:
+                break
+
+            tm = time.time() * 1000
+            samples = await self.sample()
+
+            if output_live and batch > 1:
+                for tags, fields in samples:
+                    key = tuple(sorted(tags.items()))
+                    series.setdefault(key, []).append((tm, fields))
+
+                batched += 1
+                if batched >= batch:
+                    await self.flush_series(series)
+                    series, batched = {}, 0
+
+            elif output_live and samples:
+                output = self.format_measurement(samples)
+                await self.flush(output)
 
-        # reply = asyncio.run(self._send(stub, message))
-        # logger.info(f"Message stats send - reply {reply}")
+            await asyncio.sleep(interval)
+
+        if series:
+            await self.flush_series(series)
+
+        return metrics
 
     async def process_call(self):
         """Performs the async execution of cmd in a subprocess
@@ -301,14 +425,21 @@ class MonProcess(Tool):
         #     else:
         #         cpu_stats["cpu_affinity"] = cpu_stats["cpu_affinity"] + "," + str(affinity[index])
 
-        # cpu_percent
-        cpu_stats["cpu_percent"] = self._p.cpu_percent(interval=0.5)
-
         # user_time, system_time
         cpu_times = self._p.cpu_times()
         user_time, system_time = cpu_times.user, cpu_times.system
 
+        # cpu_percent (of one cpu) since the previous sample, as
+        # cpu_percent(interval) but without sleeping in between
+        cpu_stats["cpu_percent"] = 0.0
+
         if self._first == False:
+            elapsed = tm - prev_info["time"]
+            cpu_delta = user_time + system_time
+            cpu_delta -= prev_info["user_time"] + prev_info["system_time"]
+            if elapsed > 0 and cpu_delta >= 0:
+                cpu_stats["cpu_percent"] = 100.0 * cpu_delta / elapsed
+
             cpu_stats["user_time"] = (user_time - prev_info["user_time"]) / (
                 tm - prev_info["time"]
             )
@@ -396,10 +527,14 @@ class MonProcess(Tool):
 
     def _get_process_stats(self, tm, measurement):
         resources = {}
-        cpu = self._get_process_cpu(tm, measurement)
-        mem = self._get_process_mem()
-        disk = self._get_process_storage(tm, measurement)
-        # net = self._get_process_net()
+
+        # Reads /proc/<pid>/stat, status, io once for all the values
+        with self._p.oneshot():
+            cpu = self._get_process_cpu(tm, measurement)
+            mem = self._get_process_mem()
+            disk = self._get_process_storage(tm, measurement)
+            # net = self._get_process_net()
+
         resources.update(cpu)
         resources.update(mem)
         resources.update(disk)
@@ -408,7 +543,8 @@ class MonProcess(Tool):
 
     def options(self, **kwargs):
         self.is_process = False
-        self.stimulus = partial(self.monitor, kwargs)
+        # self.stimulus = partial(self.monitor, kwargs)
+        self.stimulus = self.monitor(kwargs)
 
     def get_pid(self, name):
         pidlist = []
@@ -423,7 +559,7 @@ class MonProcess(Tool):
                 pid = None
             return pid
 
-    def monitor(self, opts):
+    async def monitor(self, opts):
         metrics = []
         interval = 1
         pid = None
@@ -462,12 +598,17 @@ class MonProcess(Tool):
                 break
             else:
                 tm = time.time()
-                measurement = self._get_process_stats(tm, measurement)
+                try:
+                    measurement = self._get_process_stats(tm, measurement)
+                except ps.NoSuchProcess:
+                    logger.debug(f"Process {pid} finished")
+                    break
+
                 measurement["time"] = tm
                 self._first = False
 
                 metrics.append(measurement)
-                time.sleep(interval)
+                await asyncio.sleep(interval)
 
         return metrics
 
@@ -505,10 +646,20 @@ class MonProcess(Tool):
 
 
 class MonContainer(Tool):
+    # Sampler of the containers stats: cgroup (reads the cgroup files
+    # of all containers in one pass) or docker (stats API, blocking ~1s
+    # per container); cgroup falls back to docker if not available
+    SAMPLER = "cgroup"
+
     def __init__(self, url=None):
         Tool.__init__(self, 2, "container")
         self._command = None
         self._connected_to_docker = False
+        self._dc = None
+        self._sampler = None
+        self._cgroups = {}
+        self._names = []
+        self._mode = self.SAMPLER
         self.url = url
         if not url:
             self.url = "unix://var/run/docker.sock"
@@ -518,6 +669,8 @@ class MonContainer(Tool):
             "interval": "interval",
             "targets": "targets",
             "duration": "duration",
+            "batch": "batch",
+            "sampler": "sampler",
         }
         self.parameters = params
         self.cmd = ""
@@ -619,94 +772,96 @@ class MonContainer(Tool):
         summary_stats.update(stats_io)
         return summary_stats
 
-    def options(self, **kwargs):
-        self.is_process = False
-        # self.stimulus = partial(self.monitor, kwargs)
-        self.stimulus = self.monitor(kwargs)
+    def _cgroup(self, name):
+        """Cgroup of a container (cached), found from its id and pid
 
-    def format_measurement(self, measurements):
-        output = []
+        Arguments:
+            name {string} -- Name (or id) of the container
 
-        for data in measurements:
+        Returns:
+            Cgroup -- The container cgroup, or None if not found
+        """
+        if name in self._cgroups:
+            return self._cgroups[name]
 
-            data_source_name = data.get("name")
-            del data["name"]
+        container_id, pid = name, None
 
-            fields = {}
-            for name, value in data.items():
-                m = {
-                    "name": name,
-                    "type": "float",
-                    "unit": "",
-                    "value": str(value),
-                }
-                fields[name] = m
-
-            # out = {
-            #     "name": data_source_name,
-            #     "tags": {
-            #         "source": self.name,
-            #     },
-            #     "fields": fields,
-            # }
-            out = {
-                "name": self.name,
-                "tags": {
-                    "source": data_source_name,
-                },
-                "fields": fields,
-            }
-            output.append(out)
+        if self._dc:
+            try:
+                container = self._dc.containers.get(name)
+            except Exception as e:
+                logger.debug(f"Could not get container {name} - {repr(e)}")
+            else:
+                container_id = container.id
+                pid = container.attrs.get("State", {}).get("Pid")
 
-        return output
+        cgroup = self._sampler.find(container_id, pid)
+        if cgroup is None:
+            logger.info(f"Cgroup of container {name} not found - using docker stats")
 
-    async def monitor(self, opts):
-        self.connect()
+        self._cgroups[name] = cgroup
+        return cgroup
 
-        output_live = self.output.get("live")
+    def _sample(self, names, sampler):
+        """Samples the stats of all containers in one pass, through
+        their cgroup files, or the docker stats API (as fallback).
+        Runs in an executor thread, so the monitor loop does not block
 
-        metrics = []
-        interval = 1
-        t = 3
+        Arguments:
+            names {list} -- Names of the containers
+            sampler {string} -- Sampler (cgroup or docker)
 
-        if "interval" in opts:
-            interval = float(opts["interval"])
-        if "duration" in opts:
-            t = float(opts["duration"])
+        Returns:
+            list -- Tuples of (tags, fields) of the containers
+        """
+        samples = []
+        tm = time.time()
 
-        if "targets" in opts:
-            targets = opts["targets"]
-            names = eval(targets)
-        else:
-            return metrics
+        for name in names:
+            measurement = None
+            cgroup = self._cgroup(name) if sampler == "cgroup" else None
 
-        past = datetime.now()
-        while True:
-            current = datetime.now()
-            _time = {"timestamp": current.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
-            seconds = (current - past).total_seconds()
-            if seconds > t:
-                break
-            else:
+            if cgroup:
+                measurement = self._sampler.sample(name, cgroup, tm)
+                if measurement is None:
+                    # Container restarted/removed, cgroup found again next time
+                    self._cgroups.pop(name, None)
 
-                measurements = []
-                for name in names:
-                    measurement = self._stats(name=name)
-                    measurement["name"] = name
+            if measurement is None:
+                measurement = self._stats(name=name)
 
-                    if "read" in measurement:
-                        del measurement["read"]
+            measurement.pop("read", None)
+            samples.append(({"source": name}, measurement))
 
-                    measurements.append(measurement)
+        return samples
 
-                if output_live:
-                    output = self.format_measurement(measurements)
-                    await self.flush(output)
+    async def sample(self):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._sample, self._names, self._mode)
 
-                # metrics.append(measurements)
-                await asyncio.sleep(interval)
+    def options(self, **kwargs):
+        self.is_process = False
+        # self.stimulus = partial(self.monitor, kwargs)
+        self.stimulus = self.monitor(kwargs)
 
-        return metrics
+    async def monitor(self, opts):
+        self.connect()
+
+        if "targets" in opts:
+            targets = opts["targets"]
+            self._names = eval(targets)
+        else:
+            return []
+
+        sampler = opts.get("sampler", self.SAMPLER)
+        if sampler == "cgroup":
+            self._sampler = self._sampler or CgroupSampler()
+            if not self._sampler.available():
+                logger.info("Cgroup filesystem not available - using docker stats")
+                sampler = "docker"
+        self._mode = sampler
+
+        return await self.sampling(opts)
 
     def parser(self, out):
         metrics = []
@@ -740,17 +895,326 @@ class MonContainer(Tool):
         self.metrics = {"uuid": self.uuid, "metrics": metrics}
 
 
+class ContainerPids:
+    """Pids of the containers (e.g., of the emulated nodes) by name,
+    looked up in docker and cached until forgotten (e.g., when the
+    container restarted), used to read their network namespaces
+    """
+
+    def __init__(self, pids=None):
+        self._dc = None
+        self._pids = dict(pids or {})
+
+    def connect(self):
+        try:
+            self._dc = docker.from_env()
+        except Exception as e:
+            self._dc = None
+            logger.info(f"Could not connect to docker - {repr(e)}")
+
+    def get(self, name):
+        """Pid of the container of a node (cached)
+
+        Arguments:
+            name {string} -- Name of the container
+
+        Returns:
+            int -- The pid, or None if the container is not running
+        """
+        pid = self._pids.get(name)
+
+        if pid is None and self._dc:
+            try:
+                container = self._dc.containers.get(name)
+            except Exception as e:
+                logger.debug(f"Could not get container {name} - {repr(e)}")
+            else:
+                pid = container.attrs.get("State", {}).get("Pid") or None
+                self._pids[name] = pid
+
+        return pid
+
+    def forget(self, name):
+        self._pids.pop(name, None)
+
+
+class MonNetwork(Tool):
+    """Samples the counters (bytes, packets, errors and drops, and their
+    rates per second) of the network interfaces of the containers of
+    the emulated nodes, reading /proc/<container pid>/net/dev of all
+    the targets in one pass. Measurements are tagged with the node
+    (source), interface and link (if the links option maps
+    "<node>:<interface>" to the link name).
+    """
+
+    def __init__(self):
+        Tool.__init__(self, 5, "network")
+        self._sampler = NetDevSampler()
+        self._containers = ContainerPids()
+        self._names = []
+        self._links = {}
+
+    def cfg(self):
+        params = {
+            "interval": "interval",
+            "targets": "targets",
+            "links": "links",
+            "duration": "duration",
+            "batch": "batch",
+        }
+        self.parameters = params
+        self.cmd = ""
+
+    def _sample(self, names):
+        """Samples the interfaces of all the targets in one pass,
+        run in an executor thread (docker is queried for new pids)
+
+        Arguments:
+            names {list} -- Names of the containers
+
+        Returns:
+            list -- Tuples of (node, interface, fields)
+        """
+        samples = []
+        tm = time.time()
+
+        for name in names:
+            pid = self._containers.get(name)
+            if not pid:
+                continue
+
+            interfaces = self._sampler.sample(name, pid, tm)
+            if interfaces is None:
+                # Container restarted/removed, pid looked up again next time
+                self._containers.forget(name)
+                continue
+
+            for interface, fields in interfaces.items():
+                samples.append((name, interface, fields))
+
+        return samples
+
+    def tags(self, node, interface, links):
+        tags = {"source": node, "interface": interface}
+        link = links.get(node + ":" + interface)
+        if link:
+            tags["link"] = link
+        return tags
+
+    def samples(self, sweep, links):
+        """Tags and fields of the interfaces sampled
+
+        Returns:
+            list -- Tuples of (tags, fields)
+        """
+        return [
+            (self.tags(node, interface, links), fields)
+            for node, interface, fields in sweep
+        ]
+
+    async def sample(self):
+        loop = asyncio.get_event_loop()
+        sweep = await loop.run_in_executor(None, self._sample, self._names)
+        return self.samples(sweep, self._links)
+
+    def options(self, **kwargs):
+        self.is_process = False
+        self.stimulus = self.monitor(kwargs)
+
+    async def monitor(self, opts):
+        self._containers.connect()
+
+        if "targets" in opts:
+            self._names = eval(opts["targets"])
+        else:
+            return []
+
+        self._links = eval(opts.get("links", "{}"))
+        return await self.sampling(opts)
+
+    def parser(self, out):
+        self.metrics = {"uuid": self.uuid, "metrics": []}
+
+
+class MonSwitch(Tool):
+    """Samples the port counters (bytes, packets, drops and errors, and
+    their rates per second) of the Open vSwitch switches of the emulated
+    topology, all the bridges read in one OVSDB transaction per interval.
+    The ports option maps each switch interface (e.g., s1-eth1) to its
+    (switch, port number), and the links option to its link name, as in
+    the intfs and links of the topology info (Environment.parse_info).
+    """
+
+    def __init__(self):
+        Tool.__init__(self, 6, "switch")
+        self._sampler = OVSSampler()
+        self._ports = {}
+        self._links = {}
+
+    def cfg(self):
+        params = {
+            "interval": "interval",
+            "ports": "ports",
+            "links": "links",
+            "duration": "duration",
+            "batch": "batch",
+        }
+        self.parameters = params
+        self.cmd = ""
+
+    def tags(self, interface, ofport, ports, links):
+        switch, port = ports.get(interface, ("", ofport))
+        tags = {"source": switch, "interface": interface, "port": str(port)}
+        link = links.get(interface)
+        if link:
+            tags["link"] = link
+        return tags
+
+    def samples(self, sweep, ports, links):
+        """Tags and fields of the interfaces sampled, only the ones of
+        the topology switches if ports is set
+
+        Returns:
+            list -- Tuples of (tags, fields)
+        """
+        samples = []
+
+        for interface, sample in sweep.items():
+            if ports and interface not in ports:
+                continue
+            tags = self.tags(interface, sample["ofport"], ports, links)
+            samples.append((tags, sample["fields"]))
+
+        return samples
+
+    async def sample(self):
+        sweep = await self._sampler.sample()
+        return self.samples(sweep, self._ports, self._links)
+
+    def options(self, **kwargs):
+        self.is_process = False
+        self.stimulus = self.monitor(kwargs)
+
+    async def monitor(self, opts):
+        self._ports = eval(opts.get("ports", "{}"))
+        self._links = eval(opts.get("links", "{}"))
+        return await self.sampling(opts)
+
+    def parser(self, out):
+        self.metrics = {"uuid": self.uuid, "metrics": []}
+
+
+class MonQueue(Tool):
+    """Samples the statistics of the tc qdiscs shaping the emulated links
+    (queue backlog and length, and the rates of bytes, packets, drops,
+    overlimits and requeues): the qdiscs of the root network namespace
+    (e.g., switches interfaces), and of the containers of the targets,
+    each namespace read with a single tc call, all of them concurrently.
+    Measurements are tagged with the node (source; the switch of the
+    interface, from the ports option, in the root namespace), interface,
+    qdisc kind, handle, parent and link (from the links option, mapping
+    "<node>:<interface>" to the link name). Only the qdiscs of the ports
+    interfaces are sampled in the root namespace (none if ports is not set).
+    """
+
+    def __init__(self):
+        Tool.__init__(self, 7, "queue")
+        self._tc = TCSampler()
+        self._containers = ContainerPids()
+        self._names = []
+        self._ports = {}
+        self._links = {}
+
+    def cfg(self):
+        params = {
+            "interval": "interval",
+            "targets": "targets",
+            "ports": "ports",
+            "links": "links",
+            "duration": "duration",
+            "batch": "batch",
+        }
+        self.parameters = params
+        self.cmd = ""
+
+    def _namespaces(self, names, ports):
+        # The root namespace has the switches interfaces (and the host ones)
+        namespaces = {"": None} if ports else {}
+        for name in names:
+            pid = self._containers.get(name)
+            if pid:
+                namespaces[name] = pid
+        return namespaces
+
+    def samples(self, sweep, ports, links):
+        """Tags and fields of the qdiscs sampled, in the root namespace
+        only the ones of the ports interfaces (i.e., of the switches)
+
+        Returns:
+            list -- Tuples of (tags, fields)
+        """
+        samples = []
+
+        for namespace, qdisc, fields in sweep:
+            interface = qdisc["dev"]
+            if not namespace and interface not in ports:
+                continue
+
+            node = namespace or ports[interface][0]
+
+            tags = {
+                "source": node,
+                "interface": interface,
+                "qdisc": qdisc["kind"],
+                "handle": qdisc["handle"],
+                "parent": qdisc["parent"],
+            }
+            link = links.get(node + ":" + interface)
+            if link:
+                tags["link"] = link
+
+            samples.append((tags, fields))
+
+        return samples
+
+    async def sample(self):
+        loop = asyncio.get_event_loop()
+        namespaces = await loop.run_in_executor(
+            None, self._namespaces, self._names, self._ports
+        )
+        sweep = await self._tc.sample(namespaces)
+        return self.samples(sweep, self._ports, self._links)
+
+    def options(self, **kwargs):
+        self.is_process = False
+        self.stimulus = self.monitor(kwargs)
+
+    async def monitor(self, opts):
+        self._containers.connect()
+
+        self._names = eval(opts.get("targets", "set()"))
+        self._ports = eval(opts.get("ports", "{}"))
+        self._links = eval(opts.get("links", "{}"))
+        return await self.sampling(opts)
+
+    def parser(self, out):
+        self.metrics = {"uuid": self.uuid, "metrics": []}
+
+
 class MonHost(Tool):
     def __init__(self):
         Tool.__init__(self, 3, "host")
         self._first = True
         self._command = None
+        self._cpu_times = None
+        self._measurement = {"time": 0.0}
         self._info = self._get_node_info()
 
     def cfg(self):
         params = {
             "interval": "interval",
             "duration": "duration",
+            "batch": "batch",
         }
         self.parameters = params
         self.cmd = ""
@@ -766,9 +1230,35 @@ class MonHost(Tool):
         info["processor"] = processor
         return info
 
+    def _get_node_cpu_percent(self, times):
+        """Utilization of all cpus since the previous call, from the deltas
+        of /proc/stat times (as cpu_percent(interval), without sleeping)
+
+        Arguments:
+            times {scputimes} -- The psutil.cpu_times() output
+
+        Returns:
+            float -- The cpu percent (0.0 in the first call)
+        """
+        # guest times are accounted in user/nice times too
+        total = sum(times) - times.guest - times.guest_nice
+        idle = times.idle + times.iowait
+
+        previous, self._cpu_times = self._cpu_times, (total, idle)
+        if previous is None:
+            return 0.0
+
+        total_delta = total - previous[0]
+        if total_delta <= 0:
+            return 0.0
+
+        busy = total_delta - (idle - previous[1])
+        return min(max(100.0 * busy / total_delta, 0.0), 100.0)
+
     def _get_node_cpu(self, tm, prev_info):
         cpu_stats = {}
-        cpu_stats["cpu_percent"] = ps.cpu_percent(interval=0.5)
+        times = ps.cpu_times()
+        cpu_stats["cpu_percent"] = self._get_node_cpu_percent(times)
 
         (
             user,
@@ -781,7 +1271,7 @@ class MonHost(Tool):
             steal,
             guest,
             guest_nice,
-        ) = ps.cpu_times()
+        ) = times
 
         if self._first == False:
             cpu_stats["user_time"] = (user - prev_info["user_time"]) / (
@@ -923,74 +1413,20 @@ class MonHost(Tool):
         # self.stimulus = partial(self.monitor, kwargs)
         self.stimulus = self.monitor(kwargs)
 
-    def format_measurement(self, data):
-        fields = {}
+    async def sample(self):
+        tm = time.time()
+        self._measurement = self._get_node_stats(tm, self._measurement)
+        self._measurement["time"] = tm
+        self._first = False
 
-        for name, value in data.items():
-            m = {
-                "name": name,
-                "type": "float",
-                "unit": "",
-                "value": str(value),
-            }
-            fields[name] = m
-
-        # out = {
-        #     "name": self._info.get("node"),
-        #     "tags": {
-        #         "source": self.name,
-        #     },
-        #     "fields": fields,
-        # }
-        out = {
-            "name": self.name,
-            "tags": {
-                "source": self._info.get("node"),
-            },
-            "fields": fields,
-        }
-
-        output = [out]
-        return output
+        tags = {"source": self._info.get("node")}
+        return [(tags, dict(self._measurement))]
 
     async def monitor(self, opts):
-        ouput_live = self.output.get("live")
-
-        metrics = []
-        interval = 1
-        t = 3
-        if "interval" in opts:
-            interval = float(opts.get("interval", 1))
-
-        if "duration" in opts:
-            t = float(opts.get("duration", 0))
-        else:
-            return metrics
-
-        past = datetime.now()
-        measurement = {}
-        measurement["time"] = 0.0
-        while True:
-            current = datetime.now()
-            _time = {"timestamp": current.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
-            seconds = (current - past).total_seconds()
-            if seconds > t:
-                break
-            else:
-                tm = time.time()
-                measurement = self._get_node_stats(tm, measurement)
-                measurement["time"] = tm
-                current = datetime.now()
-                self._first = False
+        if "duration" not in opts:
+            return []
 
-                if ouput_live:
-                    output = self.format_measurement(measurement)
-                    await self.flush(output)
-
-                # metrics.append(measurement)
-                await asyncio.sleep(interval)
-
-        return metrics
+        return await self.sampling(opts)
 
     def parser(self, out):
         metrics = []
@@ -1068,6 +1504,9 @@ class Tools:
     TOOLS = [
         MonProcess,
         MonContainer,
+        MonNetwork,
+        MonSwitch,
+        MonQueue,
         MonHost,
         MonTcpdump,
         MonDummy,
@@ -1153,6 +1592,10 @@ class Tools:
         elif action == "stop":
             output = await self.handler.stop(calls)
 
+            # Messages still queued are sent once no tool is running
+            if not self.handler.running():
+                await Tool.stop_streams()
+
         else:
             output = None
 
@@ -0,0 +1,166 @@
+import sys
+import time
+import asyncio
+import logging
+import argparse
+
+from google.protobuf import json_format
+
+from umbra.common.protobuf.umbra_pb2 import Stats
+from umbra.broker.collector import Collector
+from umbra.broker.influx import encode
+
+
+logger = logging.getLogger(__name__)
+
+
+def source(index):
+    return "peer" + str(index) + ".org1.example.com"
+
+
+def value(index, field, sample=0):
+    return field * 1.5 + index + sample / 7
+
+
+def build_stats(containers, fields, typed=False, sample=0):
+    """Builds a Stats message as sent by a monitor container tool,
+    one measurement per container with float fields (as strings,
+    or as double_value if typed)
+    """
+    measurements = []
+
+    for index in range(containers):
+        measurement = {
+            "name": "container",
+            "tags": {"source": source(index)},
+            "fields": {},
+        }
+        for field in range(fields):
+            name = "field_" + str(field)
+            data = {"name": name, "type": "float", "unit": ""}
+            if typed:
+                data["double_value"] = value(index, field, sample)
+            else:
+                data["value"] = str(value(index, field, sample))
+            measurement["fields"][name] = data
+
+        measurements.append(measurement)
+
+    message = {
+        "environment": "env356",
+        "source": "container",
+        "version": 2 if typed else 0,
+        "measurements": measurements,
+    }
+    return json_format.ParseDict(message, Stats())
+
+
+def build_series(containers, fields, samples):
+    """Builds a Stats message with samples of each container
+    packed in a series
+    """
+    series = []
+
+    for index in range(containers):
+        columns = [
+            {
+                "name": "field_" + str(field),
+                "doubles": [value(index, field, sample) for sample in range(samples)],
+            }
+            for field in range(fields)
+        ]
+        series.append(
+            {
+                "name": "container",
+                "tags": {"source": source(index)},
+                "timestamps": [1600000000000 + 1000 * s for s in range(samples)],
+                "columns": columns,
+            }
+        )
+
+    message = {
+        "environment": "env356",
+        "source": "container",
+        "version": 2,
+        "series": series,
+    }
+    return json_format.ParseDict(message, Stats())
+
+
+async def dict_path(collector, message):
+    msg = json_format.MessageToDict(message, preserving_proto_field_name=True)
+    data, database = await collector.parse_message(msg)
+    return encode(data)
+
+
+async def fast_path(collector, message):
+    lines = collector.encoder.encode(message, message.environment)
+    return encode(lines)
+
+
+async def decode_path(collector, data):
+    message = Stats.FromString(data)
+    lines = collector.encoder.encode(message, message.environment)
+    return encode(lines)
+
+
+async def bench(path, collector, message, seconds):
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            await path(collector, message)
+        count += 100
+
+    return count / (time.perf_counter() - start)
+
+
+async def main(args):
+    collector = Collector({"address": "127.0.0.1:8956"})
+    message = build_stats(args.containers, args.fields)
+    collector.databases[message.environment] = message.source
+
+    before = await bench(dict_path, collector, message, args.seconds)
+    after = await bench(fast_path, collector, message, args.seconds)
+
+    print(f"Stats with {args.containers} measurements x {args.fields} fields")
+    print(f"dict path (MessageToDict + parse_message): {before:10.1f} msgs/sec")
+    print(f"fast path (StatsEncoder):                  {after:10.1f} msgs/sec")
+    print(f"speedup: {after / before:.2f}x")
+
+    # Wire formats: samples (messages) of legacy string fields,
+    # typed fields, and packed in series, decoded and encoded by the collector
+    samples = args.samples
+    legacy = [
+        build_stats(args.containers, args.fields, sample=s).SerializeToString()
+        for s in range(samples)
+    ]
+    typed = [
+        build_stats(args.containers, args.fields, True, s).SerializeToString()
+        for s in range(samples)
+    ]
+    packed = [
+        build_series(args.containers, args.fields, samples).SerializeToString()
+    ]
+
+    print(f"\n{samples} samples of {args.containers} x {args.fields} fields")
+    for name, payloads in [("legacy", legacy), ("typed", typed), ("packed", packed)]:
+        size = sum(len(payload) for payload in payloads)
+
+        async def path(collector, _):
+            for payload in payloads:
+                await decode_path(collector, payload)
+
+        rate = await bench(path, collector, None, args.seconds) * samples
+        print(f"{name:8s} {size:10d} bytes {rate:12.1f} samples/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of Stats ingestion paths")
+    parser.add_argument("--containers", type=int, default=20)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--samples", type=int, default=10)
+    asyncio.run(main(parser.parse_args(sys.argv[1:])))
@@ -0,0 +1,138 @@
+import os
+import logging
+import unittest
+import tempfile
+import asyncio
+
+from umbra.monitor.cgroup import CgroupSampler
+from umbra.monitor.tools import MonContainer
+
+
+logger = logging.getLogger(__name__)
+
+
+def write(root, path, content):
+    filepath = os.path.join(root, path)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w") as fp:
+        fp.write(content)
+
+
+class TestCgroupSampler(unittest.TestCase):
+    def test_v2(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = os.path.join(folder, "cgroup")
+            proc = os.path.join(folder, "proc")
+            scope = "system.slice/docker-abc.scope"
+
+            write(root, "cgroup.controllers", "cpu io memory")
+            write(proc, "meminfo", "MemTotal:       1024 kB\nMemFree: 512 kB\n")
+            write(proc, "42/cgroup", "0::/" + scope + "\n")
+            write(root, scope + "/memory.current", "256\n")
+            write(root, scope + "/memory.max", "max\n")
+            write(root, scope + "/memory.stat", "anon 128\nfile 64\n")
+            write(root, scope + "/io.stat", "8:0 rbytes=100 wbytes=10 rios=1\n")
+            write(
+                root,
+                scope + "/cpu.stat",
+                "usage_usec 1000000\nuser_usec 600000\nsystem_usec 400000\n",
+            )
+
+            sampler = CgroupSampler(root, proc)
+            assert sampler.version == 2
+            assert sampler.find("xyz") is None
+
+            cgroup = sampler.find("abc", pid=42)
+            first = sampler.sample("peer0", cgroup, tm=10.0)
+
+            write(
+                root,
+                scope + "/cpu.stat",
+                "usage_usec 1500000\nuser_usec 800000\nsystem_usec 700000\n",
+            )
+            write(root, scope + "/io.stat", "8:0 rbytes=300 wbytes=10\n8:16 wbytes=5\n")
+            second = sampler.sample("peer0", cgroup, tm=11.0)
+
+            # Found from the systemd driver folder, without the pid
+            assert sampler.find("abc").paths == cgroup.paths
+
+        assert first["cpu_percent"] == 0.0
+        assert first["cpu_total_usage"] == 1000000000
+        assert first["mem_usage"] == 256
+        assert first["mem_limit"] == 1024 * 1024
+        assert first["mem_anon"] == 128
+        assert first["io_read"] == 100
+
+        assert second["cpu_percent"] == 50.0
+        assert second["cpu_usage_in_kernelmode"] == 700000000
+        assert second["io_read_rate"] == 200.0
+        assert second["io_write"] == 15
+        assert second["io_write_rate"] == 5.0
+
+    def test_v1(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = os.path.join(folder, "cgroup")
+            proc = os.path.join(folder, "proc")
+
+            unlimited = "9223372036854771712"
+
+            write(proc, "meminfo", "MemTotal:       1024 kB\n")
+            write(root, "memory/docker/abc/memory.usage_in_bytes", "512\n")
+            write(root, "memory/docker/abc/memory.limit_in_bytes", unlimited)
+            write(root, "memory/docker/abc/memory.max_usage_in_bytes", "600\n")
+            write(root, "memory/docker/abc/memory.stat", "cache 10\nrss 20\n")
+            write(root, "cpuacct/docker/abc/cpuacct.usage", "2000000000\n")
+            write(root, "cpuacct/docker/abc/cpuacct.stat", "user 0\nsystem 0\n")
+            write(
+                root,
+                "blkio/docker/abc/blkio.throttle.io_service_bytes_recursive",
+                "8:0 Read 30\n8:0 Write 40\n8:0 Total 70\nTotal 70\n",
+            )
+
+            sampler = CgroupSampler(root, proc)
+            cgroup = sampler.find("abc")
+            sample = sampler.sample("peer0", cgroup, tm=10.0)
+
+            os.remove(os.path.join(root, "cpuacct/docker/abc/cpuacct.usage"))
+            assert sampler.sample("peer0", cgroup, tm=11.0) is None
+
+        assert sampler.version == 1
+        assert sample["cpu_total_usage"] == 2000000000
+        assert sample["mem_limit"] == 1024 * 1024
+        assert sample["mem_max_usage"] == 600
+        assert sample["mem_rss"] == 20
+        assert sample["mem_percent"] == 100.0 * 512 / (1024 * 1024)
+        assert sample["io_read"] == 30
+        assert sample["io_write"] == 40
+
+
+class TestMonContainer(unittest.TestCase):
+    def test_init_sampler(self):
+        sampled = []
+
+        def stats(name=None):
+            sampled.append(name)
+            return {"cpu_percent": 1.0}
+
+        tool = MonContainer()
+        tool.connect = lambda: None
+        tool._stats = stats
+        parameters = {
+            "targets": "['peer0']",
+            "interval": "0.05",
+            "duration": "0.01",
+            "sampler": "docker",
+        }
+        tool.init({"live": False}, {"id": "container-1", "parameters": parameters})
+
+        asyncio.run(tool.stimulus)
+
+        # The cgroup sampler (default) is not used, even if available
+        assert tool._mode == "docker"
+        assert tool._sampler is None
+        assert sampled == ["peer0"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
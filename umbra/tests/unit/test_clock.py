@@ -0,0 +1,86 @@
+import time
+import logging
+import unittest
+import asyncio
+
+from umbra.common.clock import VirtualLoop, run_virtual
+from umbra.common.scheduler import Handler, EventCall
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_sleep(self):
+        async def run():
+            loop = asyncio.get_event_loop()
+            start = loop.time()
+            await asyncio.sleep(3600)
+            return loop.time() - start
+
+        begin = time.monotonic()
+        elapsed = run_virtual(run())
+
+        assert elapsed >= 3600
+        assert time.monotonic() - begin < 1.0
+
+    def test_schedule_hour(self):
+        fired = []
+        running = {"now": 0, "max": 0}
+
+        async def call(event):
+            loop = asyncio.get_event_loop()
+            fired.append((event, loop.time()))
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(30)
+            running["now"] -= 1
+            return {"event": event}
+
+        calls = {
+            "flap": (
+                EventCall(call, "flap"),
+                {"from": 60, "repeat": 59, "interval": 60, "mode": "deadline"},
+            ),
+            "ramp": (
+                EventCall(call, "ramp"),
+                {"arrival": "ramp", "rate": 0, "rate_end": 1, "until": 3600},
+            ),
+            "stop": (EventCall(call, "stop"), {"after": "flap", "from": 10}),
+        }
+
+        async def run():
+            handler = Handler(clock=asyncio.get_event_loop())
+            results = await handler.run(calls)
+            return handler, results
+
+        begin = time.monotonic()
+        handler, results = run_virtual(run())
+
+        flaps = [when for event, when in fired if event == "flap"]
+        ramps = [when for event, when in fired if event == "ramp"]
+        stops = [when for event, when in fired if event == "stop"]
+
+        assert time.monotonic() - begin < 5.0
+        assert len(flaps) == 59
+        assert flaps[0] >= 60 and flaps[-1] >= 3540
+        assert handler.counters["flap"]["missed"] == 0
+        assert len(ramps) == 1800
+        assert stops[0] >= flaps[-1] + 40
+        assert running["max"] > 1
+        assert results["stop"] == {"event": "stop"}
+
+    def test_loop_time(self):
+        loop = VirtualLoop(start=100.0)
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(asyncio.sleep(50))
+            assert 150.0 <= loop.time() < 150.1
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,108 @@
+import socket
+import logging
+import tempfile
+import unittest
+import asyncio
+
+from aiohttp import web
+
+from google.protobuf import json_format
+
+from umbra.common.protobuf.umbra_pb2 import Stats
+from umbra.broker.collector import Collector
+from umbra.broker.influx import InfluxClient
+from umbra.broker.spill import Spill
+from umbra.broker.writer import Writer
+
+
+logger = logging.getLogger(__name__)
+
+
+def stats(value):
+    message = {
+        "environment": "env1",
+        "source": "container",
+        "measurements": [
+            {
+                "name": "container",
+                "tags": {"source": "peer0"},
+                "fields": {"cpu": {"name": "cpu", "double_value": value}},
+            }
+        ],
+    }
+    return json_format.ParseDict(message, Stats())
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestCollector(unittest.TestCase):
+    def test_collect_influx_down(self):
+        received = {"databases": [], "lines": []}
+
+        async def query(request):
+            q = request.query.get("q")
+            if q == "SHOW DATABASES":
+                values = [[name] for name in received["databases"]]
+                series = [{"name": "databases", "columns": ["name"], "values": values}]
+                return web.json_response({"results": [{"series": series}]})
+            received["databases"].append(q.split('"')[1])
+            return web.json_response({"results": [{}]})
+
+        async def write(request):
+            body = await request.read()
+            received["lines"].extend(body.decode().split("\n"))
+            return web.Response(status=204)
+
+        async def run(folder):
+            port = free_port()
+            collector = Collector({"address": "127.0.0.1", "rollups": [], "recent": 0})
+            collector.influx_client = InfluxClient("127.0.0.1", port)
+            collector.writer = Writer(
+                collector.write_batch, age=0.01, spill=Spill(folder)
+            )
+
+            async def datasource(database):
+                raise ConnectionError("grafana down")
+
+            collector.datasource = datasource
+
+            # Influx is down: messages are enqueued (and spilled), not lost
+            for value in range(3):
+                await asyncio.wait_for(collector.collect(stats(value)), 1)
+                await asyncio.sleep(0.02)
+
+            enqueued = collector.writer.stats()["enqueued"]
+
+            app = web.Application()
+            app.router.add_route("*", "/query", query)
+            app.router.add_post("/write", write)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", port)
+            await site.start()
+
+            try:
+                await asyncio.sleep(0.1)
+                await collector.writer.stop()
+            finally:
+                await collector.influx_client.close()
+                await runner.cleanup()
+
+            return enqueued
+
+        with tempfile.TemporaryDirectory() as folder:
+            enqueued = asyncio.run(run(folder))
+
+        assert enqueued == 3
+        assert received["databases"] == ["env1"]
+        values = [line.split(" ")[1] for line in received["lines"]]
+        assert values == ["cpu=0.0", "cpu=1.0", "cpu=2.0"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import ast
+import json
+import struct
+import logging
+import zipfile
+import unittest
+import asyncio
+import tempfile
+from array import array
+
+from aiohttp import web
+
+from umbra.broker.influx import InfluxClient
+from umbra.broker.export import Exporter, Table
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_npz(path):
+    """Reads the 1-D arrays of a .npz file (as numpy.load would),
+    into lists of values (NaN for the nulls of float columns)
+    """
+    arrays = {}
+
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.namelist():
+            data = archive.read(member)
+            assert data[:8] == b"\x93NUMPY\x01\x00"
+            (length,) = struct.unpack("<H", data[8:10])
+            assert (10 + length) % 64 == 0
+            header = ast.literal_eval(data[10 : 10 + length].decode())
+            body = data[10 + length :]
+            descr = header["descr"]
+            (rows,) = header["shape"]
+
+            if descr.startswith("<U"):
+                width = int(descr[2:]) * 4
+                values = [
+                    body[i * width : (i + 1) * width].decode("utf-32-le").rstrip("\0")
+                    for i in range(rows)
+                ]
+            else:
+                typecode = {"<f8": "d", "<i8": "q", "|b1": "b"}[descr]
+                values = array(typecode)
+                values.frombytes(body)
+                values = list(values)
+
+            assert len(values) == rows
+            arrays[member[: -len(".npy")]] = (descr, values)
+
+    return arrays
+
+
+class TestTable(unittest.TestCase):
+    def test_chunks(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "host.npz")
+            kinds = {"time": "time", "cpu": "float", "pids": "integer"}
+            table = Table(path, kinds)
+
+            table.append(["time", "cpu", "name"], [[1, 1.5, "h1"], [2, None, "h2"]])
+            table.append(["time", "pids", "name"], [[3, 7, "peer0.org1"]])
+            entry = table.close()
+
+            arrays = load_npz(path)
+
+        assert entry["rows"] == 3
+        assert entry["columns"] == {
+            "time": "<i8",
+            "cpu": "<f8",
+            "name": "<U10",
+            "pids": "<f8",
+        }
+        assert arrays["time"] == ("<i8", [1, 2, 3])
+        assert arrays["name"] == ("<U10", ["h1", "h2", "peer0.org1"])
+
+        descr, cpu = arrays["cpu"]
+        assert cpu[0] == 1.5 and cpu[1] != cpu[1] and cpu[2] != cpu[2]
+
+        descr, pids = arrays["pids"]
+        assert pids[0] != pids[0] and pids[1] != pids[1] and pids[2] == 7.0
+
+
+class TestExporter(unittest.TestCase):
+    def test_export(self):
+        points = [[1000 + i, float(i), i, "h1"] for i in range(25)]
+        received = []
+
+        async def query(request):
+            q = request.query.get("q")
+            received.append(dict(request.query))
+
+            if q == "SHOW MEASUREMENTS":
+                series = [{"name": "measurements", "values": [["host"]]}]
+                return web.json_response({"results": [{"series": series}]})
+
+            if q.startswith("SHOW FIELD KEYS"):
+                values = [["cpu", "float"], ["pids", "integer"]]
+                series = [{"name": "host", "values": values}]
+                return web.json_response({"results": [{"series": series}]})
+
+            # Chunked response: one JSON document per chunk of points
+            size = int(request.query.get("chunk_size"))
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for start in range(0, len(points), size):
+                series = {
+                    "name": "host",
+                    "columns": ["time", "cpu", "pids", "source"],
+                    "values": points[start : start + size],
+                }
+                chunk = {"results": [{"statement_id": 0, "series": [series]}]}
+                await response.write(json.dumps(chunk).encode() + b"\n")
+            await response.write_eof()
+            return response
+
+        async def run(folder):
+            app = web.Application()
+            app.router.add_route("*", "/query", query)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            client = InfluxClient("127.0.0.1", port)
+            try:
+                exporter = Exporter(client, folder, chunk_size=10)
+                results = {"ev1": [{"tx": 1}, {"tx": 2}]}
+                manifest = await exporter.run(["env1"], results=results, name="exp")
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+            return manifest
+
+        with tempfile.TemporaryDirectory() as folder:
+            manifest = asyncio.run(run(folder))
+
+            with open(os.path.join(folder, "manifest.json")) as fp:
+                assert json.load(fp) == manifest
+
+            host = load_npz(os.path.join(folder, "env1", "host.npz"))
+            events = load_npz(os.path.join(folder, "events.npz"))
+
+        select = received[-1]
+        assert select["q"] == 'SELECT * FROM "host"'
+        assert select["chunked"] == "true"
+        assert select["epoch"] == "ms"
+
+        (entry,) = manifest["databases"]["env1"]
+        assert entry["file"] == os.path.join("env1", "host.npz")
+        assert entry["rows"] == 25
+        assert entry["columns"]["pids"] == "<i8"
+
+        assert host["time"][1] == [1000 + i for i in range(25)]
+        assert host["cpu"][1] == [float(i) for i in range(25)]
+        assert host["pids"] == ("<i8", list(range(25)))
+        assert host["source"][1] == ["h1"] * 25
+
+        assert manifest["events"]["rows"] == 2
+        assert events["event"][1] == ["ev1", "ev1"]
+        assert events["index"][1] == [0, 1]
+        assert [json.loads(r) for r in events["result"][1]] == [{"tx": 1}, {"tx": 2}]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,55 @@
+import logging
+import random
+import unittest
+
+from umbra.common.histogram import Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        rand = random.Random(1)
+        values = sorted(rand.expovariate(100) for _ in range(10000))
+
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        for percentile in [50, 90, 99]:
+            expected = values[int(percentile / 100 * len(values)) - 1]
+            assert abs(histogram.percentile(percentile) - expected) < expected * 0.02
+
+        assert histogram.count == 10000
+        assert histogram.min == values[0]
+        assert histogram.max == values[-1]
+
+    def test_merge_dump_load(self):
+        first, second = Histogram(), Histogram()
+        values = []
+        for value in range(1, 101):
+            first.record(value / 1000.0)
+            second.record(value / 100.0)
+            values.extend([value / 1000.0, value / 100.0])
+
+        expected = sorted(values)[99]
+
+        loaded = Histogram.load(first.dump())
+        loaded.merge(second)
+
+        assert loaded.count == 200
+        assert loaded.min == 0.001
+        assert loaded.max == 1.0
+        assert abs(loaded.percentile(50) - expected) < expected * 0.02
+
+    def test_empty(self):
+        histogram = Histogram()
+        stats = histogram.stats()
+        assert stats["count"] == 0
+        assert stats["p99"] is None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
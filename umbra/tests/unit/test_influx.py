@@ -0,0 +1,185 @@
+import logging
+import unittest
+import asyncio
+
+from aiohttp import web
+
+from google.protobuf import json_format
+
+from umbra.common.protobuf.umbra_pb2 import Stats
+from umbra.broker.influx import InfluxClient, StatsEncoder, encode, encode_point
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestEncode(unittest.TestCase):
+    def test_point(self):
+        point = {
+            "measurement": "container stats",
+            "tags": {"name": "peer0,org1", "environment": "env 1", "empty": ""},
+            "fields": {
+                "cpu_percent": 12.5,
+                "mem_usage": 1024,
+                "status": 'run "ok"',
+                "up": True,
+                "none": None,
+            },
+            "time": 1600000000000,
+        }
+
+        line = encode_point(point)
+
+        assert line == (
+            "container\\ stats,environment=env\\ 1,name=peer0\\,org1 "
+            'cpu_percent=12.5,mem_usage=1024i,status="run \\"ok\\"",up=true '
+            "1600000000000"
+        )
+
+    def test_encode(self):
+        points = [
+            {"measurement": "host", "tags": {}, "fields": {"cpu": 1.0}},
+            {"measurement": "host", "tags": {}, "fields": {}},
+            {"measurement": "host", "fields": {"cpu": 2.0}},
+            {"measurement": "host", "fields": {"cpu": float("nan"), "mem": 3.0}},
+            {"measurement": "host", "fields": {"cpu": float("inf")}},
+        ]
+
+        assert encode(points) == b"host cpu=1.0\nhost cpu=2.0\nhost mem=3.0"
+
+    def test_stats_encoder(self):
+        message = {
+            "environment": "env 1",
+            "source": "container",
+            "measurements": [
+                {
+                    "name": "container",
+                    "tags": {"source": "peer0", "environment": "other"},
+                    "fields": {
+                        "cpu": {"name": "cpu", "type": "float", "value": "1.5"},
+                        "pids": {"name": "pids", "type": "int", "value": "7"},
+                        "state": {"name": "state", "type": "str", "value": "up"},
+                    },
+                },
+                {
+                    "name": "container",
+                    "tags": {"source": "peer1"},
+                    "fields": {"cpu": {"name": "cpu", "type": "int", "value": "x"}},
+                },
+            ],
+        }
+        stats = json_format.ParseDict(message, Stats())
+
+        encoder = StatsEncoder()
+        lines = encoder.encode(stats, stats.environment, timestamp=1000)
+
+        point = {
+            "measurement": "container",
+            "tags": {"source": "peer0", "environment": "env 1"},
+            "fields": {"cpu": 1.5, "pids": 7, "state": "up"},
+            "time": 1000,
+        }
+        assert lines == [encode_point(point)]
+        assert encoder.encode(stats, stats.environment, timestamp=1000) == lines
+
+    def test_stats_encoder_typed(self):
+        message = {
+            "environment": "env1",
+            "source": "host",
+            "version": 2,
+            "measurements": [
+                {
+                    "name": "host",
+                    "tags": {"source": "h1"},
+                    "fields": {
+                        "cpu": {"name": "cpu", "doubleValue": 1.5},
+                        "pids": {"name": "pids", "intValue": 7},
+                        "mem": {"name": "mem", "doubleValue": "NaN"},
+                    },
+                },
+            ],
+            "series": [
+                {
+                    "name": "host",
+                    "tags": {"source": "h2"},
+                    "timestamps": [1000, 2000],
+                    "columns": [
+                        {"name": "cpu", "doubles": [1.0, 2.5]},
+                        {"name": "pids", "ints": [3, -4]},
+                        {"name": "mem", "doubles": [float("nan"), 3.0]},
+                        {"name": "io", "doubles": [float("inf"), 1.0]},
+                        {"name": "bad", "doubles": [1.0]},
+                    ],
+                },
+            ],
+        }
+        stats = json_format.ParseDict(message, Stats())
+        stats = Stats.FromString(stats.SerializeToString())
+
+        lines = StatsEncoder().encode(stats, stats.environment, timestamp=1000)
+
+        assert lines == [
+            "host,environment=env1,source=h1 cpu=1.5,pids=7i 1000",
+            "host,environment=env1,source=h2 cpu=1.0,pids=3i 1000",
+            "host,environment=env1,source=h2 cpu=2.5,pids=-4i,mem=3.0,io=1.0 2000",
+        ]
+
+
+class TestInfluxClient(unittest.TestCase):
+    def test_write_query(self):
+        received = {"databases": ["_internal"], "writes": []}
+
+        async def query(request):
+            q = request.query.get("q")
+            if q == "SHOW DATABASES":
+                values = [[name] for name in received["databases"]]
+                series = [{"name": "databases", "columns": ["name"], "values": values}]
+                return web.json_response({"results": [{"series": series}]})
+            if q.startswith("CREATE DATABASE"):
+                received["databases"].append(q.split('"')[1])
+                return web.json_response({"results": [{}]})
+            return web.json_response({"results": [{"error": "unknown"}]})
+
+        async def write(request):
+            # aiohttp decompresses the gzip body of requests
+            encoding = request.headers.get("Content-Encoding")
+            body = await request.read()
+            received["writes"].append((dict(request.query), encoding, body))
+            return web.Response(status=204)
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/query", query)
+            app.router.add_post("/write", write)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            client = InfluxClient("127.0.0.1", port, "user", "pass")
+            try:
+                await client.create_database("env1")
+                dbs = await client.get_list_database()
+                points = [{"measurement": "host", "tags": {}, "fields": {"cpu": 1}}]
+                await client.write_points(points, database="env1")
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+            return dbs
+
+        dbs = asyncio.run(run())
+
+        assert dbs == [{"name": "_internal"}, {"name": "env1"}]
+        params, encoding, body = received["writes"][0]
+        assert params["db"] == "env1"
+        assert params["precision"] == "ms"
+        assert params["u"] == "user"
+        assert encoding == "gzip"
+        assert body == b"host cpu=1i"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
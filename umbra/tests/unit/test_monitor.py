@@ -0,0 +1,118 @@
+import os
+import time
+import logging
+import unittest
+import asyncio
+
+import psutil as ps
+
+from umbra.monitor.tools import MonHost, MonProcess
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestMonHost(unittest.TestCase):
+    def test_cpu_percent(self):
+        host = MonHost()
+        times = ps.cpu_times()
+        fields = times._fields
+        first = times._make([0.0] * len(fields))
+
+        values = dict.fromkeys(fields, 0.0)
+        values.update(user=30.0, idle=60.0, iowait=10.0)
+        second = times._make([values[field] for field in fields])
+
+        assert host._get_node_cpu_percent(first) == 0.0
+        assert host._get_node_cpu_percent(second) == 30.0
+
+    def test_sweep(self):
+        host = MonHost()
+        measurement = {"time": 0.0}
+
+        start = time.perf_counter()
+        for _ in range(3):
+            tm = time.time()
+            measurement = host._get_node_stats(tm, measurement)
+            measurement["time"] = tm
+            host._first = False
+        elapsed = time.perf_counter() - start
+
+        # Before, each sweep slept 0.5s in cpu_percent(interval=0.5)
+        assert elapsed < 0.1
+        assert 0.0 <= measurement["cpu_percent"] <= 100.0
+
+    def test_sampling(self):
+        flushed = []
+
+        async def flush(metrics, series=None):
+            flushed.append((metrics, series))
+
+        host = MonHost()
+        host.output = {"live": True}
+        host.flush = flush
+        opts = {"interval": 0.01, "duration": 0.05}
+
+        asyncio.run(host.sampling(opts))
+        measurements = [metrics for metrics, _ in flushed]
+
+        flushed.clear()
+        asyncio.run(host.sampling(dict(opts, batch=2)))
+        series = [series for _, series in flushed]
+
+        node = host._info.get("node")
+        assert len(measurements) >= 2
+        assert all(m[0]["tags"] == {"source": node} for m in measurements)
+        assert all(s[0]["tags"] == {"source": node} for s in series)
+        assert all(len(s[0]["timestamps"]) <= 2 for s in series)
+        assert sum(len(s[0]["timestamps"]) for s in series) >= 2
+
+    def test_init_batch(self):
+        flushed = []
+
+        async def flush(metrics, series=None):
+            flushed.append((metrics, series))
+
+        host = MonHost()
+        host.flush = flush
+        parameters = {"interval": "0.01", "duration": "0.05", "batch": "3"}
+        host.init({"live": True}, {"id": "host-1", "parameters": parameters})
+
+        asyncio.run(host.stimulus)
+
+        assert flushed
+        assert all(metrics == [] and series for metrics, series in flushed)
+        assert len(flushed[0][1][0]["timestamps"]) == 3
+
+
+class TestMonProcess(unittest.TestCase):
+    def test_monitor(self):
+        process = MonProcess()
+        process.options(pid=os.getpid(), interval=0.01, duration=0.05)
+
+        async def run():
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(time.time())
+                    await asyncio.sleep(0.005)
+
+            ticker = asyncio.create_task(tick())
+            metrics = await process.stimulus
+            ticker.cancel()
+            return metrics, ticks
+
+        metrics, ticks = asyncio.run(run())
+
+        # The loop keeps running other tasks while the process is sampled
+        assert len(metrics) >= 2
+        assert len(ticks) >= 5
+        assert metrics[0]["cpu_percent"] == 0.0
+        assert metrics[-1]["cpu_percent"] >= 0.0
+        assert metrics[-1]["num_threads"] >= 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
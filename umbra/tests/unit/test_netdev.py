@@ -0,0 +1,117 @@
+import os
+import logging
+import unittest
+import tempfile
+
+from umbra.monitor.netdev import NetDevSampler, parse
+from umbra.monitor.tools import MonNetwork, ContainerPids
+
+
+logger = logging.getLogger(__name__)
+
+
+HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|"
+    "bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def net_dev(interfaces):
+    lines = [
+        f"{name:>6}: {rx[0]} {rx[1]} {rx[2]} {rx[3]} 0 0 0 0 "
+        f"{tx[0]} {tx[1]} {tx[2]} {tx[3]} 0 0 0 0"
+        for name, (rx, tx) in interfaces.items()
+    ]
+    return HEADER + "\n".join(lines) + "\n"
+
+
+def write(proc, pid, interfaces):
+    folder = os.path.join(proc, str(pid), "net")
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "dev"), "w") as fp:
+        fp.write(net_dev(interfaces))
+
+
+class TestNetDev(unittest.TestCase):
+    def test_parse(self):
+        content = net_dev({"lo": ((1, 2, 3, 4), (5, 6, 7, 8))})
+
+        assert parse(content) == {
+            "lo": {
+                "rx_bytes": 1,
+                "rx_packets": 2,
+                "rx_errs": 3,
+                "rx_drop": 4,
+                "tx_bytes": 5,
+                "tx_packets": 6,
+                "tx_errs": 7,
+                "tx_drop": 8,
+            }
+        }
+
+    def test_rates(self):
+        with tempfile.TemporaryDirectory() as proc:
+            sampler = NetDevSampler(proc)
+
+            write(
+                proc,
+                10,
+                {
+                    "lo": ((100, 1, 0, 0), (100, 1, 0, 0)),
+                    "eth0": ((1000, 10, 0, 0), (500, 5, 0, 0)),
+                    "peer0-eth1": ((0, 0, 0, 0), (0, 0, 0, 0)),
+                },
+            )
+            first = sampler.sample("peer0", 10, tm=100.0)
+
+            write(
+                proc,
+                10,
+                {
+                    "eth0": ((3000, 30, 0, 2), (100, 1, 0, 0)),
+                    "peer0-eth1": ((400, 4, 0, 0), (800, 8, 0, 0)),
+                },
+            )
+            second = sampler.sample("peer0", 10, tm=102.0)
+
+            assert sampler.sample("peer0", 11) is None
+
+        assert sorted(first) == ["eth0", "peer0-eth1"]
+        assert first["eth0"]["rx_bytes_rate"] == 0.0
+
+        eth0 = second["eth0"]
+        assert eth0["rx_bytes"] == 3000
+        assert eth0["rx_bytes_rate"] == 1000.0
+        assert eth0["rx_packets_rate"] == 10.0
+        assert eth0["rx_drop_rate"] == 1.0
+        # Counters reset (e.g., interface recreated)
+        assert eth0["tx_bytes_rate"] == 0.0
+        assert second["peer0-eth1"]["tx_bytes_rate"] == 400.0
+
+
+class TestMonNetwork(unittest.TestCase):
+    def test_sample(self):
+        with tempfile.TemporaryDirectory() as proc:
+            tool = MonNetwork()
+            tool._sampler = NetDevSampler(proc)
+            tool._containers = ContainerPids({"peer0": 10, "peer1": 11})
+
+            write(proc, 10, {"eth1": ((10, 1, 0, 0), (20, 2, 0, 0))})
+            write(proc, 11, {"eth1": ((30, 3, 0, 0), (40, 4, 0, 0))})
+
+            sweep = tool._sample(["peer0", "peer1", "orderer"])
+
+        links = {"peer0:eth1": "peer0-s1"}
+        output = tool.format_measurement(tool.samples(sweep, links))
+
+        assert [out["tags"] for out in output] == [
+            {"source": "peer0", "interface": "eth1", "link": "peer0-s1"},
+            {"source": "peer1", "interface": "eth1"},
+        ]
+        assert output[1]["fields"]["tx_bytes"]["double_value"] == 40
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import json
+import logging
+import unittest
+import asyncio
+import tempfile
+
+from umbra.monitor.ovs import OVSSampler, parse
+from umbra.monitor.tools import MonSwitch
+
+
+logger = logging.getLogger(__name__)
+
+
+def interfaces(rx_bytes, tx_dropped):
+    # As ovs-vsctl --format=json --columns=name,type,ofport,statistics list Interface
+    stats = [
+        ["rx_bytes", rx_bytes],
+        ["rx_packets", rx_bytes // 100],
+        ["tx_bytes", 500],
+        ["tx_dropped", tx_dropped],
+        ["collisions", 0],
+    ]
+    table = {
+        "headings": ["name", "type", "ofport", "statistics"],
+        "data": [
+            ["s1-eth1", "", 1, ["map", stats]],
+            ["s1-eth2", "", 2, ["map", []]],
+            ["s1", "internal", 65534, ["map", [["rx_bytes", 7]]]],
+        ],
+    }
+    return json.dumps(table)
+
+
+class TestOVS(unittest.TestCase):
+    def test_parse(self):
+        parsed = parse(interfaces(1000, 1))
+
+        assert sorted(parsed) == ["s1-eth1", "s1-eth2"]
+        assert parsed["s1-eth1"]["ofport"] == 1
+        assert parsed["s1-eth1"]["counters"]["rx_bytes"] == 1000
+        assert parsed["s1-eth1"]["counters"]["tx_dropped"] == 1
+        assert parsed["s1-eth2"]["counters"]["rx_bytes"] == 0
+
+    def test_sample(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filepath = os.path.join(folder, "interfaces.json")
+            sampler = OVSSampler(command=["cat", filepath])
+
+            async def run():
+                with open(filepath, "w") as fp:
+                    fp.write(interfaces(1000, 1))
+                first = await sampler.sample(tm=10.0)
+
+                with open(filepath, "w") as fp:
+                    fp.write(interfaces(3000, 5))
+                second = await sampler.sample(tm=12.0)
+
+                return first, second
+
+            first, second = asyncio.run(run())
+
+            failed = OVSSampler(command=["cat", os.path.join(folder, "none")])
+            assert asyncio.run(failed.sample()) == {}
+
+        assert first["s1-eth1"]["fields"]["rx_bytes_rate"] == 0.0
+
+        fields = second["s1-eth1"]["fields"]
+        assert fields["rx_bytes_rate"] == 1000.0
+        assert fields["rx_packets_rate"] == 10.0
+        assert fields["tx_bytes_rate"] == 0.0
+        assert fields["tx_dropped_rate"] == 2.0
+
+        tool = MonSwitch()
+        ports = {"s1-eth1": ("s1", 1)}
+        links = {"s1-eth1": "peer0-s1"}
+        samples = tool.samples(second, ports, links)
+
+        assert len(samples) == 1
+        tags, fields = samples[0]
+        assert tags == {
+            "source": "s1",
+            "interface": "s1-eth1",
+            "port": "1",
+            "link": "peer0-s1",
+        }
+        assert fields["tx_dropped"] == 5
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
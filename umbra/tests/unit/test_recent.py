@@ -0,0 +1,87 @@
+import logging
+import unittest
+
+from umbra.common.protobuf.umbra_pb2 import Query
+from umbra.broker.recent import Recent
+
+
+logger = logging.getLogger(__name__)
+
+
+def fill(recent, samples):
+    for second in range(samples):
+        for source in ["peer0", "peer1"]:
+            values = {"cpu": float(second), "mem": 100.0 + second}
+            if second % 2:
+                values["pids"] = 7.0
+            tags = (("source", source),)
+            recent.add("env", "container", tags, second * 1000, values)
+
+        recent.add("env", "host", (("source", "h1"),), second * 1000, {"cpu": 1.0})
+
+
+class TestRecent(unittest.TestCase):
+    def test_latest(self):
+        recent = Recent(size=10)
+        fill(recent, 25)
+
+        query = Query(environment="env", measurement="container")
+        query.tags["source"] = "peer1"
+        reply = recent.query(query)
+
+        assert len(reply.series) == 1
+        series = reply.series[0]
+        assert dict(series.tags) == {"source": "peer1"}
+        assert list(series.timestamps) == [24000]
+        columns = {column.name: list(column.doubles) for column in series.columns}
+        assert columns["cpu"] == [24.0]
+        assert columns["mem"] == [124.0]
+
+    def test_series(self):
+        recent = Recent(size=10)
+        fill(recent, 25)
+
+        query = Query(environment="env", kind="series", window=4)
+        query.fields.append("cpu")
+        reply = recent.query(query)
+
+        assert len(reply.series) == 3
+        container = reply.series[0]
+        assert list(container.timestamps) == [20000, 21000, 22000, 23000, 24000]
+        assert [column.name for column in container.columns] == ["cpu"]
+        assert list(container.columns[0].doubles) == [20.0, 21.0, 22.0, 23.0, 24.0]
+
+        # Ring keeps only the latest 10 samples
+        reply = recent.query(Query(measurement="host", kind="series"))
+        assert list(reply.series[0].timestamps) == [t * 1000 for t in range(15, 25)]
+
+    def test_stats(self):
+        recent = Recent(size=10)
+        fill(recent, 25)
+
+        query = Query(environment="env", measurement="container", kind="stats")
+        query.tags["source"] = "peer0"
+        reply = recent.query(query)
+
+        fields = reply.measurements[0].fields
+        assert fields["cpu_count"].double_value == 10
+        assert fields["cpu_mean"].double_value == 19.5
+        assert fields["cpu_min"].double_value == 15.0
+        assert fields["cpu_max"].double_value == 24.0
+        assert fields["cpu_last"].double_value == 24.0
+        assert fields["pids_count"].double_value == 5
+
+    def test_evict(self):
+        recent = Recent(size=10, max_series=2)
+        fill(recent, 1)
+
+        stats = recent.stats()
+        assert stats["series"] == 2
+        assert stats["evicted"] == 1
+        query = Query(measurement="container", tags={"source": "peer0"})
+        assert not recent.query(query).series
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
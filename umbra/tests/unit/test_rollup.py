@@ -0,0 +1,98 @@
+import logging
+import unittest
+
+from google.protobuf import json_format
+
+from umbra.common.protobuf.umbra_pb2 import Stats
+from umbra.broker.rollup import Rollup, label
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestRollup(unittest.TestCase):
+    def test_windows(self):
+        rollup = Rollup(resolutions=[10, 60])
+        tags = (("source", "peer0"),)
+        points = []
+
+        # One sample per second, values 0..99
+        for second in range(120):
+            values = {"cpu": float(second % 100)}
+            points.extend(rollup.add("env", "container", tags, second * 1000, values))
+
+        tens = [p for p in points if p["measurement"] == "container_10s"]
+        minutes = [p for p in points if p["measurement"] == "container_1m"]
+
+        assert len(tens) == 11 and len(minutes) == 1
+        first = tens[0]
+        assert first["time"] == 0
+        assert first["tags"] == {"source": "peer0", "environment": "env"}
+        assert first["fields"]["count"] == 10
+        assert first["fields"]["cpu_mean"] == 4.5
+        assert first["fields"]["cpu_min"] == 0.0
+        assert first["fields"]["cpu_max"] == 9.0
+        assert first["fields"]["cpu_last"] == 9.0
+        self.assertAlmostEqual(minutes[0]["fields"]["cpu_p50"], 29.5, delta=1.0)
+        self.assertAlmostEqual(minutes[0]["fields"]["cpu_p99"], 59.0, delta=2.0)
+
+        # Late sample of a closed window is ignored
+        assert rollup.add("env", "container", tags, 5000, {"cpu": 1.0}) == []
+        assert rollup.stats()["late"] == 1
+
+        expired = rollup.expire(200 * 1000)
+        assert sorted(p["measurement"] for p in expired["env"]) == [
+            "container_10s",
+            "container_1m",
+        ]
+        assert rollup.stats()["windows"] == 0
+
+    def test_stats(self):
+        message = {
+            "environment": "env",
+            "source": "host",
+            "version": 2,
+            "measurements": [
+                {
+                    "name": "host",
+                    "tags": {"source": "h1"},
+                    "fields": {
+                        "cpu": {"name": "cpu", "type": "float", "value": "2.0"},
+                        "mem": {"name": "mem", "double_value": 4.0},
+                        "state": {"name": "state", "type": "str", "value": "up"},
+                    },
+                }
+            ],
+            "series": [
+                {
+                    "name": "host",
+                    "tags": {"source": "h1"},
+                    "timestamps": [1000, 2000, 11000],
+                    "columns": [{"name": "cpu", "doubles": [4.0, float("nan"), 1.0]}],
+                }
+            ],
+        }
+        stats = json_format.ParseDict(message, Stats())
+
+        rollup = Rollup(resolutions=[10])
+        points = rollup.add_stats(stats, "env", 0)
+
+        assert len(points) == 1
+        fields = points[0]["fields"]
+        assert fields["count"] == 2
+        assert fields["cpu_mean"] == 3.0
+        assert fields["mem_last"] == 4.0
+        assert "state_mean" not in fields
+
+    def test_tier(self):
+        rollup = Rollup(resolutions=[10, 60, 600])
+
+        assert label(10) == "10s" and label(600) == "10m" and label(7200) == "2h"
+        assert rollup.tier(0, 600) == ""
+        assert rollup.tier(0, 3 * 3600) == "_1m"
+        assert rollup.tier(0, 30 * 24 * 3600) == "_10m"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
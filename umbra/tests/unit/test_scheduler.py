@@ -0,0 +1,501 @@
+import json
+import time
+import logging
+import tempfile
+import unittest
+import asyncio
+
+from umbra.common.scheduler import Handler, Arrivals, EventCall, Timers
+from umbra.broker.workers import Workers
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestHandler(unittest.TestCase):
+    def test_run_order(self):
+        fired = []
+
+        def build(uid):
+            async def call():
+                fired.append(uid)
+                return {"uid": uid}
+
+            return call
+
+        calls = {
+            1: (build(1), {"from": 0.03}),
+            2: (build(2), {"from": 0.01}),
+            3: (build(3), {"from": 0.02}),
+        }
+
+        handler = Handler()
+        results = asyncio.run(handler.run(calls))
+
+        assert fired == [2, 3, 1]
+        assert results == {1: {"uid": 1}, 2: {"uid": 2}, 3: {"uid": 3}}
+
+    def test_run_repeat(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            return {"count": counter["calls"]}
+
+        calls = {1: (call, {"repeat": 3, "interval": 0.01})}
+
+        handler = Handler()
+        results = asyncio.run(handler.run(calls))
+
+        assert counter["calls"] == 3
+        assert results == {1: {"count": 3}}
+
+    def test_run_event_call(self):
+        counter = {"calls": 0}
+
+        async def call(event):
+            counter["calls"] += 1
+            return {"action": event.get("action"), "count": counter["calls"]}
+
+        event = {"action": "chaincode_invoke"}
+        calls = {1: (EventCall(call, event), {"repeat": 3, "interval": 0.01})}
+
+        handler = Handler()
+        results = asyncio.run(handler.run(calls))
+
+        assert counter["calls"] == 3
+        assert results == {1: {"action": "chaincode_invoke", "count": 3}}
+        assert not hasattr(calls[1][0], "__dict__")
+
+    def test_run_after(self):
+        fired = []
+
+        def build(uid, result):
+            async def call():
+                fired.append(uid)
+                await asyncio.sleep(0.02)
+                return result
+
+            return call
+
+        calls = {
+            1: (build(1, {"ok": 1}), {}),
+            2: (build(2, {"ok": 2}), {"after": 1}),
+            3: (build(3, {"ok": 3}), {"after": [1, 2], "from": 0.01}),
+            4: (build(4, {}), {}),
+            5: (build(5, {"ok": 5}), {"after": 4}),
+            6: (build(6, {"ok": 6}), {"after": 4, "condition": "done"}),
+            7: (build(7, {"ok": 7}), {"after": 5}),
+        }
+
+        handler = Handler()
+        start = time.monotonic()
+        asyncio.run(handler.run(calls))
+        elapsed = time.monotonic() - start
+
+        assert fired.index(1) < fired.index(2) < fired.index(3)
+        assert 5 not in fired and 7 not in fired
+        assert 6 in fired
+        assert elapsed < 0.5
+        assert handler.timings()["calls"]["outcomes"]["skipped"] == 2
+
+    def test_run_after_cycle(self):
+        async def call():
+            return {"ok": True}
+
+        calls = {
+            1: (call, {"after": 2}),
+            2: (call, {"after": 1}),
+            3: (call, {"after": 1}),
+            4: (call, {}),
+        }
+
+        handler = Handler()
+        results = asyncio.run(handler.run(calls))
+
+        assert results == {1: {}, 2: {}, 3: {}, 4: {"ok": True}}
+
+    def test_run_deadline(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            await asyncio.sleep(0.05)
+            return {"count": counter["calls"]}
+
+        calls = {1: (call, {"repeat": 50, "interval": 0.01, "mode": "deadline"})}
+
+        handler = Handler()
+        start = time.monotonic()
+        asyncio.run(handler.run(calls))
+        elapsed = time.monotonic() - start
+
+        counters = handler.counters[1]
+        assert elapsed < 1.0
+        assert counters["fired"] + counters["missed"] == 50
+        assert counters["fired"] == counter["calls"]
+
+    def test_run_invalid_mode(self):
+        async def call():
+            return {}
+
+        for sched in [{"mode": "deadlin"}, {"mode": "deadline", "repeat": 3}]:
+            handler = Handler()
+            with self.assertRaises(ValueError):
+                asyncio.run(handler.run({1: (call, sched)}))
+
+    def test_run_deadline_missed(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            time.sleep(0.055)
+            return {"count": counter["calls"]}
+
+        calls = {1: (call, {"repeat": 20, "interval": 0.01, "mode": "deadline"})}
+
+        handler = Handler()
+        asyncio.run(handler.run(calls))
+
+        counters = handler.counters[1]
+        assert counters["missed"] > 0
+        assert counters["fired"] + counters["missed"] == 20
+        assert counters["fired"] == counter["calls"]
+
+    def test_run_limit_queue(self):
+        running = {"now": 0, "max": 0}
+
+        async def call():
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return {"ok": True}
+
+        calls = {uid: (call, {"limits": ["fabric"]}) for uid in range(20)}
+
+        handler = Handler()
+        handler.limit("fabric", 3)
+        results = asyncio.run(handler.run(calls))
+
+        limits = handler.limits()
+        assert len(results) == 20
+        assert running["max"] == 3
+        assert limits["fabric"]["completed"] == 20
+        assert limits["fabric"]["queued"] == 17
+        assert limits["fabric"]["inflight"] == 0
+
+    def test_run_limit_drop(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        limits = ["fabric", "fabric:chaincode_invoke"]
+        calls = {uid: (call, {"limits": limits}) for uid in range(20)}
+
+        handler = Handler()
+        handler.limit("fabric", 10)
+        handler.limit("fabric:chaincode_invoke", 2, policy="queue", queue=3)
+        asyncio.run(handler.run(calls))
+
+        limits = handler.limits()
+        assert counter["calls"] == 5
+        assert limits["fabric:chaincode_invoke"]["dropped"] == 15
+        assert limits["fabric"]["inflight"] == 0
+
+    def test_run_results(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            return {"count": counter["calls"]}
+
+        calls = {1: (call, {"repeat": 10})}
+        streamed = []
+
+        with tempfile.TemporaryDirectory() as folder:
+            handler = Handler(results_size=4, results_folder=folder)
+            handler.results.add_sink(lambda uid, result: streamed.append(result))
+            results = asyncio.run(handler.run(calls))
+
+            recent = handler.results.get(1)
+            everything = handler.results.get(1, spilled=True)
+
+        assert results == {1: {"count": 10}}
+        assert [r["count"] for r in recent] == [7, 8, 9, 10]
+        assert [r["count"] for r in everything] == list(range(1, 11))
+        assert len(streamed) == 10
+
+    def test_results_dump(self):
+        async def call():
+            return {"ok": True}
+
+        calls = {1: (call, {"repeat": 6})}
+
+        with tempfile.TemporaryDirectory() as folder:
+            handler = Handler(results_size=4, results_folder=folder)
+            asyncio.run(handler.run(calls))
+            handler.results.dump()
+
+            # As the broker reads back the results of a worker
+            reader = Handler(results_folder=folder)
+            everything = reader.results.get(1, spilled=True)
+
+        assert handler.results.get(1) == []
+        assert everything == [{"ok": True}] * 6
+
+    def test_run_timings(self):
+        async def call():
+            await asyncio.sleep(0.02)
+            return {"ok": True}
+
+        async def fail():
+            raise ValueError("fail")
+
+        labels = ["fabric", "fabric:chaincode_invoke"]
+        calls = {
+            1: (call, {"repeat": 3, "labels": labels}),
+            2: (fail, {"labels": labels}),
+            3: (call, {}),
+        }
+
+        handler = Handler()
+        asyncio.run(handler.run(calls))
+
+        timings = handler.timings()
+        invoke = timings["fabric:chaincode_invoke"]
+        assert invoke["outcomes"] == {"ok": 3, "error": 1}
+        assert invoke["lateness"]["count"] == 4
+        assert invoke["duration"]["p50"] >= 0.015
+        assert timings["calls"]["outcomes"] == {"ok": 1}
+
+    def test_merge_timings(self):
+        async def call():
+            return {"ok": True}
+
+        labels = ["fabric"]
+        calls = {uid: (call, {"labels": labels}) for uid in range(5)}
+
+        workers = [Handler(), Handler()]
+        for worker in workers:
+            asyncio.run(worker.run(calls))
+
+        handler = Handler()
+        for worker in workers:
+            handler.merge_timings(json.loads(json.dumps(worker.dump_timings())))
+
+        timings = handler.timings()
+        assert timings["fabric"]["outcomes"] == {"ok": 10}
+        assert timings["fabric"]["duration"]["count"] == 10
+        assert timings["fabric"]["latency"]["count"] == 10
+
+    def test_sketches_nodes(self):
+        async def call():
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        calls = {
+            1: (call, {"repeat": 2, "labels": ["iroha"], "node": "node1"}),
+            2: (call, {"repeat": 3, "labels": ["iroha"], "node": "node2"}),
+        }
+
+        handler = Handler()
+        asyncio.run(handler.run(calls))
+
+        latency = handler.sketches()["iroha"]
+        assert latency.nodes() == ["node1", "node2"]
+        assert latency.query(node="node2").count == 3
+        assert latency.query().percentile(50) >= 0.009
+
+    def test_run_tasks_created_when_due(self):
+        amount = 10000
+        tasks_pending = {}
+
+        async def call():
+            return {"ok": True}
+
+        async def run():
+            handler = Handler()
+            calls = {uid: (call, {"from": 0.2}) for uid in range(amount)}
+            aw = asyncio.create_task(handler.run(calls))
+            await asyncio.sleep(0.05)
+            tasks_pending["count"] = len(asyncio.all_tasks())
+            return await aw
+
+        results = asyncio.run(run())
+
+        assert tasks_pending["count"] < 5
+        assert len(results) == amount
+
+    def test_run_duration_clock(self):
+        class FastClock:
+            # Runs 1000 times faster than the event loop
+            def time(self):
+                return asyncio.get_event_loop().time() * 1000
+
+            def call_at(self, when, callback):
+                return asyncio.get_event_loop().call_at(when / 1000, callback)
+
+        cancelled = []
+
+        async def call():
+            try:
+                await asyncio.get_event_loop().create_future()
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        handler = Handler(clock=FastClock())
+        begin = time.monotonic()
+        results = asyncio.run(handler.run({1: (call, {"duration": 60})}))
+
+        assert time.monotonic() - begin < 1.0
+        assert cancelled == [True]
+        assert results == {1: {}}
+
+    def test_start_stop(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            return {"ok": True}
+
+        async def run():
+            handler = Handler()
+            calls = {
+                1: (call, {"repeat": 100, "interval": 0.01}),
+                2: (call, {"from": 10}),
+            }
+            started = await handler.start(calls)
+            await asyncio.sleep(0.05)
+            stopped = await handler.stop(calls)
+            return started, stopped
+
+        started, stopped = asyncio.run(run())
+
+        assert started == {1: "ok", 2: "ok"}
+        assert stopped == {1: "ok", 2: "ok"}
+        assert 0 < counter["calls"] < 100
+
+
+class TestTimers(unittest.TestCase):
+    def test_callback_error(self):
+        fired = []
+
+        def fail():
+            raise ValueError("callback error")
+
+        async def run():
+            timers = Timers()
+            now = timers.time()
+            timers.push(now + 0.01, fail)
+            timers.push(now + 0.01, fired.append, 1)
+            timers.push(now + 0.03, fired.append, 2)
+            await asyncio.sleep(0.06)
+            return len(timers)
+
+        pending = asyncio.run(run())
+
+        # A failed callback does not stop the others (nor the timer re-arm)
+        assert fired == [1, 2]
+        assert pending == 0
+
+
+class TestArrivals(unittest.TestCase):
+    def test_constant(self):
+        times = list(Arrivals({"arrival": "constant", "rate": 10, "until": 1}))
+        assert len(times) == 10
+        assert times[:3] == [0.0, 0.1, 0.2]
+
+    def test_poisson(self):
+        sched = {"arrival": "poisson", "rate": 500, "until": 10, "seed": 1}
+        times = list(Arrivals(sched))
+        assert 4500 < len(times) < 5500
+        assert times == sorted(times)
+        assert times == list(Arrivals(sched))
+
+    def test_ramp(self):
+        sched = {"arrival": "ramp", "rate": 0, "rate_end": 100, "until": 10}
+        times = list(Arrivals(sched))
+        assert len(times) == 500
+        assert times[1] - times[0] > times[-1] - times[-2]
+
+    def test_step(self):
+        sched = {"arrival": "step", "steps": [[0, 10], [1, 0], [2, 100]], "until": 3}
+        times = list(Arrivals(sched))
+        assert len(times) == 110
+        assert not [t for t in times if 1 <= t < 2]
+
+    def test_repeat(self):
+        sched = {"arrival": "constant", "rate": 1000, "repeat": 5}
+        assert len(list(Arrivals(sched))) == 5
+
+    def test_run_arrival(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            await asyncio.sleep(0.05)
+            return {"count": counter["calls"]}
+
+        sched = {"arrival": "constant", "rate": 200, "until": 0.25}
+        calls = {1: (call, sched)}
+
+        handler = Handler()
+        start = time.monotonic()
+        asyncio.run(handler.run(calls))
+        elapsed = time.monotonic() - start
+
+        assert counter["calls"] == 50
+        assert elapsed < 1.0
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Arrivals({"arrival": "burst", "rate": 10})
+        with self.assertRaises(ValueError):
+            Arrivals({"arrival": "constant", "rate": -1})
+        with self.assertRaises(ValueError):
+            Arrivals({"arrival": "step", "steps": [[0, "x"]]})
+        with self.assertRaises(ValueError):
+            Arrivals({"arrival": "step", "steps": [0, 10]})
+
+        sched = Arrivals({"arrival": "step", "steps": [["1", 5], [0, "10"]]})
+        assert sched.steps == [(0.0, 10.0), (1.0, 5.0)]
+
+    def test_run_invalid(self):
+        counter = {"calls": 0}
+
+        async def call():
+            counter["calls"] += 1
+            return {}
+
+        calls = {
+            1: (call, {"from": 0}),
+            2: (call, {"arrival": "step", "steps": [[0, "x"]], "until": 1}),
+        }
+
+        handler = Handler()
+        with self.assertRaises(ValueError):
+            asyncio.run(asyncio.wait_for(handler.run(calls), timeout=2))
+
+        assert counter["calls"] == 0
+
+
+class TestWorkers(unittest.TestCase):
+    def test_shard(self):
+        workers = Workers({}, 3)
+        shards = workers.shard(list(range(1, 8)))
+        assert shards == [[1, 4, 7], [2, 5], [3, 6]]
+        assert Workers({}, 4).shard([1, 2]) == [[1], [2]]
+
+        dependencies = {2: [1], 3: [2], 5: [4]}
+        shards = workers.shard([1, 2, 3, 4, 5, 6], dependencies)
+        assert shards == [[1, 2, 3], [4, 5], [6]]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
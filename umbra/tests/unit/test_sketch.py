@@ -0,0 +1,98 @@
+import os
+import json
+import logging
+import random
+import tempfile
+import unittest
+
+from umbra.common import sketch
+from umbra.common.sketch import DDSketch, Sketches
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestDDSketch(unittest.TestCase):
+    def test_percentiles(self):
+        rand = random.Random(1)
+        values = sorted(rand.lognormvariate(-4, 1.5) for _ in range(20000))
+
+        dd = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            dd.record(value)
+
+        for percentile in [50, 90, 99, 99.9]:
+            exact = values[int(percentile / 100.0 * (len(values) - 1))]
+            estimate = dd.percentile(percentile)
+            assert abs(estimate - exact) <= 0.011 * exact
+
+        assert dd.count == len(values)
+        assert dd.min == values[0] and dd.max == values[-1]
+
+    def test_merge(self):
+        rand = random.Random(2)
+        values = [rand.expovariate(10) for _ in range(5000)]
+
+        whole, first, second = DDSketch(), DDSketch(), DDSketch()
+        for index, value in enumerate(values):
+            whole.record(value)
+            (first if index % 2 else second).record(value)
+
+        first.merge(DDSketch.load(json.loads(json.dumps(second.dump()))))
+
+        assert first.bins == whole.bins
+        assert first.count == whole.count
+        assert first.percentile(99) == whole.percentile(99)
+
+        with self.assertRaises(ValueError):
+            first.merge(DDSketch(relative_accuracy=0.05))
+
+    def test_collapse(self):
+        dd = DDSketch(max_bins=64)
+        for exponent in range(-20, 100):
+            dd.record(2.0 ** exponent)
+        dd.record(0.0)
+
+        assert len(dd.bins) == 64
+        assert dd.zero == 1
+        assert dd.count == 121
+        # Only the lowest bins are collapsed
+        assert abs(dd.percentile(99) - 2.0 ** 97) <= 0.01 * 2.0 ** 97
+
+
+class TestSketches(unittest.TestCase):
+    def test_query(self):
+        sketches = Sketches(window=60)
+        for second in range(0, 180, 10):
+            sketches.record(0.1, "peer0", 1000.0 + second)
+            sketches.record(0.2, "peer1", 1000.0 + second)
+
+        assert sketches.nodes() == ["peer0", "peer1"]
+        assert sketches.query().count == 36
+        assert sketches.query(node="peer1").max == 0.2
+        # Windows aligned to 60s: [960, 1020), [1020, 1080), ...
+        assert sketches.query(start=1020, end=1080).count == 12
+
+    def test_runs(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for run in range(3):
+                sketches = Sketches()
+                for index in range(100):
+                    sketches.record(0.01 * (index + 1), "node1", 60.0 * run)
+
+                path = os.path.join(folder, "sketches-" + str(run) + ".json")
+                sketch.save(path, {"iroha:create_account": sketches})
+                paths.append(path)
+
+            merged = sketch.load(paths)
+
+        latency = merged["iroha:create_account"]
+        assert latency.query().count == 300
+        assert len(latency.sketches) == 3
+        assert abs(latency.query().percentile(50) - 0.5) <= 0.01
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import logging
+import tempfile
+import unittest
+import asyncio
+
+from umbra.broker.spill import Spill
+from umbra.broker.writer import Writer
+
+
+logger = logging.getLogger(__name__)
+
+
+def points(start, amount):
+    return [
+        {"measurement": "host", "tags": {}, "fields": {"value": i}, "time": i}
+        for i in range(start, start + amount)
+    ]
+
+
+class TestSpill(unittest.TestCase):
+    def test_replay_order(self):
+        written = []
+        state = {"fail_at": 3, "calls": 0}
+
+        async def write(pts, database):
+            state["calls"] += 1
+            if state["calls"] == state["fail_at"]:
+                raise ConnectionError("database down")
+            written.extend(p["time"] for p in pts)
+
+        with tempfile.TemporaryDirectory() as folder:
+            spill = Spill(folder, segment_size=500)
+            for start in range(0, 100, 10):
+                spill.append(points(start, 10), "env")
+
+            segments = len(os.listdir(folder))
+            first = asyncio.run(spill.replay(write))
+            second = asyncio.run(spill.replay(write))
+            left = os.listdir(folder)
+
+        assert segments > 1
+        assert first is False and second is True
+        assert written == list(range(100))
+        assert not left
+        assert spill.pending() is False
+
+    def test_reload(self):
+        written = []
+
+        async def write(pts, database):
+            written.extend(p["time"] for p in pts)
+
+        with tempfile.TemporaryDirectory() as folder:
+            spill = Spill(folder, segment_size=500)
+            for start in range(0, 30, 10):
+                spill.append(points(start, 10), "env")
+
+            # e.g., the broker restarted with points left in the log
+            reloaded = Spill(folder, segment_size=500)
+            reloaded.append(points(30, 10), "env")
+            replayed = asyncio.run(reloaded.replay(write))
+
+        assert replayed is True
+        assert written == list(range(40))
+
+    def test_max_size(self):
+        with tempfile.TemporaryDirectory() as folder:
+            spill = Spill(folder, segment_size=500, max_size=2000)
+            for start in range(0, 200, 10):
+                spill.append(points(start, 10), "env")
+
+            stats = spill.stats()
+
+        assert stats["bytes"] <= 2000 + 500
+        assert stats["dropped_segments"] > 0
+        assert stats["spilled"] == 200
+
+    def test_read_truncated(self):
+        with tempfile.TemporaryDirectory() as folder:
+            spill = Spill(folder)
+            spill.append(points(0, 10), "env")
+            spill.append(points(10, 10), "env")
+            spill._close()
+
+            path = spill._segments[0]
+            size = os.path.getsize(path)
+            with open(path, "r+b") as fp:
+                fp.truncate(size - 5)
+
+            position, database, first = spill.read(path, 0)
+            second = spill.read(path, position)
+
+        assert database == "env"
+        assert [p["time"] for p in first] == list(range(10))
+        assert second is None
+
+
+class TestWriterSpill(unittest.TestCase):
+    def test_outage(self):
+        written = []
+        state = {"down": True}
+
+        async def write(pts, database):
+            if state["down"]:
+                raise ConnectionError("database down")
+            written.extend(p["fields"]["value"] for p in pts)
+
+        async def run(folder):
+            writer = Writer(write, batch=10, age=0.01, spill=Spill(folder))
+            for start in range(0, 50, 10):
+                writer.put(points(start, 10), "env")
+                await asyncio.sleep(0.02)
+
+            state["down"] = False
+            writer.put(points(50, 10), "env")
+            await asyncio.sleep(0.1)
+            await writer.stop()
+            return writer.stats()
+
+        with tempfile.TemporaryDirectory() as folder:
+            stats = asyncio.run(run(folder))
+
+        assert written == list(range(60))
+        assert stats["spilled"] >= 50
+        assert stats["dropped"] == 0
+        assert stats["spill"]["bytes"] == 0
+
+    def test_overflow(self):
+        written = []
+        state = {"down": True}
+
+        async def write(pts, database):
+            if state["down"]:
+                raise ConnectionError("database down")
+            written.extend(p["fields"]["value"] for p in pts)
+
+        async def run(folder):
+            writer = Writer(write, batch=100, age=10, maxsize=15, spill=Spill(folder))
+            for start in range(0, 40, 10):
+                # Points beyond maxsize are spilled by the writer task
+                writer.put(points(start, 10), "env")
+                await asyncio.sleep(0.02)
+
+            state["down"] = False
+            await writer.stop()
+            return writer.stats()
+
+        with tempfile.TemporaryDirectory() as folder:
+            stats = asyncio.run(run(folder))
+
+        assert written == list(range(40))
+        assert stats["dropped"] == 0
+        assert stats["spill"]["bytes"] == 0
+
+    def test_outage_rejected(self):
+        written = []
+        state = {"down": True}
+
+        class Rejected(Exception):
+            status = 400
+
+        async def write(pts, database):
+            if state["down"]:
+                raise ConnectionError("database down")
+            if pts[0]["fields"]["value"] == 10:
+                raise Rejected("invalid field")
+            written.extend(p["fields"]["value"] for p in pts)
+
+        async def run(folder):
+            writer = Writer(write, batch=10, age=0.01, spill=Spill(folder))
+            for start in range(0, 30, 10):
+                writer.put(points(start, 10), "env")
+                await asyncio.sleep(0.02)
+
+            state["down"] = False
+            await asyncio.sleep(0.1)
+            await writer.stop()
+            return writer.stats()
+
+        with tempfile.TemporaryDirectory() as folder:
+            stats = asyncio.run(run(folder))
+
+        # The rejected batch is dropped, the replay goes on after it
+        assert written == list(range(10)) + list(range(20, 30))
+        assert stats["rejected"] == 10
+        assert stats["spill"]["bytes"] == 0
+
+    def test_concurrent_flush(self):
+        written = []
+        state = {"down": True}
+
+        async def write(pts, database):
+            if state["down"]:
+                raise ConnectionError("database down")
+            await asyncio.sleep(0.01)
+            written.extend(p["fields"]["value"] for p in pts)
+
+        async def run(folder):
+            writer = Writer(write, batch=10, age=10, spill=Spill(folder))
+            for start in range(0, 30, 10):
+                writer.put(points(start, 10), "env")
+                await writer.flush()
+
+            state["down"] = False
+            await asyncio.gather(writer.flush(), writer.flush(), writer.flush())
+            await writer.stop()
+            return writer.stats()
+
+        with tempfile.TemporaryDirectory() as folder:
+            stats = asyncio.run(run(folder))
+
+        assert written == list(range(30))
+        assert stats["spill"]["replayed"] == 30
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,136 @@
+import socket
+import logging
+import unittest
+import asyncio
+
+from grpclib.server import Server
+
+from umbra.common.protobuf.umbra_grpc import BrokerBase
+from umbra.common.protobuf.umbra_pb2 import Stats, Status
+from umbra.monitor.stream import StatsStream
+from umbra.monitor.tools import Tool, Tools
+
+
+logger = logging.getLogger(__name__)
+
+
+class Broker(BrokerBase):
+    def __init__(self):
+        self.received = []
+
+    async def Execute(self, stream):
+        pass
+
+    async def Collect(self, stream):
+        request = await stream.recv_message()
+        self.received.append(request.source)
+        await stream.send_message(Status(info=b"True"))
+
+    async def CollectStream(self, stream):
+        async for request in stream:
+            self.received.append(request.source)
+            await stream.send_message(Status(id=str(request.sequence), info=b"True"))
+
+    async def Recent(self, stream):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestStatsStream(unittest.TestCase):
+    def test_window(self):
+        async def run():
+            broker = Broker()
+            server = Server([broker])
+            port = free_port()
+            await server.start("127.0.0.1", port)
+
+            stream = StatsStream("127.0.0.1:" + str(port), window=4)
+            inflight = []
+            for index in range(50):
+                stream.put(Stats(environment="env", source=str(index)))
+                inflight.append(stream.stats()["inflight"])
+                await asyncio.sleep(0)
+
+            await stream.stop()
+            server.close()
+            return broker.received, max(inflight), stream.stats()
+
+        received, inflight, stats = asyncio.run(run())
+
+        assert received == [str(index) for index in range(50)]
+        assert inflight <= 4
+        assert stats["sent"] == stats["acked"] == 50
+        assert stats["connects"] == 1
+        assert stats["queued"] == stats["inflight"] == 0
+
+    def test_reconnect(self):
+        async def run():
+            port = free_port()
+            stream = StatsStream("127.0.0.1:" + str(port), retry=0.05)
+            for index in range(10):
+                stream.put(Stats(environment="env", source=str(index)))
+
+            # Broker not reachable yet, messages stay queued
+            await asyncio.sleep(0.1)
+            queued = stream.pending()
+
+            broker = Broker()
+            server = Server([broker])
+            await server.start("127.0.0.1", port)
+
+            await stream.stop()
+            server.close()
+            return broker.received, queued, stream.stats()
+
+        received, queued, stats = asyncio.run(run())
+
+        assert queued == 10
+        assert received == [str(index) for index in range(10)]
+        assert stats["acked"] == 10
+        assert stats["dropped"] == 0
+
+
+class TestTools(unittest.TestCase):
+    def test_stop_streams(self):
+        async def run():
+            broker = Broker()
+            server = Server([broker])
+            port = free_port()
+            await server.start("127.0.0.1", port)
+
+            tools = Tools({"address": "127.0.0.1:9000"})
+            flush = {"live": True, "address": "127.0.0.1:" + str(port)}
+            flush["environment"] = "env"
+            source = {
+                "id": "host-1",
+                "name": "host",
+                "parameters": {"interval": "0.01", "duration": "10"},
+                "schedule": {},
+            }
+
+            directrix = {"flush": flush, "sources": [source], "action": "start"}
+            await tools.measure(directrix)
+            await asyncio.sleep(0.1)
+            streams = list(Tool.STREAMS.values())
+
+            directrix = {"flush": flush, "sources": [source], "action": "stop"}
+            await tools.measure(directrix)
+            server.close()
+            return broker.received, streams
+
+        received, streams = asyncio.run(run())
+
+        assert Tool.STREAMS == {}
+        assert len(streams) == 1
+        assert streams[0].pending() == 0
+        assert received and streams[0].stats()["acked"] == len(received)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import json
+import shutil
+import logging
+import unittest
+import asyncio
+import tempfile
+
+from umbra.monitor.tc import TCSampler, parse
+from umbra.monitor.tools import MonQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+def qdiscs(drops, backlog):
+    # As tc -s -j qdisc show, for an interface shaped by TCLink
+    return json.dumps(
+        [
+            {"kind": "noqueue", "handle": "0:", "dev": "lo", "root": True},
+            {
+                "kind": "htb",
+                "handle": "5:",
+                "dev": "s1-eth1",
+                "root": True,
+                "options": {"r2q": 10, "default": "0x1"},
+                "bytes": 1000 + drops * 100,
+                "packets": 10 + drops,
+                "drops": drops,
+                "overlimits": drops * 2,
+                "requeues": 0,
+                "backlog": backlog,
+                "qlen": backlog // 100,
+            },
+            {
+                "kind": "netem",
+                "handle": "10:",
+                "dev": "s1-eth1",
+                "parent": "5:1",
+                "options": {"limit": 1000},
+                "bytes": 1000,
+                "packets": 10,
+                "drops": 0,
+                "overlimits": 0,
+                "requeues": 0,
+                "backlog": 0,
+                "qlen": 0,
+            },
+        ]
+    )
+
+
+class TestTC(unittest.TestCase):
+    def test_parse(self):
+        parsed = parse(qdiscs(4, 300))
+
+        assert [(q["dev"], q["kind"], q["parent"]) for q in parsed] == [
+            ("s1-eth1", "htb", "root"),
+            ("s1-eth1", "netem", "5:1"),
+        ]
+        assert parsed[0]["drops"] == 4
+        assert parsed[0]["backlog"] == 300
+        assert parsed[0]["qlen"] == 3
+
+    def test_sample(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filepath = os.path.join(folder, "qdiscs.json")
+            sampler = TCSampler(command=["cat", filepath])
+
+            async def run():
+                with open(filepath, "w") as fp:
+                    fp.write(qdiscs(4, 0))
+                first = await sampler.sample({"": None}, tm=10.0)
+
+                with open(filepath, "w") as fp:
+                    fp.write(qdiscs(12, 500))
+                second = await sampler.sample({"": None}, tm=12.0)
+
+                return first, second
+
+            first, second = asyncio.run(run())
+
+        assert first[0][2]["drops_rate"] == 0.0
+
+        namespace, qdisc, fields = second[0]
+        assert namespace == "" and qdisc["kind"] == "htb"
+        assert fields["drops_rate"] == 4.0
+        assert fields["overlimits_rate"] == 8.0
+        assert fields["bytes_rate"] == 400.0
+        assert fields["backlog"] == 500
+        assert fields["qlen"] == 5
+
+        tool = MonQueue()
+        ports = {"s1-eth1": ("s1", 1)}
+        links = {"s1:s1-eth1": "peer0-s1"}
+        samples = tool.samples(second, ports, links)
+
+        tags, fields = samples[0]
+        assert tags == {
+            "source": "s1",
+            "interface": "s1-eth1",
+            "qdisc": "htb",
+            "handle": "5:",
+            "parent": "root",
+            "link": "peer0-s1",
+        }
+        assert samples[1][0]["qdisc"] == "netem"
+
+        # Root namespace qdiscs of other interfaces (e.g., of the host)
+        # are not sampled, the ones of the nodes containers are
+        host = {"dev": "eth0", "kind": "fq_codel", "handle": "0:", "parent": "root"}
+        node = {"dev": "eth1", "kind": "netem", "handle": "1:", "parent": "root"}
+        sweep = [("", host, {}), ("peer0", node, {})]
+        samples = tool.samples(sweep, ports, links)
+
+        assert [tags["source"] for tags, _ in samples] == ["peer0"]
+        assert tool._namespaces([], {}) == {}
+        assert tool._namespaces([], ports) == {"": None}
+
+    @unittest.skipUnless(shutil.which("tc"), "tc not installed")
+    def test_read(self):
+        sampler = TCSampler()
+        read = asyncio.run(sampler.read())
+
+        assert read is not None
+        assert all(qdisc["kind"] != "noqueue" for qdisc in read)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
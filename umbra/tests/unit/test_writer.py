@@ -0,0 +1,120 @@
+import time
+import logging
+import unittest
+import asyncio
+
+from umbra.broker.writer import Writer
+
+
+logger = logging.getLogger(__name__)
+
+
+def points(amount, name="container"):
+    return [
+        {"measurement": name, "tags": {}, "fields": {"value": i}}
+        for i in range(amount)
+    ]
+
+
+class TestWriter(unittest.TestCase):
+    def test_batch_size(self):
+        batches = []
+
+        def write(pts, database):
+            batches.append((database, len(pts)))
+
+        async def run():
+            writer = Writer(write, batch=100, age=10)
+            start = time.monotonic()
+            for _ in range(10):
+                writer.put(points(10), "env")
+            await asyncio.sleep(0.05)
+            elapsed = time.monotonic() - start
+            await writer.stop()
+            return writer.stats(), elapsed
+
+        stats, elapsed = asyncio.run(run())
+
+        assert batches == [("env", 100)]
+        assert stats["written"] == 100
+        assert stats["depth"] == 0
+        assert stats["latency"]["count"] == 1
+        assert elapsed < 1.0
+
+    def test_batch_age(self):
+        batches = []
+
+        def write(pts, database):
+            batches.append((database, len(pts)))
+
+        async def run():
+            writer = Writer(write, batch=1000, age=0.05)
+            writer.put(points(3), "env1")
+            writer.put(points(2), "env2")
+            await asyncio.sleep(0.2)
+            return writer.stats()
+
+        stats = asyncio.run(run())
+
+        assert sorted(batches) == [("env1", 3), ("env2", 2)]
+        assert stats["flushes"] == 2
+
+    def test_retry_drop(self):
+        calls = {"count": 0}
+        written = []
+
+        def write(pts, database):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise ConnectionError("database down")
+            written.extend(pts)
+
+        async def run():
+            writer = Writer(write, batch=10, age=0.01, maxsize=15)
+            writer.put(points(10), "env")
+            await asyncio.sleep(0.005)
+            writer.put(points(10, "host"), "env")
+            await asyncio.sleep(0.1)
+            await writer.stop()
+            return writer.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["errors"] == 1
+        assert stats["dropped"] == 5
+        assert stats["written"] == 15
+        assert len(written) == 15
+
+    def test_rejected(self):
+        written = []
+
+        class Rejected(Exception):
+            status = 400
+
+        async def write(pts, database):
+            if pts[0]["measurement"] == "bad":
+                raise Rejected("invalid field")
+            if pts[0]["measurement"] == "down":
+                raise ConnectionError("database down")
+            written.extend(pts)
+
+        async def run():
+            writer = Writer(write, batch=1000, age=0.01)
+            writer.put(points(5, "bad"), "env1")
+            writer.put(points(3), "env2")
+            await asyncio.sleep(0.05)
+            writer.put(points(2, "down"), "env1")
+            await asyncio.sleep(0.05)
+            return writer.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["rejected"] == 5
+        assert len(written) == 3
+        # Connection errors are retried, rejected points are not
+        assert stats["depth"] == 2
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()